@@ -0,0 +1,264 @@
+"""
+Benchmark for the character predicates of the bundled charset_normalizer.
+
+Compares the property table in charset_normalizer.proptable, lazily filled or
+read from a generated file, against the previous approach of one
+lru_cache per predicate (reproduced here as the "cache" baseline). Each mode
+runs in a fresh process, so the first pass over the text is a cold start:
+
+    python benchmarks/charset_predicates.py --passes 5 --json predicates.json
+
+For every mode it reports the first (cold) and best later (warm) pass over
+every predicate the mess detector asks, the same for from_bytes() on encoded
+samples with the plugin engine, and the Python heap still held afterwards
+(the table modes include the 384 KB table).
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+LAMBDA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+MODES = ['cache', 'lazy', 'file']
+
+PREDICATES = [
+    'is_accentuated', 'unicode_range', 'is_latin', 'is_punctuation', 'is_symbol', 'is_emoticon',
+    'is_separator', 'is_case_variable', 'is_cjk', 'is_hiragana', 'is_katakana', 'is_hangul',
+    'is_thai', 'is_arabic', 'is_arabic_isolated_form', 'is_cjk_uncommon', 'is_unprintable'
+]
+
+# Code point blocks mixed into the synthetic multilingual text
+SCRIPTS = [
+    (0x00C0, 0x017F), (0x0391, 0x03C9), (0x0410, 0x044F), (0x0621, 0x064A),
+    (0x0E01, 0x0E3A), (0x3041, 0x3096), (0x30A1, 0x30FA), (0x4E00, 0x9FFF),
+    (0xAC00, 0xD7A3), (0x1F300, 0x1F5FF)
+]
+
+ENCODINGS = ['utf_8', 'cp1252', 'cp1251', 'iso8859_7', 'shift_jis', 'euc_kr', 'gb18030']
+
+
+def corpus(seed, size):
+    """English news text from the fixtures plus seeded multilingual text"""
+    with open(os.path.join(FIXTURES_DIR, 'newsapi_everything.json'), 'r', encoding='utf-8') as f:
+        articles = json.load(f)['articles']
+    english = ' '.join(
+        f"{a.get('title') or ''} {a.get('description') or ''} {a.get('content') or ''}" for a in articles
+    )
+    rng = random.Random(seed)
+    words = []
+    while sum(len(w) + 1 for w in words) < size:
+        low, high = rng.choice(SCRIPTS)
+        words.append(''.join(chr(rng.randint(low, high)) for _ in range(rng.randint(2, 9))))
+    return english + ' ' + ' '.join(words)
+
+
+def samples(text, seed, count=24):
+    """Encoded slices of the corpus, one per encoding that can represent them"""
+    rng = random.Random(seed)
+    encoded = []
+    while len(encoded) < count:
+        start = rng.randrange(len(text) - 400)
+        chunk = text[start:start + rng.randint(100, 400)]
+        encoding = rng.choice(ENCODINGS)
+        encoded.append(chunk.encode(encoding, errors='ignore'))
+    return encoded
+
+
+def install_cache_baseline():
+    """One lru_cache per predicate, each computing only its own answer"""
+    import unicodedata
+    from functools import lru_cache
+
+    from charset_normalizer import cd, md, utils
+    from charset_normalizer.constant import COMMON_CJK_CHARACTERS, UTF8_MAXIMAL_ALLOCATION
+    from charset_normalizer.proptable import (
+        ACCENT_MARKERS, RANGE_NAMES, SEPARATOR_SYMBOLS, compute_range
+    )
+
+    def name(character):
+        try:
+            return unicodedata.name(character)
+        except ValueError:
+            return ''
+
+    def unicode_range(character):
+        return RANGE_NAMES[compute_range(character)]
+
+    def in_range(character, *keywords):
+        character_range = cached['unicode_range'](character)
+        return character_range is not None and any(k in character_range for k in keywords)
+
+    def is_symbol(character):
+        category = unicodedata.category(character)
+        return "S" in category or "N" in category or (in_range(character, "Forms") and category != "Lo")
+
+    def is_separator(character):
+        category = unicodedata.category(character)
+        return (character.isspace() or character in SEPARATOR_SYMBOLS
+                or "Z" in category or category in {"Po", "Pd", "Pc"})
+
+    implementations = {
+        'is_accentuated': lambda c: any(m in name(c) for m in ACCENT_MARKERS),
+        'unicode_range': unicode_range,
+        'is_latin': lambda c: "LATIN" in name(c),
+        'is_punctuation': lambda c: "P" in unicodedata.category(c) or in_range(c, "Punctuation"),
+        'is_symbol': is_symbol,
+        'is_emoticon': lambda c: in_range(c, "Emoticons", "Pictographs"),
+        'is_separator': is_separator,
+        'is_case_variable': lambda c: c.islower() != c.isupper(),
+        'is_cjk': lambda c: "CJK" in name(c),
+        'is_hiragana': lambda c: "HIRAGANA" in name(c),
+        'is_katakana': lambda c: "KATAKANA" in name(c),
+        'is_hangul': lambda c: "HANGUL" in name(c),
+        'is_thai': lambda c: "THAI" in name(c),
+        'is_arabic': lambda c: "ARABIC" in name(c),
+        'is_arabic_isolated_form': lambda c: "ARABIC" in name(c) and "ISOLATED FORM" in name(c),
+        'is_cjk_uncommon': lambda c: c not in COMMON_CJK_CHARACTERS,
+        'is_unprintable': lambda c: (not c.isspace() and not c.isprintable()
+                                     and c != "\x1a" and c != "\ufeff"),
+    }
+    cached = {n: lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)(f) for n, f in implementations.items()}
+
+    for module in (utils, md, cd):
+        for predicate, function in cached.items():
+            if hasattr(module, predicate):
+                setattr(module, predicate, function)
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def worker(mode, passes, seed, size, memory=False):
+    """
+    Measure one mode in this (fresh) process. With memory, trace allocations
+    over one pass of each workload instead of timing them.
+    """
+    text = corpus(seed, size)
+    encoded = samples(text, seed)
+
+    if memory:
+        tracemalloc.start()
+        passes = 1
+
+    from charset_normalizer import from_bytes, proptable, utils
+    if mode == 'cache':
+        install_cache_baseline()
+    predicates = [getattr(utils, p) for p in PREDICATES]
+
+    def ask_all():
+        for character in text:
+            for predicate in predicates:
+                predicate(character)
+
+    def detect_all():
+        for payload in encoded:
+            from_bytes(payload)
+
+    predicate_ms = [timed(ask_all) for _ in range(passes)]
+    detect_ms = [timed(detect_all) for _ in range(passes)]
+
+    if memory:
+        heap = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return {'heap_kb': heap / 1024}
+
+    return {
+        'mode': mode,
+        'table_loaded': proptable.TABLE_LOADED,
+        'characters': len(text),
+        'distinct_characters': len(set(text)),
+        'predicate_calls': len(text) * len(predicates),
+        'predicates_cold_ms': predicate_ms[0],
+        'predicates_warm_ms': min(predicate_ms[1:] or predicate_ms),
+        'from_bytes_cold_ms': detect_ms[0],
+        'from_bytes_warm_ms': min(detect_ms[1:] or detect_ms),
+    }
+
+
+def run_worker(mode, table_path, passes, seed, size, memory=False):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.join(LAMBDA_DIR, 'package')
+    # The plugin engine, so that from_bytes goes through the predicates
+    env['CHARSET_NORMALIZER_MD_ENGINE'] = 'plugins'
+    env['CHARSET_NORMALIZER_PROPTABLE'] = table_path if mode == 'file' else ''
+    command = [sys.executable, os.path.abspath(__file__), '--worker', mode,
+               '--passes', str(passes), '--seed', str(seed), '--size', str(size)]
+    if memory:
+        command.append('--memory')
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def run_mode(mode, table_path, passes, seed, size):
+    """Timings from one process, heap usage from a second, traced one"""
+    result = run_worker(mode, table_path, passes, seed, size)
+    result.update(run_worker(mode, table_path, passes, seed, size, memory=True))
+    return result
+
+
+def build_table(path):
+    env = dict(os.environ, PYTHONPATH=os.path.join(LAMBDA_DIR, 'package'))
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, '-c', 'import sys\nfrom charset_normalizer.proptable import build_table\n'
+                               'build_table(sys.argv[1])', path],
+        env=env, check=True
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def print_table(results):
+    print(f"{'mode':<6} {'pred cold ms':>12} {'pred warm ms':>12} {'ns/call':>8} "
+          f"{'detect cold ms':>14} {'detect warm ms':>14} {'heap KB':>9}")
+    for r in results:
+        ns = r['predicates_warm_ms'] * 1e6 / r['predicate_calls']
+        print(f"{r['mode']:<6} {r['predicates_cold_ms']:>12.1f} {r['predicates_warm_ms']:>12.1f} {ns:>8.0f} "
+              f"{r['from_bytes_cold_ms']:>14.1f} {r['from_bytes_warm_ms']:>14.1f} "
+              f"{r['heap_kb']:>9.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--passes', type=int, default=5, help='passes over the text per mode')
+    parser.add_argument('--size', type=int, default=20000, help='characters of synthetic multilingual text')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--worker', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--memory', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        json.dump(worker(args.worker, args.passes, args.seed, args.size, args.memory), sys.stdout)
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix='proptable-') as directory:
+        table_path = os.path.join(directory, 'proptable.bin')
+        build_ms = build_table(table_path) if 'file' in args.modes else None
+        results = [run_mode(mode, table_path, args.passes, args.seed, args.size) for mode in args.modes]
+
+    first = results[0]
+    print(f"{first['characters']} characters ({first['distinct_characters']} distinct), "
+          f"{len(PREDICATES)} predicates each")
+    if build_ms is not None:
+        print(f"Generated the table in {build_ms:.0f} ms")
+    print_table(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(args), 'table_build_ms': build_ms, 'modes': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Helpers shared by the benchmark and load-test drivers."""
+import contextlib
+import math
+import os
+import sys
+import tempfile
+
+LAMBDA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_environment(upstream_environ, cache=False, extra=None):
+    """
+    Point the agents at a MockUpstream (its environ()) and make the handler
+    importable.
+
+    Must run before lambda_function is imported, the agents read their
+    configuration from the environment at import time.
+    """
+    os.environ.update(upstream_environ)
+    os.environ['REPORT_CACHE'] = '1' if cache else '0'
+    if cache:
+        # Start cold, with a private /tmp cache like a fresh container
+        os.environ['REPORT_CACHE_DIR'] = tempfile.mkdtemp(prefix='report-cache-')
+    os.environ.setdefault('HF_RETRY_DELAY', '0.05')
+    os.environ.setdefault('EMF_METRICS', '0')
+    os.environ.update(extra or {})
+
+    # Handler modules first, vendored dependencies (requests, ...) after
+    for path in (os.path.join(LAMBDA_DIR, 'package'), LAMBDA_DIR):
+        if path in sys.path:
+            sys.path.remove(path)
+    sys.path.insert(0, os.path.join(LAMBDA_DIR, 'package'))
+    sys.path.insert(0, LAMBDA_DIR)
+
+
+def import_handler():
+    import lambda_function
+    return lambda_function.lambda_handler
+
+
+def percentile(sorted_samples, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return None
+    rank = max(int(math.ceil(p / 100.0 * len(sorted_samples))) - 1, 0)
+    return sorted_samples[rank]
+
+
+def latency_summary(samples):
+    samples = sorted(samples)
+    return {
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'max': samples[-1] if samples else None
+    }
+
+
+@contextlib.contextmanager
+def quiet(enabled=True):
+    """Silence the handler's print statements while measuring"""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
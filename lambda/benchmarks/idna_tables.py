@@ -0,0 +1,156 @@
+"""
+Benchmark for the IDNA tables of the bundled idna package.
+
+Compares, each in fresh processes, what the first IDNA use costs:
+
+    modules  importing the generated uts46data/idnadata modules (what idna
+             did before idna.tables, and still does to build a missing table)
+    lazy     first encode with tables built from those modules (no data file)
+    file     first encode with the tables memory-mapped from idnatables.bin
+
+By default nothing is read from __pycache__, like in a bundle built without
+bytecode (on another Python than the target); --pyc allows cached bytecode,
+like in a bundle with pre-compiled bytecode:
+
+    python benchmarks/idna_tables.py --runs 5 --json idna.json
+
+For every mode it reports the median cold time and the resident memory
+(RSS) it added, then the warm cost per encoded domain.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+LAMBDA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = ['modules', 'lazy', 'file']
+
+DOMAINS = [
+    'example.com', 'bücher.example', 'straße.de', 'ÖBB.at', 'пример.рф', 'παράδειγμα.δοκιμή',
+    '例え.テスト', 'مثال.إختبار', 'उदाहरण.परीक्षा', '실례.테스트', 'api.newsapi.org', 'finance.yahoo.com'
+]
+
+
+def resident_kb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:  # Not Linux: peak instead of current
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def worker(mode, passes):
+    import idna
+    # The standard library ships bytecode, only time the idna side
+    'bücher'.encode('punycode')
+    before_kb = resident_kb()
+    start = time.perf_counter()
+
+    if mode == 'modules':
+        from idna import idnadata, uts46data  # noqa: F401
+    else:
+        for domain in DOMAINS:
+            idna.encode(domain, uts46=True)
+
+    cold_ms = (time.perf_counter() - start) * 1000
+    added_kb = resident_kb() - before_kb
+
+    from idna import tables
+    result = {
+        'mode': mode,
+        'cold_ms': cold_ms,
+        'rss_added_kb': added_kb,
+        'mapped': tables._mapping is not None,
+    }
+
+    if mode != 'modules':
+        start = time.perf_counter()
+        for _ in range(passes):
+            for domain in DOMAINS:
+                idna.encode(domain, uts46=True)
+        result['warm_us_per_domain'] = (time.perf_counter() - start) * 1e6 / (passes * len(DOMAINS))
+
+    return result
+
+
+def run_worker(mode, table_path, passes, pyc):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.join(LAMBDA_DIR, 'package')
+    env['IDNA_TABLES'] = table_path if mode == 'file' else ''
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    with tempfile.TemporaryDirectory(prefix='idna-pyc-') as empty:
+        if not pyc:
+            # An empty bytecode cache: every module is compiled from source
+            env['PYTHONPYCACHEPREFIX'] = empty
+        command = [sys.executable, os.path.abspath(__file__), '--worker', mode, '--passes', str(passes)]
+        output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def build_tables(path):
+    env = dict(os.environ, PYTHONPATH=os.path.join(LAMBDA_DIR, 'package'))
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, '-c', 'import sys\nfrom idna.tables import build_tables\nbuild_tables(sys.argv[1])', path],
+        env=env, check=True
+    )
+    return (time.perf_counter() - start) * 1000, os.path.getsize(path)
+
+
+def summarize(runs):
+    summary = {
+        'mode': runs[0]['mode'],
+        'mapped': runs[0]['mapped'],
+        'cold_ms': statistics.median(r['cold_ms'] for r in runs),
+        'rss_added_kb': statistics.median(r['rss_added_kb'] for r in runs),
+    }
+    if 'warm_us_per_domain' in runs[0]:
+        summary['warm_us_per_domain'] = statistics.median(r['warm_us_per_domain'] for r in runs)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--runs', type=int, default=5, help='fresh processes per mode')
+    parser.add_argument('--passes', type=int, default=200, help='warm passes over the domains')
+    parser.add_argument('--pyc', action='store_true', help='allow cached bytecode')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--worker', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        json.dump(worker(args.worker, args.passes), sys.stdout)
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix='idnatables-') as directory:
+        table_path = os.path.join(directory, 'idnatables.bin')
+        build_ms, table_size = build_tables(table_path)
+        results = [
+            summarize([run_worker(mode, table_path, args.passes, args.pyc) for _ in range(args.runs)])
+            for mode in args.modes
+        ]
+
+    print(f"Generated the data file ({table_size // 1024} KB) in {build_ms:.0f} ms; "
+          f"bytecode {'cached' if args.pyc else 'compiled from source'}")
+    print(f"{'mode':<8} {'cold ms':>8} {'RSS +KB':>8} {'warm us/domain':>15}")
+    for r in results:
+        warm = f"{r['warm_us_per_domain']:.1f}" if 'warm_us_per_domain' in r else '-'
+        print(f"{r['mode']:<8} {r['cold_ms']:>8.1f} {r['rss_added_kb']:>8.0f} {warm:>15}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(args), 'table_build_ms': build_ms, 'table_bytes': table_size,
+                       'modes': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
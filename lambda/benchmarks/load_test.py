@@ -0,0 +1,217 @@
+"""
+Load generator for lambda_handler against the local upstream stand-ins.
+
+Ramps the number of concurrent callers and, at each step, keeps every
+caller invoking the handler in a closed loop for --duration seconds:
+
+    python benchmarks/load_test.py --ramp 1 2 4 8 16 --duration 10 --mode thread
+
+--mode thread runs all callers in one process, like concurrent work sharing
+one warm container (shared module state, connection pool, caches).
+--mode process gives each caller its own process, like separate containers.
+
+Each invocation gets a fake Lambda context with a deadline; invocations that
+run past it are counted as timeouts.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import import_handler, latency_summary, prepare_environment, quiet
+from mock_upstream import MockUpstream
+
+# Popular tickers first, picked with Zipf-like weights
+TICKERS = [
+    'Tesla stock', 'Apple stock', 'Nvidia stock', 'Microsoft stock', 'Amazon stock',
+    'Meta stock', 'Google stock', 'S&P 500', 'bitcoin', 'oil prices',
+    'Federal Reserve', 'inflation', 'Netflix stock', 'Intel stock', 'Boeing stock',
+    'JPMorgan stock', 'gold prices', 'Ford stock', 'AMD stock', 'Coinbase stock'
+]
+TICKER_WEIGHTS = [1.0 / (rank + 1) for rank in range(len(TICKERS))]
+
+# Share of each request shape in the generated traffic
+REQUEST_MIX = [('single', 0.75), ('basket', 0.15), ('stream', 0.10)]
+
+
+class FakeContext:
+    """Minimal stand-in for the Lambda context object"""
+
+    def __init__(self, timeout_ms, function_name='financial-agent', memory_limit_in_mb=512):
+        self.aws_request_id = str(uuid.uuid4())
+        self.function_name = function_name
+        self.memory_limit_in_mb = memory_limit_in_mb
+        self.deadline = time.monotonic() + timeout_ms / 1000.0
+
+    def get_remaining_time_in_millis(self):
+        return max(int((self.deadline - time.monotonic()) * 1000), 0)
+
+
+def make_event(rng, max_articles):
+    """One API Gateway style event drawn from the request mix"""
+    shape = rng.choices([s for s, _ in REQUEST_MIX], weights=[w for _, w in REQUEST_MIX])[0]
+    if shape == 'basket':
+        basket = rng.sample(TICKERS, rng.randint(3, 8))
+        body = {'queries': basket, 'max_articles': max_articles}
+    else:
+        body = {'query': rng.choices(TICKERS, weights=TICKER_WEIGHTS)[0], 'max_articles': max_articles}
+        if shape == 'stream':
+            body['stream'] = 'ndjson'
+    return shape, {
+        'body': json.dumps(body),
+        'headers': {'Content-Type': 'application/json', 'Accept-Encoding': 'gzip'},
+        'requestContext': {'http': {'method': 'POST'}}
+    }
+
+
+def caller_loop(handler, duration, seed, max_articles, timeout_ms):
+    """Invoke the handler back to back until duration elapses"""
+    rng = random.Random(seed)
+    samples = []
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        shape, event = make_event(rng, max_articles)
+        context = FakeContext(timeout_ms)
+        start = time.perf_counter()
+        try:
+            status = handler(event, context)['statusCode']
+        except Exception:
+            status = 'exception'
+        latency = (time.perf_counter() - start) * 1000
+        samples.append((shape, latency, status, context.get_remaining_time_in_millis() == 0))
+    return samples
+
+
+# --- process mode ----------------------------------------------------------
+
+_process_handler = None
+
+
+def _init_process(upstream_environ, cache):
+    global _process_handler
+    prepare_environment(upstream_environ, cache=cache)
+    _process_handler = import_handler()
+
+
+def _process_caller(duration, seed, max_articles, timeout_ms, verbose):
+    with quiet(not verbose):
+        return caller_loop(_process_handler, duration, seed, max_articles, timeout_ms)
+
+
+def agent_environ(args, upstream):
+    """Environment for the handler: the mock upstream plus agent options"""
+    return dict(upstream.environ(), HF_HEDGE='1' if args.hedge else '0')
+
+
+def run_step(args, upstream, concurrency, step):
+    seeds = [args.seed * 1000 + step * 100 + i for i in range(concurrency)]
+    start = time.perf_counter()
+
+    if args.mode == 'process':
+        with ProcessPoolExecutor(
+            max_workers=concurrency,
+            initializer=_init_process,
+            initargs=(agent_environ(args, upstream), args.cache)
+        ) as pool:
+            futures = [
+                pool.submit(_process_caller, args.duration, seed, args.max_articles, args.timeout_ms, args.verbose)
+                for seed in seeds
+            ]
+            samples = [s for f in futures for s in f.result()]
+    else:
+        handler = import_handler()
+        with quiet(not args.verbose), ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [
+                pool.submit(caller_loop, handler, args.duration, seed, args.max_articles, args.timeout_ms)
+                for seed in seeds
+            ]
+            samples = [s for f in futures for s in f.result()]
+
+    elapsed = time.perf_counter() - start
+    errors = sum(1 for _, _, status, _ in samples if status != 200)
+    timeouts = sum(1 for _, _, _, timed_out in samples if timed_out)
+    by_shape = {}
+    for shape, latency, _, _ in samples:
+        by_shape.setdefault(shape, []).append(latency)
+
+    return {
+        'concurrency': concurrency,
+        'requests': len(samples),
+        'throughput_rps': len(samples) / elapsed if elapsed else None,
+        'error_rate': errors / len(samples) if samples else None,
+        'timeout_rate': timeouts / len(samples) if samples else None,
+        'latency_ms': latency_summary([latency for _, latency, _, _ in samples]),
+        'latency_by_shape_ms': {shape: latency_summary(values) for shape, values in by_shape.items()}
+    }
+
+
+def print_step(result):
+    lat = result['latency_ms']
+    print(f"{result['concurrency']:>5} {result['requests']:>7} {result['throughput_rps']:>8.1f} "
+          f"{lat['p50']:>8.1f} {lat['p95']:>8.1f} {lat['p99']:>8.1f} {lat['max']:>8.1f} "
+          f"{result['error_rate'] * 100:>6.1f}% {result['timeout_rate'] * 100:>6.1f}%", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ramp', type=int, nargs='+', default=[1, 2, 4, 8, 16], help='concurrency per step')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per step')
+    parser.add_argument('--mode', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--max-articles', type=int, default=5)
+    parser.add_argument('--timeout-ms', type=int, default=30000, help='fake Lambda timeout')
+    parser.add_argument('--cache', action='store_true', help='enable the report cache')
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='upstream latency')
+    parser.add_argument('--jitter-ms', type=float, default=50.0, help='random extra upstream latency')
+    parser.add_argument('--error-rate', type=float, default=0.01, help='fraction of upstream calls that fail')
+    parser.add_argument('--rate-limit', metavar='N/SECONDS',
+                        help='upstream rate limit per API, e.g. 100/10 (default: none)')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='fraction of upstream calls that are slow')
+    parser.add_argument('--slow-ms', type=float, default=1000.0, help='extra latency of a slow call')
+    parser.add_argument('--hedge', action='store_true', help='hedge slow inference calls (HF_HEDGE)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--verbose', action='store_true', help="show the handler's logs")
+    args = parser.parse_args(argv)
+
+    rate_limit = None
+    if args.rate_limit:
+        limit, _, window = args.rate_limit.partition('/')
+        rate_limit = (int(limit), float(window or 1))
+
+    upstream = MockUpstream(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        rate_limit=rate_limit,
+        seed=args.seed
+    ).start()
+
+    results = []
+    try:
+        prepare_environment(agent_environ(args, upstream), cache=args.cache)
+        print(f"{'conc':>5} {'req':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'max ms':>8} {'errors':>7} {'timeouts':>7}")
+        for step, concurrency in enumerate(args.ramp):
+            result = run_step(args, upstream, concurrency, step)
+            results.append(result)
+            print_step(result)
+    finally:
+        upstream.stop()
+
+    print(f"Upstream calls: {upstream.requests}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(args), 'steps': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
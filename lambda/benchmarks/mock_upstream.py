@@ -0,0 +1,216 @@
+"""
+Local stand-in for NewsAPI and the HuggingFace inference API.
+
+Replays the recorded responses in fixtures/ with configurable latency (and
+an occasional slow response), error injection and a fixed-window rate limit
+per API, so the pipeline can be benchmarked without network access.
+
+    with MockUpstream(latency_ms=50, error_rate=0.05) as upstream:
+        os.environ.update(upstream.environ())
+        ...
+"""
+import json
+import math
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class MockUpstream:
+    """Threaded HTTP server answering /v2/everything and /models/ProsusAI/finbert"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 error_statuses=(500, 503), rate_limit=None, slow_rate=0.0, slow_ms=0,
+                 seed=0, host='127.0.0.1', port=0):
+        """
+        rate_limit is (requests, window seconds) allowed per API, or None.
+        A slow_rate fraction of responses take slow_ms longer.
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.rate_limit = rate_limit
+        self.windows = {}
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.articles = load_fixture('newsapi_everything.json')['articles']
+        self.sentiments = load_fixture('hf_finbert.json')[0]
+        self.requests = {'news': 0, 'inference': 0, 'errors': 0, 'rate_limited': 0}
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environ(self):
+        """Environment variables pointing the agents at this server"""
+        return {
+            'NEWS_API_URL': self.base_url + '/v2/everything',
+            'NEWS_API_KEY': 'benchmark',
+            'HF_API_URL': self.base_url + '/models/ProsusAI/finbert',
+            'HUGGINGFACE_API_KEY': 'benchmark'
+        }
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- responses ---------------------------------------------------------
+
+    def news_page(self, query, page_size):
+        """pageSize articles, rotated per query so queries partially overlap"""
+        offset = zlib.crc32(query.encode('utf-8')) % len(self.articles)
+        page = []
+        for i in range(page_size):
+            article = dict(self.articles[(offset + i) % len(self.articles)])
+            cycle = (offset + i) // len(self.articles)
+            if cycle:
+                article['title'] = f"{article['title']} ({cycle})"
+            page.append(article)
+        return {'status': 'ok', 'totalResults': len(page), 'articles': page}
+
+    def label_scores(self, text):
+        """Recorded label scores, rotated per text so labels vary"""
+        shift = zlib.crc32(text.encode('utf-8')) % len(self.sentiments)
+        labels = [s['label'] for s in self.sentiments]
+        labels = labels[shift:] + labels[:shift]
+        return [{'label': label, 'score': s['score']} for label, s in zip(labels, self.sentiments)]
+
+    def count(self, name):
+        with self.lock:
+            self.requests[name] += 1
+
+    def take_quota(self, name):
+        """Count one request against name's window: (allowed, rate-limit headers)"""
+        if not self.rate_limit:
+            return True, {}
+        limit, window = self.rate_limit
+        with self.lock:
+            now = time.monotonic()
+            start, used = self.windows.get(name, (now, 0))
+            if now - start >= window:
+                start, used = now, 0
+            allowed = used < limit
+            if allowed:
+                used += 1
+            self.windows[name] = (start, used)
+            reset = max(window - (now - start), 0.0)
+
+        headers = {
+            'X-RateLimit-Limit': str(limit),
+            'X-RateLimit-Remaining': str(limit - used),
+            'X-RateLimit-Reset': f"{reset:.3f}"
+        }
+        if not allowed:
+            headers['Retry-After'] = str(math.ceil(reset))
+        return allowed, headers
+
+    def _delay_and_maybe_fail(self):
+        with self.lock:
+            delay = self.latency_ms + self.random.uniform(0, self.jitter_ms)
+            if self.slow_rate and self.random.random() < self.slow_rate:
+                delay += self.slow_ms
+            fail = self.random.random() < self.error_rate
+            status = self.random.choice(self.error_statuses) if fail else None
+        if delay:
+            time.sleep(delay / 1000.0)
+        return status
+
+    def _handler_class(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload, headers=None):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_error(self, status):
+                upstream.count('errors')
+                if status == 429:
+                    self._send(429, {'error': 'Rate limit reached'}, {'Retry-After': '1'})
+                elif status == 503:
+                    self._send(503, {'error': 'Model is loading', 'estimated_time': 1.0})
+                else:
+                    self._send(status, {'error': 'Injected failure'})
+
+            def _rate_limited(self, headers):
+                upstream.count('rate_limited')
+                self._send(429, {'error': 'Rate limit reached'}, headers)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path != '/v2/everything':
+                    return self._send(404, {'error': 'Not found'})
+                upstream.count('news')
+                allowed, limit_headers = upstream.take_quota('news')
+                if not allowed:
+                    return self._rate_limited(limit_headers)
+                status = upstream._delay_and_maybe_fail()
+                if status:
+                    return self._send_error(status)
+
+                params = parse_qs(url.query)
+                query = params.get('q', [''])[0]
+                page_size = int(params.get('pageSize', ['20'])[0])
+                self._send(200, upstream.news_page(query, page_size), limit_headers)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if not self.path.startswith('/models/'):
+                    return self._send(404, {'error': 'Not found'})
+                upstream.count('inference')
+                allowed, limit_headers = upstream.take_quota('inference')
+                if not allowed:
+                    return self._rate_limited(limit_headers)
+                status = upstream._delay_and_maybe_fail()
+                if status:
+                    return self._send_error(status)
+
+                inputs = payload.get('inputs', '')
+                if isinstance(inputs, list):
+                    self._send(200, [upstream.label_scores(text) for text in inputs], limit_headers)
+                else:
+                    self._send(200, [upstream.label_scores(inputs)], limit_headers)
+
+        return Handler
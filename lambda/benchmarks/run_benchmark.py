@@ -0,0 +1,209 @@
+"""
+Offline benchmark for lambda_handler.
+
+Replays recorded NewsAPI / HuggingFace responses through a local mock server
+and drives the handler at several article counts and concurrency levels:
+
+    python benchmarks/run_benchmark.py --articles 5 10 20 --concurrency 1 4 8 \
+        --latency-ms 50 --jitter-ms 20 --error-rate 0.02 --json results.json
+
+Pass --baseline with an earlier --json output to fail (exit code 1) when p95
+latency or throughput regress by more than --max-regression.
+
+--memory-profile records tracemalloc snapshots and RSS around fetch_news,
+analyze_sentiment and generate_report (see memory_profile.py) and prints the
+top allocating call sites per stage; --memory-budget-mb and --stage-budget
+fail the run when peak RSS or a stage's allocation peak exceed the budget:
+
+    python benchmarks/run_benchmark.py --concurrency 1 --memory-profile \
+        --memory-budget-mb 128 --stage-budget fetch_news=2 --stage-budget generate_report=0.5
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import import_handler, latency_summary, prepare_environment, quiet
+from mock_upstream import MockUpstream
+
+QUERIES = ['Tesla stock', 'Apple stock', 'Nvidia earnings', 'oil prices', 'Federal Reserve', 'bitcoin']
+
+
+def peak_rss_mb():
+    from memory_profile import peak_rss_mb
+    return peak_rss_mb()
+
+
+def parse_stage_budgets(values):
+    budgets = {}
+    for value in values or []:
+        stage, _, mb = value.partition('=')
+        budgets[stage] = float(mb)
+    return budgets
+
+
+def print_memory_profile(stages):
+    print(f"{'stage':<20} {'calls':>6} {'peak KB':>9} {'net KB':>9} {'RSS MB':>7}  top call sites")
+    for name, stage in sorted(stages.items()):
+        sites = ', '.join(f"{s['site']} ({s['size_kb']} KB)" for s in stage['top_sites'][:3])
+        print(f"{name:<20} {stage['calls']:>6} {stage['peak_kb']:>9.1f} {stage['net_kb']:>9.1f} "
+              f"{stage['rss_mb']:>7.1f}  {sites}")
+
+
+def run_scenario(handler, articles, concurrency, total_requests, seed=0, trace_memory=False):
+    """Invoke the handler total_requests times with `concurrency` threads"""
+    rng = random.Random(seed)
+    events = [{'query': rng.choice(QUERIES), 'max_articles': articles} for _ in range(total_requests)]
+
+    def invoke(event):
+        start = time.perf_counter()
+        response = handler(dict(event), None)
+        return (time.perf_counter() - start) * 1000, response['statusCode']
+
+    # Warm up connections and lazy imports outside the measurement
+    handler(dict(events[0]), None)
+
+    if trace_memory:
+        tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(invoke, events))
+    elapsed = time.perf_counter() - start
+
+    latencies = [ms for ms, _ in results]
+    errors = sum(1 for _, status in results if status != 200)
+    result = {
+        'articles': articles,
+        'concurrency': concurrency,
+        'requests': total_requests,
+        'errors': errors,
+        'throughput_rps': total_requests / elapsed if elapsed else None,
+        'latency_ms': latency_summary(latencies),
+        'peak_rss_mb': peak_rss_mb()
+    }
+    if trace_memory:
+        result['traced_peak_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    return result
+
+
+def scenario_key(result):
+    return f"a{result['articles']}-c{result['concurrency']}"
+
+
+def compare(results, baseline, max_regression):
+    """Return a list of regression messages against a previous run"""
+    previous = {scenario_key(r): r for r in baseline.get('scenarios', [])}
+    problems = []
+    for result in results:
+        old = previous.get(scenario_key(result))
+        if not old:
+            continue
+        p95, old_p95 = result['latency_ms']['p95'], old['latency_ms']['p95']
+        if old_p95 and p95 > old_p95 * (1 + max_regression):
+            problems.append(f"{scenario_key(result)}: p95 {old_p95:.1f} -> {p95:.1f} ms")
+        rps, old_rps = result['throughput_rps'], old['throughput_rps']
+        if old_rps and rps < old_rps * (1 - max_regression):
+            problems.append(f"{scenario_key(result)}: throughput {old_rps:.1f} -> {rps:.1f} req/s")
+    return problems
+
+
+def print_table(results):
+    print(f"{'articles':>8} {'conc':>5} {'req':>5} {'err':>4} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rss MB':>7} {'traced MB':>9}")
+    for r in results:
+        lat = r['latency_ms']
+        traced = r.get('traced_peak_mb')
+        print(f"{r['articles']:>8} {r['concurrency']:>5} {r['requests']:>5} {r['errors']:>4} "
+              f"{r['throughput_rps']:>8.1f} {lat['p50']:>8.1f} {lat['p95']:>8.1f} {lat['p99']:>8.1f} "
+              f"{r['peak_rss_mb'] or 0:>7.1f} {traced if traced is not None else float('nan'):>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, nargs='+', default=[5, 10, 20])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--requests', type=int, default=40, help='invocations per scenario')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='upstream latency')
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help='random extra upstream latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of upstream calls that fail')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='fraction of upstream calls that are slow')
+    parser.add_argument('--slow-ms', type=float, default=1000.0, help='extra latency of a slow call')
+    parser.add_argument('--hedge', action='store_true', help='hedge slow inference calls (HF_HEDGE)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--memory', action='store_true', help='trace Python allocations (slower)')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--baseline', help='previous --json output to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.25)
+    parser.add_argument('--memory-profile', action='store_true', help='per-stage allocation profile')
+    parser.add_argument('--memory-budget-mb', type=float, help='fail if peak RSS exceeds this')
+    parser.add_argument('--stage-budget', action='append', metavar='STAGE=MB',
+                        help='fail if a stage allocates more than MB at peak (repeatable)')
+    parser.add_argument('--verbose', action='store_true', help="show the handler's logs")
+    args = parser.parse_args(argv)
+
+    upstream = MockUpstream(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        seed=args.seed
+    ).start()
+
+    try:
+        prepare_environment(upstream.environ(), extra={
+            'MEMORY_PROFILE': '1' if args.memory_profile else '0',
+            'HF_HEDGE': '1' if args.hedge else '0'
+        })
+        handler = import_handler()
+        if args.memory:
+            tracemalloc.start()
+
+        results = []
+        for articles in args.articles:
+            for concurrency in args.concurrency:
+                with quiet(not args.verbose):
+                    results.append(run_scenario(
+                        handler, articles, concurrency, args.requests, args.seed, args.memory
+                    ))
+    finally:
+        upstream.stop()
+
+    print_table(results)
+    print(f"Upstream calls: {upstream.requests}")
+
+    output = {
+        'config': vars(args),
+        'scenarios': results
+    }
+    problems = []
+    if args.memory_profile or args.memory_budget_mb or args.stage_budget:
+        import memory_profile
+        output['memory_profile'] = memory_profile.summary()
+        if args.memory_profile:
+            print_memory_profile(output['memory_profile'])
+        for problem in memory_profile.check_budget(args.memory_budget_mb, parse_stage_budgets(args.stage_budget)):
+            problems.append(f"MEMORY {problem}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            problems += [f"REGRESSION {p}" for p in compare(results, json.load(f), args.max_regression)]
+
+    for problem in problems:
+        print(problem)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,400 @@
+"""
+Build lambda_deployment.zip for the Lambda Linux runtime from deployment_manifest.json.
+
+    python build_package.py                      # x86_64, writes lambda_deployment.zip
+    python build_package.py --arch arm64 --optional --output arm64.zip
+    python build_package.py --verify-only lambda_deployment.zip
+
+Steps:
+  1. pip installs the manifest's requirements as manylinux wheels for the
+     target Python (never sdists, never the host platform's wheels)
+  2. overlays the packages listed under "vendored" from package/, which carry
+     local changes, and copies the handler modules
+  3. strips tests, caches, type stubs, C sources and install records
+  4. pre-compiles bytecode (hash-based, so it does not depend on mtimes)
+     and generates the manifest's data tables (charset_normalizer's
+     character property table), when this interpreter matches the target
+     version
+  5. writes a deterministic zip: sorted entries, fixed timestamps and modes
+  6. verifies the bundle: every extension module must be a Linux ELF file
+     for the target architecture, and, when the host can load it, every
+     handler and native module is imported and any module that fell back
+     to pure Python is reported
+
+Exits non-zero when verification fails. Needs network access for pip.
+"""
+import argparse
+import compileall
+import fnmatch
+import json
+import os
+import platform
+import py_compile
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+LAMBDA_DIR = os.path.dirname(os.path.abspath(__file__))
+VENDOR_DIR = os.path.join(LAMBDA_DIR, 'package')
+
+# ELF e_machine values
+ELF_MACHINES = {'x86_64': 62, 'arm64': 183}
+HOST_ARCHES = {'x86_64': 'x86_64', 'amd64': 'x86_64', 'aarch64': 'arm64', 'arm64': 'arm64'}
+
+# Fixed timestamp for zip entries (SOURCE_DATE_EPOCH when set)
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+# Where Lambda unpacks the bundle; recorded as the source path in bytecode
+TASK_ROOT = '/var/task'
+
+
+def load_manifest(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def run(cmd):
+    print('+ ' + ' '.join(cmd), flush=True)
+    subprocess.run(cmd, check=True)
+
+
+# --- build -----------------------------------------------------------------
+
+def install_requirements(manifest, arch, target, optional=False):
+    requirements = list(manifest['requirements'])
+    if optional:
+        requirements += manifest.get('optional_requirements', [])
+
+    cmd = [
+        sys.executable, '-m', 'pip', 'install',
+        '--target', target,
+        '--implementation', 'cp',
+        '--python-version', manifest['python'],
+        '--only-binary=:all:',
+        '--no-compile',
+        '--no-cache-dir',
+        '--disable-pip-version-check',
+        '--quiet'
+    ]
+    for tag in manifest['platforms'][arch]:
+        cmd += ['--platform', tag]
+    run(cmd + requirements)
+
+
+def overlay_vendored(manifest, target):
+    """Copy locally modified packages from package/ over the installed wheels"""
+    for name in manifest.get('vendored', []):
+        source = os.path.join(VENDOR_DIR, name)
+        for root, dirs, files in os.walk(source):
+            dirs[:] = [d for d in dirs if d != '__pycache__']
+            dest = os.path.join(target, os.path.relpath(root, VENDOR_DIR))
+            os.makedirs(dest, exist_ok=True)
+            for filename in files:
+                # Sources only: extension modules come from the Linux wheel
+                if filename.endswith('.py'):
+                    shutil.copyfile(os.path.join(root, filename), os.path.join(dest, filename))
+
+
+def copy_handlers(manifest, target):
+    for filename in manifest['handlers']:
+        shutil.copyfile(os.path.join(LAMBDA_DIR, filename), os.path.join(target, filename))
+
+
+def is_excluded(relpath, patterns):
+    parts = relpath.split(os.sep)
+    for pattern in patterns:
+        if '/' in pattern:
+            # Path patterns match the end of the path
+            if fnmatch.fnmatch('/'.join(parts), '*' + pattern):
+                return True
+        elif any(fnmatch.fnmatch(part, pattern) for part in parts):
+            return True
+    return False
+
+
+def strip(manifest, target):
+    """Delete files matching the manifest's exclude patterns, returning bytes saved"""
+    patterns = manifest.get('exclude', [])
+    saved = 0
+    for root, dirs, files in os.walk(target, topdown=True):
+        for d in list(dirs):
+            path = os.path.join(root, d)
+            if is_excluded(os.path.relpath(path, target), patterns):
+                saved += sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(path) for f in fs)
+                shutil.rmtree(path)
+                dirs.remove(d)
+        for filename in files:
+            path = os.path.join(root, filename)
+            if is_excluded(os.path.relpath(path, target), patterns):
+                saved += os.path.getsize(path)
+                os.remove(path)
+    return saved
+
+
+def compile_bytecode(manifest, target):
+    """Pre-compile .pyc files, only possible with the target's Python version"""
+    host = f"{sys.version_info[0]}.{sys.version_info[1]}"
+    if host != manifest['python']:
+        print(f"Skipping bytecode: this is Python {host}, the target is {manifest['python']}")
+        return False
+    ok = compileall.compile_dir(
+        target, ddir=TASK_ROOT, quiet=1, workers=0,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH
+    )
+    if not ok:
+        raise SystemExit('compileall failed')
+    return True
+
+
+DATA_TABLE_BUILDER = r"""
+import importlib, sys
+sys.path.insert(0, sys.argv[1])
+module, _, function = sys.argv[2].partition(':')
+getattr(importlib.import_module(module), function)(sys.argv[3])
+"""
+
+
+def build_data_tables(manifest, target):
+    """
+    Generate the manifest's data tables inside the bundle. They depend on the
+    Python version (its Unicode database), so only with the target's Python.
+    """
+    tables = manifest.get('data_tables', {})
+    host = f"{sys.version_info[0]}.{sys.version_info[1]}"
+    if not tables or host != manifest['python']:
+        return []
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    env.pop('PYTHONPATH', None)
+    for relpath, builder in sorted(tables.items()):
+        subprocess.run(
+            [sys.executable, '-S', '-c', DATA_TABLE_BUILDER, target, builder, os.path.join(target, relpath)],
+            check=True, env=env, cwd=target
+        )
+    return sorted(tables)
+
+
+def write_zip(source, output):
+    """Zip source deterministically: sorted entries, fixed timestamps and modes"""
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    date_time = ZIP_EPOCH
+    if epoch:
+        date_time = time.gmtime(max(int(epoch), 315532800))[:6]
+
+    paths = []
+    for root, dirs, files in os.walk(source):
+        for filename in files:
+            path = os.path.join(root, filename)
+            paths.append(os.path.relpath(path, source).replace(os.sep, '/'))
+
+    tmp = output + '.tmp'
+    with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        for name in sorted(paths):
+            info = zipfile.ZipInfo(name, date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            executable = name.endswith('.so') or os.access(os.path.join(source, name), os.X_OK)
+            info.external_attr = (0o100755 if executable else 0o100644) << 16
+            info.create_system = 3
+            with open(os.path.join(source, name), 'rb') as f:
+                zf.writestr(info, f.read(), compresslevel=9)
+    os.replace(tmp, output)
+
+
+# --- verify ----------------------------------------------------------------
+
+def module_name(relpath):
+    """charset_normalizer/md.cpython-311-x86_64-linux-gnu.so -> charset_normalizer.md"""
+    parts = relpath.replace(os.sep, '/').split('/')
+    parts[-1] = parts[-1].split('.', 1)[0]
+    return '.'.join(parts)
+
+
+def elf_machine(path):
+    """e_machine of an ELF file, or None if it is not ELF"""
+    with open(path, 'rb') as f:
+        header = f.read(20)
+    if header[:4] != b'\x7fELF':
+        return None
+    byteorder = 'little' if header[5] == 1 else 'big'
+    return int.from_bytes(header[18:20], byteorder)
+
+
+def check_extensions(root, arch):
+    """Every extension module, with a problem string for those that cannot load on the target"""
+    results = []
+    for dirpath, _, files in os.walk(root):
+        for filename in sorted(files):
+            if not (filename.endswith('.so') or filename.endswith('.pyd')):
+                continue
+            path = os.path.join(dirpath, filename)
+            relpath = os.path.relpath(path, root)
+            machine = elf_machine(path)
+            problem = None
+            if machine is None:
+                problem = 'not a Linux (ELF) binary'
+            elif machine != ELF_MACHINES[arch]:
+                problem = f'built for another architecture (ELF machine {machine})'
+            elif 'darwin' in filename or filename.endswith('.pyd'):
+                problem = 'wrong platform tag'
+            results.append((module_name(relpath), relpath, problem))
+    return sorted(results)
+
+
+IMPORT_PROBE = r"""
+import importlib, json, sys
+sys.path.insert(0, sys.argv[1])
+report = {}
+for name in json.loads(sys.argv[2]):
+    try:
+        module = importlib.import_module(name)
+        report[name] = {'file': getattr(module, '__file__', None)}
+    except Exception as e:
+        report[name] = {'error': f"{type(e).__name__}: {e}"}
+print(json.dumps(report))
+"""
+
+
+def import_probe(root, names):
+    """Import names from root in a fresh interpreter, returning {name: file or error}"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    env.pop('PYTHONPATH', None)
+    result = subprocess.run(
+        [sys.executable, '-S', '-c', IMPORT_PROBE, root, json.dumps(names)],
+        capture_output=True, text=True, env=env, cwd=root
+    )
+    if result.returncode:
+        raise SystemExit(f"import probe failed:\n{result.stderr}")
+    return json.loads(result.stdout)
+
+
+def host_matches(manifest, arch):
+    host_arch = HOST_ARCHES.get(platform.machine().lower())
+    host_python = f"{sys.version_info[0]}.{sys.version_info[1]}"
+    return sys.platform.startswith('linux') and host_arch == arch and host_python == manifest['python']
+
+
+def verify(manifest, root, arch, optional=False):
+    """Print a verification report for an unpacked bundle, returning the number of failures"""
+    failures = 0
+    print(f"\nVerifying bundle for linux/{arch}, Python {manifest['python']}")
+
+    extensions = check_extensions(root, arch)
+    for name, relpath, problem in extensions:
+        print(f"  {'FAIL' if problem else 'ok  '} {relpath}" + (f": {problem}" if problem else ''))
+        failures += bool(problem)
+
+    expected = list(manifest.get('native_modules', []))
+    optional_expected = list(manifest.get('optional_native_modules', []))
+    if optional:
+        expected += optional_expected
+    shipped = {name for name, _, problem in extensions if not problem}
+    for name in expected:
+        if name not in shipped:
+            print(f"  FAIL {name}: no Linux extension module in the bundle")
+            failures += 1
+
+    for relpath in sorted(manifest.get('data_tables', {})):
+        if os.path.exists(os.path.join(root, relpath)):
+            print(f"  ok   {relpath}")
+        else:
+            # Not fatal: the table is then built lazily at run time
+            print(f"  note {relpath} missing (not built with Python {manifest['python']})")
+
+    if not host_matches(manifest, arch):
+        print(f"  Import check skipped: this host ({sys.platform}/{platform.machine()}, "
+              f"Python {sys.version_info[0]}.{sys.version_info[1]}) cannot load the target's modules")
+        return failures
+
+    handlers = [os.path.splitext(f)[0] for f in manifest['handlers']]
+    natives = sorted({name for name, _, _ in extensions} | set(expected))
+    report = import_probe(root, handlers + natives)
+
+    handlers_ok = 0
+    for name in handlers:
+        if 'error' in report[name]:
+            print(f"  FAIL import {name}: {report[name]['error']}")
+            failures += 1
+        else:
+            handlers_ok += 1
+
+    fallbacks = []
+    for name in natives:
+        entry = report[name]
+        if 'error' in entry:
+            print(f"  FAIL import {name}: {entry['error']}")
+            failures += 1
+        elif not (entry['file'] or '').endswith(('.so', '.pyd')):
+            fallbacks.append(name)
+
+    # Modules that have a compiled build but are loaded as pure Python
+    for name in fallbacks:
+        print(f"  FAIL {name} fell back to pure Python ({os.path.relpath(report[name]['file'], root)})")
+        failures += 1
+
+    native_ok = [name for name in natives if name not in fallbacks and 'error' not in report[name]]
+    print(f"  Imported {handlers_ok} handler modules and {len(native_ok)} native modules: "
+          + (', '.join(native_ok) or 'none'))
+    return failures
+
+
+def verify_zip(manifest, path, arch, optional=False):
+    with tempfile.TemporaryDirectory(prefix='lambda-verify-') as root:
+        with zipfile.ZipFile(path) as zf:
+            zf.extractall(root)
+        return verify(manifest, root, arch, optional)
+
+
+# --- main ------------------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--manifest', default=os.path.join(LAMBDA_DIR, 'deployment_manifest.json'))
+    parser.add_argument('--output', default=os.path.join(LAMBDA_DIR, 'lambda_deployment.zip'))
+    parser.add_argument('--arch', choices=['x86_64', 'arm64'], default='x86_64', help='Lambda architecture')
+    parser.add_argument('--optional', action='store_true',
+                        help='include optional_requirements (brotli, msgpack, orjson)')
+    parser.add_argument('--build-dir', help='stage here and keep it (default: a temporary directory)')
+    parser.add_argument('--skip-verify', action='store_true')
+    parser.add_argument('--verify-only', metavar='ZIP', help='only verify an existing bundle')
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(args.manifest)
+    if args.verify_only:
+        failures = verify_zip(manifest, args.verify_only, args.arch, args.optional)
+        print(f"\n{failures} problem(s)")
+        return 1 if failures else 0
+
+    build_dir = args.build_dir or tempfile.mkdtemp(prefix='lambda-build-')
+    try:
+        if os.path.exists(build_dir):
+            shutil.rmtree(build_dir)
+        os.makedirs(build_dir)
+
+        install_requirements(manifest, args.arch, build_dir, args.optional)
+        overlay_vendored(manifest, build_dir)
+        copy_handlers(manifest, build_dir)
+        saved = strip(manifest, build_dir)
+        print(f"Stripped {saved / 1024:.0f} KB of tests, caches and build files")
+        compiled = compile_bytecode(manifest, build_dir)
+        tables = build_data_tables(manifest, build_dir)
+        if tables:
+            print(f"Generated {', '.join(tables)}")
+
+        write_zip(build_dir, args.output)
+        print(f"Wrote {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB"
+              f"{', with bytecode' if compiled else ''})")
+    finally:
+        if not args.build_dir:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+    if args.skip_verify:
+        return 0
+    failures = verify_zip(manifest, args.output, args.arch, args.optional)
+    print(f"\n{failures} problem(s)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,133 @@
+import codecs
+import json
 import os
-import requests
 
-def fetch_news(query="stock market", max_articles=50):
-    """Fetch news from NewsAPI - Lambda version"""
+import http_client
+from memory_profile import profile_memory
+from records import Article
+from single_flight import SingleFlight
+from tracing import traced
+
+NEWS_API_URL = os.environ.get('NEWS_API_URL', 'https://newsapi.org/v2/everything')
+
+# Bytes read from the NewsAPI response at a time
+NEWS_CHUNK_SIZE = int(os.environ.get('NEWS_CHUNK_SIZE', '8192'))
+
+_WHITESPACE = ' \t\r\n'
+_NUMBER_CHARS = '0123456789+-.eE'
+_decoder = json.JSONDecoder()
+
+# Concurrent fetches of the same page share one NewsAPI request
+_fetches = SingleFlight('fetch_news')
+
+def normalize_query(query):
+    return ' '.join(str(query).lower().split())
+
+def iter_json_array(chunks, key):
+    """
+    Yield the items of the top-level `key` array of a JSON object, parsing
+    the body incrementally from byte chunks.
+    
+    Only one item is decoded at a time, other top-level members are skipped
+    and the rest of the body is not read once the array ends.
+    """
+    decode = codecs.getincrementaldecoder('utf-8')().decode
+    chunks = iter(chunks)
+    buf = ''
+    pos = 0
+    eof = False
+    state = 'object'
+    name = None
+    
+    def value_at(start):
+        """Decode one complete JSON value at start, or None if more data is needed"""
+        if buf[start] in '-0123456789' and not eof:
+            # A number is only complete once something other than a digit,
+            # sign, point or exponent follows it: "350." may go on with "0"
+            end = start
+            while end < len(buf) and buf[end] in _NUMBER_CHARS:
+                end += 1
+            if end == len(buf):
+                return None
+        try:
+            value, end = _decoder.raw_decode(buf, start)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            return None
+        return value, end
+    
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        
+        decoded = None
+        if pos < len(buf):
+            c = buf[pos]
+            if state == 'object':
+                if c != '{':
+                    raise ValueError(f"Expected a JSON object, got {c!r}")
+                pos += 1
+                state = 'key'
+                continue
+            if state == 'key':
+                if c == '}':
+                    return
+                if c == ',':
+                    pos += 1
+                    continue
+                decoded = value_at(pos)
+                if decoded:
+                    name, pos = decoded
+                    state = 'colon'
+                    continue
+            elif state == 'colon':
+                if c != ':':
+                    raise ValueError(f"Expected ':' after {name!r}")
+                pos += 1
+                state = 'array' if name == key else 'skip'
+                continue
+            elif state == 'array':
+                if c == '[':
+                    pos += 1
+                    state = 'item'
+                else:
+                    state = 'skip'
+                continue
+            elif state == 'skip':
+                decoded = value_at(pos)
+                if decoded:
+                    pos = decoded[1]
+                    state = 'key'
+                    continue
+            elif state == 'item':
+                if c == ']':
+                    return
+                if c == ',':
+                    pos += 1
+                    continue
+                decoded = value_at(pos)
+                if decoded:
+                    item, pos = decoded
+                    yield item
+                    continue
+        
+        # Need more data
+        if eof:
+            raise ValueError("Truncated JSON response")
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            buf = buf[pos:] + decode(b'', final=True)
+        else:
+            buf = buf[pos:] + decode(chunk)
+        pos = 0
+
+def iter_news(query="stock market", max_articles=50):
+    """Yield Article objects as they arrive from NewsAPI, without buffering the body"""
     api_key = os.environ.get('NEWS_API_KEY')
     
-    url = "https://newsapi.org/v2/everything"
+    url = NEWS_API_URL
     params = {
         'q': query,
         'language': 'en',
@@ -14,7 +136,16 @@ def fetch_news(query="stock market", max_articles=50):
         'apiKey': api_key
     }
     
-    response = requests.get(url, params=params)
-    articles = response.json().get('articles', [])
-    
-    return [(a['title'], a['description']) for a in articles if a['title']]
\ No newline at end of file
+    with http_client.stream('GET', url, params=params, timeout=30) as response:
+        for raw in iter_json_array(response.iter_content(chunk_size=NEWS_CHUNK_SIZE), 'articles'):
+            if raw.get('title'):
+                yield Article.from_newsapi(raw)
+
+@traced('fetch_news')
+@profile_memory('fetch_news')
+def fetch_news(query="stock market", max_articles=50):
+    """Fetch news from NewsAPI as a list of Article - Lambda version"""
+    key = (normalize_query(query), int(max_articles))
+    news = _fetches.do(key, lambda: list(iter_news(query=query, max_articles=max_articles)))
+    # Callers sharing a fetch each get their own list
+    return list(news)
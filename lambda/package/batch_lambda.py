@@ -0,0 +1,118 @@
+import json
+import os
+import sys
+import uuid
+from collections import deque
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from report_cache import put_report
+from query_pipeline import MAX_ANALYZED, score_queries
+from tracing import instrumented_handler
+
+
+@instrumented_handler
+def lambda_handler(event, context):
+    """
+    SQS batch handler, refreshes cached reports for many queries at once
+
+    Each message body:
+    {
+        "query": "Tesla stock",
+        "max_articles": 10
+    }
+
+    Messages that failed for a transient reason (fetch error, degraded
+    scores) are returned as batchItemFailures so only they are retried
+    (requires ReportBatchItemFailures on the event source mapping). Messages
+    that cannot be parsed would fail the same way every time: they are
+    logged and dropped.
+    """
+    records = event.get('Records', [])
+    print(f"Received {len(records)} messages")
+
+    failures = []
+    pending = []
+    dropped = 0
+    for record in records:
+        try:
+            body = json.loads(record['body'])
+            query = body['query']
+            if not isinstance(query, str) or not query.strip():
+                raise ValueError("'query' must be a non-empty string")
+            max_articles = min(int(body.get('max_articles', MAX_ANALYZED)), MAX_ANALYZED)
+            pending.append((record['messageId'], query, max_articles))
+        except Exception as e:
+            print(f"Dropping invalid message {record.get('messageId')}: {e}")
+            dropped += 1
+
+    results = score_queries([(q, n) for _, q, n in pending])
+
+    for (message_id, query, max_articles), result in zip(pending, results):
+        if isinstance(result, Exception) or result.get('degraded'):
+            # Retried by SQS, degraded scores are not worth caching
+            failures.append(message_id)
+            continue
+        if result.get('articles_analyzed'):
+            put_report(query, max_articles, result)
+
+    print(f"Processed {len(pending) - len(failures)} messages, {len(failures)} failed, {dropped} dropped")
+
+    return {
+        'batchItemFailures': [{'itemIdentifier': m} for m in failures]
+    }
+
+
+class LocalQueue:
+    """
+    In-memory stand-in for an SQS queue, for running the batch handler locally.
+
+    Messages reported as failed are put back until they have been received
+    max_receives times, then moved to dead_letters.
+    """
+
+    def __init__(self, max_receives=3):
+        self.max_receives = max_receives
+        self.messages = deque()
+        self.dead_letters = []
+        self.receive_counts = {}
+
+    def send(self, body):
+        message_id = str(uuid.uuid4())
+        self.messages.append({'messageId': message_id, 'body': json.dumps(body)})
+        return message_id
+
+    def receive(self, max_messages=10):
+        """Pop up to max_messages as an SQS Lambda event"""
+        records = []
+        while self.messages and len(records) < max_messages:
+            record = self.messages.popleft()
+            self.receive_counts[record['messageId']] = self.receive_counts.get(record['messageId'], 0) + 1
+            records.append(record)
+        return {'Records': records}
+
+    def drain(self, handler, batch_size=10, context=None):
+        """Feed the queue to handler until it is empty, requeueing failures"""
+        while self.messages:
+            event = self.receive(batch_size)
+            response = handler(event, context) or {}
+            failed = {f['itemIdentifier'] for f in response.get('batchItemFailures', [])}
+
+            for record in event['Records']:
+                if record['messageId'] not in failed:
+                    continue
+                if self.receive_counts[record['messageId']] >= self.max_receives:
+                    self.dead_letters.append(record)
+                else:
+                    self.messages.append(record)
+
+
+# For local testing
+if __name__ == "__main__":
+    queue = LocalQueue()
+    for query in ["Tesla stock", "Apple stock", "tesla stock"]:
+        queue.send({"query": query, "max_articles": 5})
+
+    queue.drain(lambda_handler)
+    print(f"Dead letters: {len(queue.dead_letters)}")
@@ -24,8 +24,10 @@ from __future__ import annotations
 import logging
 
 from .api import from_bytes, from_fp, from_path, is_binary
+from .cache import DetectionCache
 from .legacy import detect
 from .models import CharsetMatch, CharsetMatches
+from .streaming import StreamingDetector, from_stream
 from .utils import set_logging_handler
 from .version import VERSION, __version__
 
@@ -33,6 +35,9 @@ __all__ = (
     "from_fp",
     "from_path",
     "from_bytes",
+    "from_stream",
+    "StreamingDetector",
+    "DetectionCache",
     "is_binary",
     "detect",
     "CharsetMatch",
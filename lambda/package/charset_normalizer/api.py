@@ -4,6 +4,7 @@ import logging
 from os import PathLike
 from typing import BinaryIO
 
+from .cache import DetectionCache
 from .cd import (
     coherence_ratio,
     encoding_languages,
@@ -11,8 +12,9 @@ from .cd import (
     merge_coherence_ratios,
 )
 from .constant import IANA_SUPPORTED, TOO_BIG_SEQUENCE, TOO_SMALL_SEQUENCE, TRACE
-from .md import mess_ratio
+from .md_table import mess_ratio
 from .models import CharsetMatch, CharsetMatches
+from .parallel import CandidateProbes, Probe, candidate_probes
 from .utils import (
     any_specified_encoding,
     cut_sequence_chunks,
@@ -41,6 +43,8 @@ def from_bytes(
     explain: bool = False,
     language_threshold: float = 0.1,
     enable_fallback: bool = True,
+    workers: int | None = None,
+    cache: DetectionCache | None = None,
 ) -> CharsetMatches:
     """
     Given a raw bytes sequence, return the best possibles charset usable to render str objects.
@@ -58,6 +62,13 @@ def from_bytes(
     By default the library does not setup any handler other than the NullHandler, if you choose to set the 'explain'
     toggle to True it will alter the logger configuration to add a StreamHandler that is suitable for debugging.
     Custom logging format and handler can be set manually.
+
+    With workers set above 1, the code pages are evaluated ahead in a pool of that many processes once the
+    preferred ones (declared, SIG/BOM, ascii, utf_8) did not settle the matter. Worth it for large payloads
+    only (see parallel.PARALLEL_MIN_BYTES); the result is the same as without. Ignored with explain.
+
+    Given a DetectionCache, results are looked up in and stored to it, keyed by the payload and the parameters
+    above. Ignored with explain.
     """
 
     if not isinstance(sequences, (bytearray, bytes)):
@@ -67,6 +78,40 @@ def from_bytes(
             )
         )
 
+    if cache is not None and not explain:
+        cache_key: str = cache.key(
+            sequences,
+            steps,
+            chunk_size,
+            threshold,
+            cp_isolation,
+            cp_exclusion,
+            preemptive_behaviour,
+            language_threshold,
+            enable_fallback,
+        )
+        cached_results: CharsetMatches | None = cache.get(cache_key, sequences)
+
+        if cached_results is None:
+            cached_results = from_bytes(
+                sequences,
+                steps,
+                chunk_size,
+                threshold,
+                cp_isolation,
+                cp_exclusion,
+                preemptive_behaviour,
+                explain,
+                language_threshold,
+                enable_fallback,
+                workers,
+            )
+            cache.put(cache_key, cached_results)
+        else:
+            logger.debug("Encoding detection: results found in the cache.")
+
+        return cached_results
+
     if explain:
         previous_logger_level: int = logger.level
         logger.addHandler(explain_handler)
@@ -177,6 +222,25 @@ def from_bytes(
     if "utf_8" not in prioritized_encodings:
         prioritized_encodings.append("utf_8")
 
+    probes: CandidateProbes | None = None
+
+    if workers is not None and not explain:
+        probes = candidate_probes(
+            sequences,
+            [
+                encoding_iana
+                for encoding_iana in IANA_SUPPORTED
+                if encoding_iana not in prioritized_encodings
+                and (not cp_isolation or encoding_iana in cp_isolation)
+                and encoding_iana not in cp_exclusion
+            ],
+            workers,
+            steps,
+            chunk_size,
+            threshold,
+            language_threshold,
+        )
+
     for encoding_iana in prioritized_encodings + IANA_SUPPORTED:
         if cp_isolation and encoding_iana not in cp_isolation:
             continue
@@ -220,8 +284,17 @@ def from_bytes(
             )
             continue
 
+        probe: Probe | None = (
+            probes.get(encoding_iana)
+            if probes is not None and not bom_or_sig_available
+            else None
+        )
+
         try:
-            if is_too_large_sequence and is_multi_byte_decoder is False:
+            if probe is not None:
+                if probe.decode_error is not None:
+                    raise probe.decode_error
+            elif is_too_large_sequence and is_multi_byte_decoder is False:
                 str(
                     (
                         sequences[: int(50e4)]
@@ -273,9 +346,13 @@ def from_bytes(
         )
 
         multi_byte_bonus: bool = (
-            is_multi_byte_decoder
-            and decoded_payload is not None
-            and len(decoded_payload) < length
+            probe.multi_byte_bonus
+            if probe is not None
+            else (
+                is_multi_byte_decoder
+                and decoded_payload is not None
+                and len(decoded_payload) < length
+            )
         )
 
         if multi_byte_bonus:
@@ -296,34 +373,40 @@ def from_bytes(
         md_ratios = []
 
         try:
-            for chunk in cut_sequence_chunks(
-                sequences,
-                encoding_iana,
-                r_,
-                chunk_size,
-                bom_or_sig_available,
-                strip_sig_or_bom,
-                sig_payload,
-                is_multi_byte_decoder,
-                decoded_payload,
-            ):
-                md_chunks.append(chunk)
-
-                md_ratios.append(
-                    mess_ratio(
-                        chunk,
-                        threshold,
-                        explain is True and 1 <= len(cp_isolation) <= 2,
+            if probe is not None:
+                md_ratios = probe.md_ratios
+                early_stop_count = probe.early_stop_count
+                if probe.chunk_error is not None:
+                    raise probe.chunk_error
+            else:
+                for chunk in cut_sequence_chunks(
+                    sequences,
+                    encoding_iana,
+                    r_,
+                    chunk_size,
+                    bom_or_sig_available,
+                    strip_sig_or_bom,
+                    sig_payload,
+                    is_multi_byte_decoder,
+                    decoded_payload,
+                ):
+                    md_chunks.append(chunk)
+
+                    md_ratios.append(
+                        mess_ratio(
+                            chunk,
+                            threshold,
+                            explain is True and 1 <= len(cp_isolation) <= 2,
+                        )
                     )
-                )
 
-                if md_ratios[-1] >= threshold:
-                    early_stop_count += 1
+                    if md_ratios[-1] >= threshold:
+                        early_stop_count += 1
 
-                if (early_stop_count >= max_chunk_gave_up) or (
-                    bom_or_sig_available and strip_sig_or_bom is False
-                ):
-                    break
+                    if (early_stop_count >= max_chunk_gave_up) or (
+                        bom_or_sig_available and strip_sig_or_bom is False
+                    ):
+                        break
         except (
             UnicodeDecodeError
         ) as e:  # Lazy str loading may have missed something there
@@ -344,7 +427,11 @@ def from_bytes(
             and not is_multi_byte_decoder
         ):
             try:
-                sequences[int(50e3) :].decode(encoding_iana, errors="strict")
+                if probe is not None:
+                    if probe.tail_error is not None:
+                        raise probe.tail_error
+                else:
+                    sequences[int(50e3) :].decode(encoding_iana, errors="strict")
             except UnicodeDecodeError as e:
                 logger.log(
                     TRACE,
@@ -414,7 +501,7 @@ def from_bytes(
 
         # We shall skip the CD when its about ASCII
         # Most of the time its not relevant to run "language-detection" on it.
-        if encoding_iana != "ascii":
+        if encoding_iana != "ascii" and probe is None:
             for chunk in md_chunks:
                 chunk_languages = coherence_ratio(
                     chunk,
@@ -424,7 +511,11 @@ def from_bytes(
 
                 cd_ratios.append(chunk_languages)
 
-        cd_ratios_merged = merge_coherence_ratios(cd_ratios)
+        cd_ratios_merged = (
+            probe.languages
+            if probe is not None and probe.languages is not None
+            else merge_coherence_ratios(cd_ratios)
+        )
 
         if cd_ratios_merged:
             logger.log(
@@ -553,10 +644,12 @@ def from_fp(
     explain: bool = False,
     language_threshold: float = 0.1,
     enable_fallback: bool = True,
+    cache: DetectionCache | None = None,
 ) -> CharsetMatches:
     """
     Same thing than the function from_bytes but using a file pointer that is already ready.
-    Will not close the file pointer.
+    Will not close the file pointer. Reads the whole file first; for large files, sockets or
+    HTTP bodies see from_stream, which reads incrementally and stops once the encoding is clear.
     """
     return from_bytes(
         fp.read(),
@@ -569,6 +662,7 @@ def from_fp(
         explain,
         language_threshold,
         enable_fallback,
+        cache=cache,
     )
 
 
@@ -583,6 +677,7 @@ def from_path(
     explain: bool = False,
     language_threshold: float = 0.1,
     enable_fallback: bool = True,
+    cache: DetectionCache | None = None,
 ) -> CharsetMatches:
     """
     Same thing than the function from_bytes but with one extra step. Opening and reading given file path in binary mode.
@@ -600,6 +695,7 @@ def from_path(
             explain,
             language_threshold,
             enable_fallback,
+            cache,
         )
 
 
@@ -0,0 +1,184 @@
+"""
+Persistent, on-disk cache of detection results.
+
+Entries are keyed by a digest of the payload and of every parameter that
+changes the outcome, so a hit returns exactly what from_bytes computed the
+first time, and repeat detection of an unchanged file costs a hash and a small
+JSON read. The payload is hashed whole (BLAKE2b, faster than reading most
+files): from_bytes decodes all of it, so two payloads with the same sampled
+chunks may still get different results.
+
+    >>> from charset_normalizer import DetectionCache, from_path
+    >>> results = from_path("./my_subtitle.srt", cache=DetectionCache())
+
+The CLI takes --cache (and --cache-dir).
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import unicodedata
+from hashlib import blake2b
+
+from .models import CharsetMatch, CharsetMatches
+from .version import __version__
+
+# Bump when the entry layout changes; older entries are then never read
+CACHE_FORMAT: int = 1
+
+
+def default_cache_directory() -> str:
+    """
+    CHARSET_NORMALIZER_CACHE_DIR, else charset_normalizer under the user cache
+    directory (XDG_CACHE_HOME or ~/.cache).
+    """
+    directory = os.environ.get("CHARSET_NORMALIZER_CACHE_DIR")
+    if directory:
+        return directory
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "charset_normalizer")
+
+
+def _describe(match: CharsetMatch) -> dict:
+    return {
+        "encoding": match.encoding,
+        "chaos": match.chaos,
+        "bom": match.bom,
+        "languages": match._languages,
+        "declaration": match._preemptive_declaration,
+    }
+
+
+def _restore(payload: bytes, entry: dict) -> CharsetMatch:
+    return CharsetMatch(
+        payload,
+        entry["encoding"],
+        entry["chaos"],
+        entry["bom"],
+        [(language, ratio) for language, ratio in entry["languages"]],
+        preemptive_declaration=entry["declaration"],
+    )
+
+
+class DetectionCache:
+    """
+    Detection results stored as one JSON file per key under directory. Safe
+    to share between threads and processes: entries are written atomically,
+    and an unreadable entry is a miss.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory: str = directory or default_cache_directory()
+
+    @staticmethod
+    def key(
+        sequences: bytes | bytearray,
+        steps: int,
+        chunk_size: int,
+        threshold: float,
+        cp_isolation: list[str] | None,
+        cp_exclusion: list[str] | None,
+        preemptive_behaviour: bool,
+        language_threshold: float,
+        enable_fallback: bool,
+    ) -> str:
+        """
+        Cache key of a payload detected with the given from_bytes parameters.
+        The whole payload is hashed, not only the chunks detection samples:
+        the strict decode covers every byte, so payloads that differ outside
+        those chunks may be detected differently.
+        """
+        digest = blake2b(sequences, digest_size=20)
+        digest.update(
+            json.dumps(
+                [
+                    CACHE_FORMAT,
+                    __version__,
+                    unicodedata.unidata_version,
+                    len(sequences),
+                    steps,
+                    chunk_size,
+                    threshold,
+                    sorted(cp_isolation or []),
+                    sorted(cp_exclusion or []),
+                    preemptive_behaviour,
+                    language_threshold,
+                    enable_fallback,
+                ]
+            ).encode("utf-8")
+        )
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key: str, sequences: bytes | bytearray) -> CharsetMatches | None:
+        """
+        The cached matches for key, bound to sequences, or None on a miss.
+        """
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as fp:
+                entry = json.load(fp)
+
+            results: list[CharsetMatch] = []
+            for described in entry["matches"]:
+                match = _restore(sequences, described)
+                # Already found to decode the same, no need to compare again
+                match._leaves = [
+                    _restore(sequences, leaf) for leaf in described["leaves"]
+                ]
+                results.append(match)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        matches = CharsetMatches()
+        # Stored in their final order; sorting again would decode the payload
+        matches._results = results
+        return matches
+
+    def put(self, key: str, matches: CharsetMatches) -> None:
+        """
+        Store matches under key. Failing to write is not an error.
+        """
+        entry = {
+            "matches": [
+                dict(
+                    _describe(match),
+                    leaves=[_describe(leaf) for leaf in match.submatch],
+                )
+                for match in matches
+            ]
+        }
+        path = self._path(key)
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temporary_path, "w", encoding="utf-8") as fp:
+                json.dump(entry, fp)
+            os.replace(temporary_path, path)
+        except OSError:
+            try:
+                os.remove(temporary_path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """
+        Remove every entry.
+        """
+        for root, _, files in os.walk(self.directory, topdown=False):
+            for name in files:
+                if name.endswith(".json") or name.endswith(".tmp"):
+                    try:
+                        os.remove(os.path.join(root, name))
+                    except OSError:
+                        pass
+            try:
+                os.rmdir(root)
+            except OSError:
+                pass
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import argparse
+import os
 import sys
 import typing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from functools import partial
 from json import dumps
-from os.path import abspath, basename, dirname, join, realpath
+from os.path import abspath, basename, dirname, isdir, isfile, join, realpath
 from platform import python_version
 from unicodedata import unidata_version
 
 import charset_normalizer.md as md_module
-from charset_normalizer import from_fp
-from charset_normalizer.models import CliDetectionResult
+from charset_normalizer import from_fp, from_stream
+from charset_normalizer.cache import DetectionCache, default_cache_directory
+from charset_normalizer.models import CharsetMatches, CliDetectionResult
 from charset_normalizer.version import __version__
 
 
@@ -106,6 +110,183 @@ class FileType:
         return f"{type(self).__name__}({args_str})"
 
 
+def detection_results(
+    path: str, matches: CharsetMatches, alternatives: bool
+) -> list[CliDetectionResult]:
+    """
+    The CLI records of a file: its best guess (or "Unknown"), followed by the
+    alternatives when asked for.
+    """
+    best_guess = matches.best()
+
+    if best_guess is None:
+        return [
+            CliDetectionResult(
+                abspath(path),
+                None,
+                [],
+                [],
+                "Unknown",
+                [],
+                False,
+                1.0,
+                0.0,
+                None,
+                True,
+            )
+        ]
+
+    results = [
+        CliDetectionResult(
+            abspath(path),
+            best_guess.encoding,
+            best_guess.encoding_aliases,
+            [
+                cp
+                for cp in best_guess.could_be_from_charset
+                if cp != best_guess.encoding
+            ],
+            best_guess.language,
+            best_guess.alphabets,
+            best_guess.bom,
+            best_guess.percent_chaos,
+            best_guess.percent_coherence,
+            None,
+            True,
+        )
+    ]
+
+    if len(matches) > 1 and alternatives:
+        for el in matches:
+            if el != best_guess:
+                results.append(
+                    CliDetectionResult(
+                        abspath(path),
+                        el.encoding,
+                        el.encoding_aliases,
+                        [
+                            cp
+                            for cp in el.could_be_from_charset
+                            if cp != el.encoding
+                        ],
+                        el.language,
+                        el.alphabets,
+                        el.bom,
+                        el.percent_chaos,
+                        el.percent_coherence,
+                        None,
+                        False,
+                    )
+                )
+
+    return results
+
+
+def iter_batch_paths(paths: list[str]) -> typing.Iterator[str]:
+    """
+    The regular files among paths, directories walked recursively (without
+    following symbolic links), in a stable order.
+    """
+    for path in paths:
+        if not isdir(path):
+            yield path
+            continue
+
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = join(root, name)
+                if isfile(file_path):
+                    yield file_path
+
+
+def detect_batch_file(
+    path: str,
+    threshold: float,
+    preemptive_behaviour: bool,
+    alternatives: bool,
+    max_bytes: int,
+    cache_dir: str | None,
+) -> tuple[list[dict], str | None]:
+    """
+    Detect one file of a --batch run, in a worker process. Returns its records
+    and, when it could not be read, an error message instead.
+    """
+    try:
+        with open(path, "rb") as fp:
+            if max_bytes:
+                matches = from_stream(
+                    fp,
+                    threshold=threshold,
+                    preemptive_behaviour=preemptive_behaviour,
+                    max_bytes=max_bytes,
+                )
+            else:
+                matches = from_fp(
+                    fp,
+                    threshold=threshold,
+                    preemptive_behaviour=preemptive_behaviour,
+                    cache=DetectionCache(cache_dir) if cache_dir else None,
+                )
+    except OSError as e:
+        return [], f"can't open '{path}': {e}"
+
+    records = detection_results(path, matches, alternatives)
+    return [el.__dict__ for el in records], None
+
+
+def cli_batch(args: argparse.Namespace) -> int:
+    """
+    Run --batch: detect every file across args.jobs processes, printing one
+    JSON object per record (NDJSON) as soon as its file is done.
+    """
+    detect = partial(
+        detect_batch_file,
+        threshold=args.threshold,
+        preemptive_behaviour=args.no_preemptive is False,
+        alternatives=args.alternatives,
+        max_bytes=args.max_bytes,
+        cache_dir=(
+            (args.cache_dir or default_cache_directory())
+            if args.cache or args.cache_dir
+            else None
+        ),
+    )
+    failures = 0
+
+    def emit(outcome: tuple[list[dict], str | None]) -> None:
+        nonlocal failures
+        records, error = outcome
+        if error is not None:
+            failures += 1
+            print(error, file=sys.stderr)
+        for record in records:
+            print(dumps(record, ensure_ascii=True), flush=True)
+
+    if args.jobs == 1:
+        for path in iter_batch_paths(args.batch):
+            emit(detect(path))
+        return 1 if failures else 0
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        pending: set[Future] = set()
+
+        # Bounded look-ahead, so that walking a large corpus does not queue it whole
+        for path in iter_batch_paths(args.batch):
+            pending.add(executor.submit(detect, path))
+            if len(pending) >= args.jobs * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    emit(future.result())
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                emit(future.result())
+
+    return 1 if failures else 0
+
+
 def cli_detect(argv: list[str] | None = None) -> int:
     """
     CLI assistant using ARGV and ArgumentParser
@@ -119,7 +300,7 @@ def cli_detect(argv: list[str] | None = None) -> int:
     )
 
     parser.add_argument(
-        "files", type=FileType("rb"), nargs="+", help="File(s) to be analysed"
+        "files", type=FileType("rb"), nargs="*", help="File(s) to be analysed"
     )
     parser.add_argument(
         "-v",
@@ -187,6 +368,51 @@ def cli_detect(argv: list[str] | None = None) -> int:
         dest="threshold",
         help="Define a custom maximum amount of noise allowed in decoded content. 0. <= noise <= 1.",
     )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        default=False,
+        dest="cache",
+        help="Reuse the results of previous runs for unchanged files, and store new ones. "
+        "Kept in --cache-dir.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        action="store",
+        default=None,
+        dest="cache_dir",
+        help="Directory of the --cache results, implies --cache. Default: {}.".format(
+            default_cache_directory()
+        ),
+    )
+    parser.add_argument(
+        "--batch",
+        action="store",
+        nargs="+",
+        default=None,
+        dest="batch",
+        metavar="PATH",
+        help="Analyse the given files and every file under the given directories, recursively, "
+        "across --jobs processes. Output one JSON object per line (NDJSON) as each file is done.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        default=os.cpu_count() or 1,
+        type=int,
+        dest="jobs",
+        help="Number of processes used by --batch. Default: number of CPUs.",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        action="store",
+        default=0,
+        type=int,
+        dest="max_bytes",
+        help="Read at most that many bytes of each file, stopping earlier once the encoding is clear. "
+        "The result is about those bytes only, and is not cached. Default: 0, whole files.",
+    )
     parser.add_argument(
         "--version",
         action="version",
@@ -201,6 +427,15 @@ def cli_detect(argv: list[str] | None = None) -> int:
 
     args = parser.parse_args(argv)
 
+    if not args.files and not args.batch:
+        parser.error("the following arguments are required: files")
+
+    if args.files and args.batch:
+        for my_file in args.files:
+            my_file.close()
+        print("Use either files or --batch, not both.", file=sys.stderr)
+        return 1
+
     if args.replace is True and args.normalize is False:
         if args.files:
             for my_file in args.files:
@@ -222,18 +457,53 @@ def cli_detect(argv: list[str] | None = None) -> int:
         print("--threshold VALUE should be between 0. AND 1.", file=sys.stderr)
         return 1
 
+    if args.max_bytes < 0 or (args.max_bytes and args.normalize):
+        if args.files:
+            for my_file in args.files:
+                my_file.close()
+        print(
+            "--max-bytes VALUE should be positive, and cannot be used with --normalize.",
+            file=sys.stderr,
+        )
+        return 1
+
+    if args.batch:
+        if args.normalize or args.minimal:
+            print("Use --batch without --normalize or --minimal.", file=sys.stderr)
+            return 1
+        if args.jobs < 1:
+            print("--jobs VALUE should be at least 1.", file=sys.stderr)
+            return 1
+        return cli_batch(args)
+
+    cache: DetectionCache | None = (
+        DetectionCache(args.cache_dir) if args.cache or args.cache_dir else None
+    )
+
     x_ = []
 
     for my_file in args.files:
-        matches = from_fp(
-            my_file,
-            threshold=args.threshold,
-            explain=args.verbose,
-            preemptive_behaviour=args.no_preemptive is False,
-        )
+        if args.max_bytes:
+            matches = from_stream(
+                my_file,
+                threshold=args.threshold,
+                explain=args.verbose,
+                preemptive_behaviour=args.no_preemptive is False,
+                max_bytes=args.max_bytes,
+            )
+        else:
+            matches = from_fp(
+                my_file,
+                threshold=args.threshold,
+                explain=args.verbose,
+                preemptive_behaviour=args.no_preemptive is False,
+                cache=cache,
+            )
 
         best_guess = matches.best()
 
+        x_.extend(detection_results(my_file.name, matches, args.alternatives))
+
         if best_guess is None:
             print(
                 'Unable to identify originating encoding for "{}". {}'.format(
@@ -246,65 +516,7 @@ def cli_detect(argv: list[str] | None = None) -> int:
                 ),
                 file=sys.stderr,
             )
-            x_.append(
-                CliDetectionResult(
-                    abspath(my_file.name),
-                    None,
-                    [],
-                    [],
-                    "Unknown",
-                    [],
-                    False,
-                    1.0,
-                    0.0,
-                    None,
-                    True,
-                )
-            )
         else:
-            x_.append(
-                CliDetectionResult(
-                    abspath(my_file.name),
-                    best_guess.encoding,
-                    best_guess.encoding_aliases,
-                    [
-                        cp
-                        for cp in best_guess.could_be_from_charset
-                        if cp != best_guess.encoding
-                    ],
-                    best_guess.language,
-                    best_guess.alphabets,
-                    best_guess.bom,
-                    best_guess.percent_chaos,
-                    best_guess.percent_coherence,
-                    None,
-                    True,
-                )
-            )
-
-            if len(matches) > 1 and args.alternatives:
-                for el in matches:
-                    if el != best_guess:
-                        x_.append(
-                            CliDetectionResult(
-                                abspath(my_file.name),
-                                el.encoding,
-                                el.encoding_aliases,
-                                [
-                                    cp
-                                    for cp in el.could_be_from_charset
-                                    if cp != el.encoding
-                                ],
-                                el.language,
-                                el.alphabets,
-                                el.bom,
-                                el.percent_chaos,
-                                el.percent_coherence,
-                                None,
-                                False,
-                            )
-                        )
-
             if args.normalize is True:
                 if best_guess.encoding.startswith("utf") is True:
                     print(
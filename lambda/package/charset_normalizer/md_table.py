@@ -0,0 +1,348 @@
+"""
+Single-pass, table-driven implementation of ``md.mess_ratio``.
+
+The plugin engine in ``md`` calls ``eligible``/``feed`` on nine detector objects
+for every character, each asking ``utils`` predicates of its own. Here each
+character is classified once through ``proptable`` and the state of every
+built-in plugin is kept in local counters, so the ratios, the intermediate
+checkpoints and therefore the scores are exactly those of the plugin engine.
+"""
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+
+from . import md
+from .md import MessDetectorPlugin, is_suspiciously_successive_range
+from .proptable import (
+    ACCENTUATED,
+    ALPHA,
+    ARABIC,
+    ARABIC_ISOLATED_FORM,
+    ASCII,
+    BMP_FLAGS,
+    BMP_RANGES,
+    BMP_SIZE,
+    CASE_VARIABLE,
+    CJK,
+    CJK_UNCOMMON,
+    COMMON_SAFE_ASCII,
+    DIGIT,
+    EMOTICON,
+    GLYPH,
+    HANGUL,
+    HIRAGANA,
+    KATAKANA,
+    LATIN,
+    LOWER,
+    PRINTABLE,
+    PUNCTUATION,
+    RANGE_NAMES,
+    SEPARATOR,
+    SPACE,
+    SYMBOL,
+    THAI,
+    UNPRINTABLE,
+    UPPER,
+    WORD_SAFE_SYMBOL,
+    character_properties,
+)
+from .utils import remove_accent
+
+# "plugins", "table" or "auto" (compiled plugins when available, else table)
+MD_ENGINE: str = os.environ.get("CHARSET_NORMALIZER_MD_ENGINE", "auto").lower()
+
+# The plugins this engine reproduces; any other subclass means plugin engine
+BUILTIN_PLUGINS: int = 9
+
+_suspicious_pairs: dict[tuple[int, int], bool] = {}
+
+
+def _is_suspicious_pair(range_a: int, range_b: int) -> bool:
+    key = (range_a, range_b)
+    suspicious = _suspicious_pairs.get(key)
+    if suspicious is None:
+        suspicious = _suspicious_pairs[key] = is_suspiciously_successive_range(
+            RANGE_NAMES[range_a], RANGE_NAMES[range_b]
+        )
+    return suspicious
+
+
+@lru_cache(maxsize=2048)
+def mess_ratio_table(
+    decoded_sequence: str, maximum_threshold: float = 0.2, debug: bool = False
+) -> float:
+    """
+    Same result as md.mess_ratio, computed in a single pass over the sequence.
+    """
+    if debug or len(MessDetectorPlugin.__subclasses__()) != BUILTIN_PLUGINS:
+        # Per-plugin tracing and third-party plugins need the objects themselves
+        return md.mess_ratio(decoded_sequence, maximum_threshold, debug)
+
+    length: int = len(decoded_sequence) + 1
+
+    if length < 512:
+        intermediary_mean_mess_ratio_calc: int = 32
+    elif length <= 1024:
+        intermediary_mean_mess_ratio_calc = 64
+    else:
+        intermediary_mean_mess_ratio_calc = 128
+
+    # TooManySymbolOrPunctuationPlugin
+    sp_punctuation = sp_symbol = sp_characters = 0
+    sp_last: str | None = None
+    # TooManyAccentuatedPlugin
+    ta_characters = ta_accentuated = 0
+    # UnprintablePlugin
+    up_unprintable = up_characters = 0
+    # SuspiciousDuplicateAccentPlugin
+    da_successive = da_characters = 0
+    da_last: str | None = None
+    da_last_flags = 0
+    # SuspiciousRange (-1: no previous character)
+    sr_successive = sr_characters = 0
+    sr_last_range = -1
+    # SuperWeirdWordPlugin
+    sw_words = sw_bad_words = sw_foreign_long = 0
+    sw_characters = sw_bad_characters = 0
+    sw_bad = sw_foreign_watch = False
+    sw_length = sw_upper = sw_accents = sw_glyphs = 0
+    sw_last_flags = 0
+    # CjkUncommonPlugin
+    cu_characters = cu_uncommon = 0
+    # ArchaicUpperLowerPlugin
+    au_buf = False
+    au_since_sep = au_successive = au_successive_final = au_characters = 0
+    au_last_flags = -1
+    au_ascii_only = True
+    # ArabicIsolatedFormPlugin
+    ai_characters = ai_isolated = 0
+
+    mean_mess_ratio: float = 0.0
+    table_flags = BMP_FLAGS
+    table_ranges = BMP_RANGES
+
+    for index, character in enumerate(decoded_sequence + "\n"):
+        code_point = ord(character)
+        if code_point < BMP_SIZE and table_flags[code_point]:
+            flags = table_flags[code_point]
+            range_index = table_ranges[code_point]
+        else:
+            flags, range_index = character_properties(character)
+
+        if flags & PRINTABLE:
+            # TooManySymbolOrPunctuationPlugin
+            sp_characters += 1
+            if character != sp_last and not flags & COMMON_SAFE_ASCII:
+                if flags & PUNCTUATION:
+                    sp_punctuation += 1
+                elif not flags & DIGIT and flags & SYMBOL and not flags & EMOTICON:
+                    sp_symbol += 2
+            sp_last = character
+
+            # SuspiciousRange
+            sr_characters += 1
+            if flags & (SPACE | PUNCTUATION | COMMON_SAFE_ASCII):
+                sr_last_range = -1
+            elif sr_last_range == -1:
+                sr_last_range = range_index
+            else:
+                if _is_suspicious_pair(sr_last_range, range_index):
+                    sr_successive += 1
+                sr_last_range = range_index
+
+        if flags & ALPHA:
+            # TooManyAccentuatedPlugin
+            ta_characters += 1
+            if flags & ACCENTUATED:
+                ta_accentuated += 1
+
+            # SuspiciousDuplicateAccentPlugin
+            if flags & LATIN:
+                da_characters += 1
+                if (
+                    da_last is not None
+                    and flags & ACCENTUATED
+                    and da_last_flags & ACCENTUATED
+                ):
+                    if flags & UPPER and da_last_flags & UPPER:
+                        da_successive += 1
+                    if remove_accent(character) == remove_accent(da_last):
+                        da_successive += 1
+                da_last = character
+                da_last_flags = flags
+
+        # UnprintablePlugin
+        if flags & UNPRINTABLE:
+            up_unprintable += 1
+        up_characters += 1
+
+        # SuperWeirdWordPlugin
+        if flags & ALPHA:
+            sw_length += 1
+            sw_last_flags = flags
+            if flags & UPPER:
+                sw_upper += 1
+            if flags & ACCENTUATED:
+                sw_accents += 1
+            if (
+                not sw_foreign_watch
+                and (not flags & LATIN or flags & ACCENTUATED)
+                and not flags & GLYPH
+            ):
+                sw_foreign_watch = True
+            if flags & GLYPH:
+                sw_glyphs += 1
+        elif not sw_length:
+            pass
+        elif flags & (SPACE | PUNCTUATION | SEPARATOR):
+            sw_words += 1
+            sw_characters += sw_length
+
+            if sw_length >= 4:
+                if sw_accents / sw_length >= 0.5:
+                    sw_bad = True
+                elif (
+                    sw_last_flags & ACCENTUATED
+                    and sw_last_flags & UPPER
+                    and sw_upper != sw_length
+                ):
+                    sw_foreign_long += 1
+                    sw_bad = True
+                elif sw_glyphs == 1:
+                    sw_bad = True
+                    sw_foreign_long += 1
+            if sw_length >= 24 and sw_foreign_watch:
+                if not (sw_upper and sw_upper / sw_length <= 0.3):
+                    sw_foreign_long += 1
+                    sw_bad = True
+
+            if sw_bad:
+                sw_bad_words += 1
+                sw_bad_characters += sw_length
+                sw_bad = False
+
+            sw_foreign_watch = False
+            sw_length = sw_upper = sw_accents = sw_glyphs = 0
+        elif not flags & WORD_SAFE_SYMBOL and not flags & DIGIT and flags & SYMBOL:
+            sw_bad = True
+            sw_length += 1
+            sw_last_flags = flags
+            if flags & UPPER:
+                sw_upper += 1
+
+        # CjkUncommonPlugin
+        if flags & CJK:
+            cu_characters += 1
+            if flags & CJK_UNCOMMON:
+                cu_uncommon += 1
+
+        # ArchaicUpperLowerPlugin
+        if not (flags & ALPHA and flags & CASE_VARIABLE) and au_since_sep > 0:
+            if au_since_sep <= 64 and not flags & DIGIT and not au_ascii_only:
+                au_successive_final += au_successive
+            au_successive = au_since_sep = 0
+            au_last_flags = -1
+            au_buf = False
+            au_characters += 1
+            au_ascii_only = True
+        else:
+            if au_ascii_only and not flags & ASCII:
+                au_ascii_only = False
+            if au_last_flags != -1:
+                if (flags & UPPER and au_last_flags & LOWER) or (
+                    flags & LOWER and au_last_flags & UPPER
+                ):
+                    if au_buf:
+                        au_successive += 2
+                        au_buf = False
+                    else:
+                        au_buf = True
+                else:
+                    au_buf = False
+            au_characters += 1
+            au_since_sep += 1
+            au_last_flags = flags
+
+        # ArabicIsolatedFormPlugin
+        if flags & ARABIC:
+            ai_characters += 1
+            if flags & ARABIC_ISOLATED_FORM:
+                ai_isolated += 1
+
+        if (
+            index > 0 and index % intermediary_mean_mess_ratio_calc == 0
+        ) or index == length - 1:
+            # The plugins' ratio properties, summed in plugin order
+            if sp_characters == 0:
+                sp_ratio = 0.0
+            else:
+                sp_ratio = (sp_punctuation + sp_symbol) / sp_characters
+                if sp_ratio < 0.3:
+                    sp_ratio = 0.0
+
+            if ta_characters < 8:
+                ta_ratio = 0.0
+            else:
+                ta_ratio = ta_accentuated / ta_characters
+                if ta_ratio < 0.35:
+                    ta_ratio = 0.0
+
+            up_ratio = (up_unprintable * 8) / up_characters
+
+            da_ratio = (da_successive * 2) / da_characters if da_characters else 0.0
+
+            sr_ratio = (
+                (sr_successive * 2) / sr_characters if sr_characters > 13 else 0.0
+            )
+
+            if sw_words <= 10 and sw_foreign_long == 0:
+                sw_ratio = 0.0
+            else:
+                sw_ratio = sw_bad_characters / sw_characters
+
+            if cu_characters < 8:
+                cu_ratio = 0.0
+            else:
+                cu_ratio = cu_uncommon / cu_characters
+                cu_ratio = cu_ratio / 10 if cu_ratio > 0.5 else 0.0
+
+            au_ratio = au_successive_final / au_characters if au_characters else 0.0
+
+            ai_ratio = ai_isolated / ai_characters if ai_characters >= 8 else 0.0
+
+            mean_mess_ratio = sum(
+                (
+                    sp_ratio,
+                    ta_ratio,
+                    up_ratio,
+                    da_ratio,
+                    sr_ratio,
+                    sw_ratio,
+                    cu_ratio,
+                    au_ratio,
+                    ai_ratio,
+                )
+            )
+
+            if mean_mess_ratio >= maximum_threshold:
+                break
+
+    return round(mean_mess_ratio, 3)
+
+
+def _md_is_compiled() -> bool:
+    return not (getattr(md, "__file__", None) or "").endswith(".py")
+
+
+def select_mess_ratio(engine: str = MD_ENGINE):
+    """
+    The mess_ratio implementation for an engine name. "auto" keeps the plugin
+    engine when md is compiled (mypyc), where it is the fastest option.
+    """
+    if engine == "plugins" or (engine == "auto" and _md_is_compiled()):
+        return md.mess_ratio
+    return mess_ratio_table
+
+
+mess_ratio = select_mess_ratio()
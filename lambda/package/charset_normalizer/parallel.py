@@ -0,0 +1,377 @@
+"""
+Process pool evaluation of candidate code pages, for from_bytes(workers=n).
+
+For a large, ambiguous payload from_bytes spends its time decoding the whole
+payload once per code page and scoring the samples of every one that decodes.
+Those per code page results depend on nothing but the payload and the
+parameters, so CandidateProbes computes them ahead in worker processes while
+from_bytes keeps walking the candidates in its usual order and applying its
+usual rules (similar code pages skipped, early exits, fallbacks) to them. The
+matches, and their order, are therefore those of the serial detection.
+
+The payload is put once in a shared memory block that the workers attach to
+by name, instead of being pickled along with every task. The preferred code
+pages (declared, SIG/BOM, ascii, utf_8) are never sent to the pool: they are
+tried first and most detections end with them, before any worker starts.
+
+Where processes or shared memory are unavailable (AWS Lambda has no
+/dev/shm), detection silently stays serial.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock
+
+from .cd import (
+    coherence_ratio,
+    encoding_languages,
+    mb_encoding_languages,
+    merge_coherence_ratios,
+)
+from .constant import TOO_BIG_SEQUENCE, TRACE
+from .md_table import mess_ratio
+from .utils import cut_sequence_chunks, is_multi_byte_encoding
+
+logger = logging.getLogger("charset_normalizer")
+
+# Below this many bytes, dispatching to processes costs more than it saves
+PARALLEL_MIN_BYTES: int = 1 << 18
+
+# Code pages from_bytes only tries with a SIG/BOM, which are all prioritized
+_REQUIRE_SIG: frozenset[str] = frozenset({"utf_16", "utf_32", "utf_7"})
+
+_executor: ProcessPoolExecutor | None = None
+_executor_workers: int = 0
+_executor_lock = Lock()
+
+# Payload of the current detection, in a worker process: (block name, bytes)
+_payload: tuple[str, bytes] | None = None
+
+
+class Probe:
+    """
+    What from_bytes would compute for one code page, up to its decision. The
+    errors are the exceptions from_bytes would have caught, to be re-raised
+    at the same place.
+    """
+
+    __slots__ = (
+        "decode_error",
+        "chunk_error",
+        "tail_error",
+        "multi_byte_bonus",
+        "md_ratios",
+        "early_stop_count",
+        "languages",
+    )
+
+    def __init__(self) -> None:
+        self.decode_error: Exception | None = None
+        self.chunk_error: UnicodeDecodeError | None = None
+        self.tail_error: UnicodeDecodeError | None = None
+        self.multi_byte_bonus: bool = False
+        self.md_ratios: list[float] = []
+        self.early_stop_count: int = 0
+        # Merged coherence, computed only when the mess probing passes
+        self.languages: list[tuple[str, float]] | None = None
+
+
+def _attach(name: str, length: int) -> bytes:
+    global _payload
+
+    if _payload is None or _payload[0] != name:
+        _payload = None
+        block = SharedMemory(name=name)
+        try:
+            _payload = (name, bytes(block.buf[:length]))
+        finally:
+            block.close()
+
+    return _payload[1]
+
+
+def probe_code_page(
+    name: str,
+    length: int,
+    encoding_iana: str,
+    steps: int,
+    chunk_size: int,
+    threshold: float,
+    language_threshold: float,
+) -> Probe:
+    """
+    Evaluate one code page against the payload in shared memory block name,
+    exactly as from_bytes does for a code page without SIG/BOM. Runs in a
+    worker process.
+    """
+    sequences: bytes = _attach(name, length)
+    probe = Probe()
+
+    is_too_large_sequence: bool = length >= TOO_BIG_SEQUENCE
+    is_multi_byte_decoder: bool = is_multi_byte_encoding(encoding_iana)
+    decoded_payload: str | None = None
+
+    try:
+        if is_too_large_sequence and is_multi_byte_decoder is False:
+            str(sequences[: int(50e4)], encoding=encoding_iana)
+        else:
+            decoded_payload = str(sequences, encoding=encoding_iana)
+    except (UnicodeDecodeError, LookupError) as e:
+        probe.decode_error = e
+        return probe
+
+    probe.multi_byte_bonus = (
+        is_multi_byte_decoder
+        and decoded_payload is not None
+        and len(decoded_payload) < length
+    )
+
+    r_ = range(0, length, int(length / steps))
+    max_chunk_gave_up: int = max(int(len(r_) / 4), 2)
+
+    md_chunks: list[str] = []
+
+    try:
+        for chunk in cut_sequence_chunks(
+            sequences,
+            encoding_iana,
+            r_,
+            chunk_size,
+            False,
+            False,
+            b"",
+            is_multi_byte_decoder,
+            decoded_payload,
+        ):
+            md_chunks.append(chunk)
+            probe.md_ratios.append(mess_ratio(chunk, threshold, False))
+
+            if probe.md_ratios[-1] >= threshold:
+                probe.early_stop_count += 1
+
+            if probe.early_stop_count >= max_chunk_gave_up:
+                break
+    except UnicodeDecodeError as e:
+        probe.chunk_error = e
+        return probe
+
+    if is_too_large_sequence and not is_multi_byte_decoder:
+        try:
+            sequences[int(50e3) :].decode(encoding_iana, errors="strict")
+        except UnicodeDecodeError as e:
+            probe.tail_error = e
+            return probe
+
+    md_ratios = probe.md_ratios
+    mean_mess_ratio: float = sum(md_ratios) / len(md_ratios) if md_ratios else 0.0
+    if mean_mess_ratio >= threshold or probe.early_stop_count >= max_chunk_gave_up:
+        return probe
+
+    if not is_multi_byte_decoder:
+        target_languages: list[str] = encoding_languages(encoding_iana)
+    else:
+        target_languages = mb_encoding_languages(encoding_iana)
+
+    cd_ratios = []
+
+    if encoding_iana != "ascii":
+        for chunk in md_chunks:
+            cd_ratios.append(
+                coherence_ratio(
+                    chunk,
+                    language_threshold,
+                    ",".join(target_languages) if target_languages else None,
+                )
+            )
+
+    probe.languages = merge_coherence_ratios(cd_ratios)
+
+    return probe
+
+
+def _mp_context():
+    # Forking a process that runs threads (a Lambda handler may) can deadlock
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context()
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor, _executor_workers
+
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=_mp_context()
+            )
+            _executor_workers = workers
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    global _executor
+
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _release(futures: list[Future]) -> None:
+    for future in futures:
+        future.cancel()
+
+
+class CandidateProbes:
+    """
+    Probes of the non-preferred code pages of one from_bytes call, submitted
+    to the pool on the first request for one of them. The shared memory block
+    is unlinked once every probe finished or was cancelled, which happens
+    when this object is dropped.
+    """
+
+    def __init__(
+        self,
+        sequences: bytes | bytearray,
+        encodings: list[str],
+        workers: int,
+        steps: int,
+        chunk_size: int,
+        threshold: float,
+        language_threshold: float,
+    ):
+        self._sequences = sequences
+        self._encodings: list[str] = encodings
+        self._workers: int = workers
+        self._arguments = (steps, chunk_size, threshold, language_threshold)
+        self._futures: dict[str, Future] | None = None
+        self._unavailable: bool = False
+
+    def _submit(self) -> None:
+        length: int = len(self._sequences)
+        futures: dict[str, Future] = {}
+
+        try:
+            block = SharedMemory(create=True, size=length)
+        except (OSError, ValueError) as e:
+            logger.log(
+                TRACE, "Parallel detection unavailable, continuing serially. %s", e
+            )
+            self._unavailable = True
+            return
+
+        try:
+            executor = _get_executor(self._workers)
+        except (OSError, ImportError, NotImplementedError) as e:
+            logger.log(
+                TRACE, "Parallel detection unavailable, continuing serially. %s", e
+            )
+            block.close()
+            block.unlink()
+            self._unavailable = True
+            return
+
+        block.buf[:length] = self._sequences
+        block.close()
+
+        pending = [len(self._encodings)]
+        pending_lock = Lock()
+
+        def done(_: Future) -> None:
+            with pending_lock:
+                pending[0] -= 1
+                if pending[0]:
+                    return
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+
+        try:
+            for encoding_iana in self._encodings:
+                future = executor.submit(
+                    probe_code_page, block.name, length, encoding_iana, *self._arguments
+                )
+                futures[encoding_iana] = future
+        except (BrokenProcessPool, RuntimeError) as e:
+            logger.log(
+                TRACE, "Parallel detection unavailable, continuing serially. %s", e
+            )
+            _discard_executor(executor)
+            for future in futures.values():
+                future.cancel()
+            block.unlink()
+            self._unavailable = True
+            return
+
+        self._futures = futures
+        weakref.finalize(self, _release, list(futures.values()))
+
+        for future in futures.values():
+            future.add_done_callback(done)
+
+    def get(self, encoding_iana: str) -> Probe | None:
+        """
+        The probe of a code page, waiting for it as needed. None when it was
+        not sent to the pool or the pool failed: from_bytes evaluates it then.
+        """
+        if self._unavailable or encoding_iana not in self._encodings:
+            return None
+
+        if self._futures is None:
+            self._submit()
+            if self._futures is None:
+                return None
+
+        try:
+            return self._futures[encoding_iana].result()
+        except Exception as e:  # Defensive: the result would be the same serially
+            logger.log(
+                TRACE,
+                "Parallel probe of %s failed, evaluating it here. %s",
+                encoding_iana,
+                e,
+            )
+            return None
+
+
+def candidate_probes(
+    sequences: bytes | bytearray,
+    candidates: list[str],
+    workers: int,
+    steps: int,
+    chunk_size: int,
+    threshold: float,
+    language_threshold: float,
+) -> CandidateProbes | None:
+    """
+    CandidateProbes for the code pages of candidates that may go to the pool,
+    None when the payload is too small to be worth it.
+    """
+    if workers < 2 or len(sequences) < PARALLEL_MIN_BYTES:
+        return None
+
+    encodings: list[str] = []
+
+    for encoding_iana in candidates:
+        if encoding_iana in _REQUIRE_SIG or encoding_iana in encodings:
+            continue
+        try:
+            is_multi_byte_encoding(encoding_iana)
+        except (ModuleNotFoundError, ImportError):
+            continue
+        encodings.append(encoding_iana)
+
+    if not encodings:
+        return None
+
+    return CandidateProbes(
+        sequences, encodings, workers, steps, chunk_size, threshold, language_threshold
+    )
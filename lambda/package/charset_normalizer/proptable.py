@@ -0,0 +1,344 @@
+"""
+Per-code-point property table behind the ``utils`` character predicates.
+
+Every predicate charset_normalizer asks about a character is packed into one
+integer of bit flags, alongside the index of its Unicode range. For the BMP
+both live in flat arrays indexed by code point: read from a table generated
+at build time when one matches this interpreter's Unicode database, otherwise
+filled in lazily on first sight of each character. Characters outside the
+BMP go through a small bounded cache instead. One lookup answers every
+predicate, where each of them used to keep a cache of its own.
+
+Generate the persisted table with ``build_table(DEFAULT_TABLE_PATH)``; the
+deployment build does this for the bundle.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+import sys
+import unicodedata
+from array import array
+from functools import lru_cache
+
+from .constant import (
+    COMMON_CJK_CHARACTERS,
+    COMMON_SAFE_ASCII_CHARACTERS,
+    UNICODE_RANGES_COMBINED,
+)
+
+KNOWN = 1 << 0
+PRINTABLE = 1 << 1
+ALPHA = 1 << 2
+SPACE = 1 << 3
+DIGIT = 1 << 4
+UPPER = 1 << 5
+LOWER = 1 << 6
+ASCII = 1 << 7
+PUNCTUATION = 1 << 8
+SYMBOL = 1 << 9
+EMOTICON = 1 << 10
+ACCENTUATED = 1 << 11
+UNPRINTABLE = 1 << 12
+LATIN = 1 << 13
+CJK = 1 << 14
+HANGUL = 1 << 15
+KATAKANA = 1 << 16
+HIRAGANA = 1 << 17
+THAI = 1 << 18
+SEPARATOR = 1 << 19
+CASE_VARIABLE = 1 << 20
+ARABIC = 1 << 21
+ARABIC_ISOLATED_FORM = 1 << 22
+CJK_UNCOMMON = 1 << 23
+COMMON_SAFE_ASCII = 1 << 24
+# Symbols SuperWeirdWordPlugin does not hold against a word
+WORD_SAFE_SYMBOL = 1 << 25
+
+# Any of these makes a letter a "glyph" for SuperWeirdWordPlugin
+GLYPH = CJK | HANGUL | KATAKANA | HIRAGANA | THAI
+
+WORD_SAFE_SYMBOLS: frozenset[str] = frozenset({"<", ">", "-", "=", "~", "|", "_"})
+SEPARATOR_SYMBOLS: frozenset[str] = frozenset({"｜", "+", "<", ">"})
+
+ACCENT_MARKERS: tuple[str, ...] = (
+    "WITH GRAVE",
+    "WITH ACUTE",
+    "WITH CEDILLA",
+    "WITH DIAERESIS",
+    "WITH CIRCUMFLEX",
+    "WITH TILDE",
+    "WITH MACRON",
+    "WITH RING ABOVE",
+)
+
+# Index of each Unicode range name; NO_RANGE stands for unicode_range() -> None
+RANGE_NAMES: list[str | None] = list(UNICODE_RANGES_COMBINED) + [None]
+RANGE_INDEX: dict[str | None, int] = {name: i for i, name in enumerate(RANGE_NAMES)}
+NO_RANGE: int = RANGE_INDEX[None]
+
+BMP_SIZE: int = 0x10000
+
+# Characters outside the BMP with cached properties, at most
+ASTRAL_CACHE_SIZE: int = 4096
+
+# Persisted table: header, then BMP flags ("I") and range indexes ("H")
+TABLE_MAGIC: bytes = b"CNPT"
+TABLE_FORMAT: int = 1
+TABLE_HEADER: struct.Struct = struct.Struct("=4sH2x16s8s")
+TABLE_SIZE: int = TABLE_HEADER.size + 4 * BMP_SIZE + 2 * BMP_SIZE
+
+DEFAULT_TABLE_PATH: str = os.path.join(os.path.dirname(__file__), "proptable.bin")
+
+# Path of the persisted table; empty to always build the table lazily
+TABLE_PATH: str = os.environ.get("CHARSET_NORMALIZER_PROPTABLE", DEFAULT_TABLE_PATH)
+
+
+def compute_range(character: str) -> int:
+    """
+    Index of the Unicode range of a character, NO_RANGE when it has none.
+    """
+    character_ord: int = ord(character)
+
+    for index, ord_range in enumerate(UNICODE_RANGES_COMBINED.values()):
+        if character_ord in ord_range:
+            return index
+
+    return NO_RANGE
+
+
+def compute_flags(character: str, range_index: int | None = None) -> int:
+    """
+    Evaluate every predicate for one character, the slow path behind the table.
+    """
+    if range_index is None:
+        range_index = compute_range(character)
+
+    character_range: str | None = RANGE_NAMES[range_index]
+    category: str = unicodedata.category(character)
+
+    try:
+        name: str = unicodedata.name(character)
+    except ValueError:  # Defensive: unicode database outdated?
+        name = ""
+
+    flags: int = KNOWN
+
+    if character.isprintable():
+        flags |= PRINTABLE
+    if character.isalpha():
+        flags |= ALPHA
+    if character.isspace():
+        flags |= SPACE
+    if character.isdigit():
+        flags |= DIGIT
+    if character.isupper():
+        flags |= UPPER
+    if character.islower():
+        flags |= LOWER
+    if character.isascii():
+        flags |= ASCII
+    if character.islower() != character.isupper():
+        flags |= CASE_VARIABLE
+
+    if "P" in category or (
+        character_range is not None and "Punctuation" in character_range
+    ):
+        flags |= PUNCTUATION
+    if (
+        "S" in category
+        or "N" in category
+        or (
+            character_range is not None
+            and "Forms" in character_range
+            and category != "Lo"
+        )
+    ):
+        flags |= SYMBOL
+    if character_range is not None and (
+        "Emoticons" in character_range or "Pictographs" in character_range
+    ):
+        flags |= EMOTICON
+    if (
+        character.isspace()
+        or character in SEPARATOR_SYMBOLS
+        or "Z" in category
+        or category in {"Po", "Pd", "Pc"}
+    ):
+        flags |= SEPARATOR
+    if (
+        character.isspace() is False  # includes \n \t \r \v
+        and character.isprintable() is False
+        and character != "\x1a"  # Why? Its the ASCII substitute character.
+        and character != "\ufeff"  # bug discovered in Python,
+        # Zero Width No-Break Space located in Arabic Presentation Forms-B, Unicode 1.1 not acknowledged as space.
+    ):
+        flags |= UNPRINTABLE
+
+    if any(marker in name for marker in ACCENT_MARKERS):
+        flags |= ACCENTUATED
+    if "LATIN" in name:
+        flags |= LATIN
+    if "CJK" in name:
+        flags |= CJK
+    if "HANGUL" in name:
+        flags |= HANGUL
+    if "KATAKANA" in name:
+        flags |= KATAKANA
+    if "HIRAGANA" in name:
+        flags |= HIRAGANA
+    if "THAI" in name:
+        flags |= THAI
+    if "ARABIC" in name:
+        flags |= ARABIC
+        if "ISOLATED FORM" in name:
+            flags |= ARABIC_ISOLATED_FORM
+
+    if character not in COMMON_CJK_CHARACTERS:
+        flags |= CJK_UNCOMMON
+    if character in COMMON_SAFE_ASCII_CHARACTERS:
+        flags |= COMMON_SAFE_ASCII
+    if character in WORD_SAFE_SYMBOLS:
+        flags |= WORD_SAFE_SYMBOL
+
+    return flags
+
+
+def table_digest() -> bytes:
+    """
+    Fingerprint of everything a persisted table depends on. A table whose
+    digest differs (other Unicode database, flags or ranges) is not used.
+    """
+    digest = hashlib.sha256()
+    for part in (
+        sys.byteorder,
+        unicodedata.unidata_version,
+        str(TABLE_FORMAT),
+        "\x00".join(name or "" for name in RANGE_NAMES),
+        "".join(sorted(COMMON_CJK_CHARACTERS)),
+        "".join(sorted(COMMON_SAFE_ASCII_CHARACTERS)),
+        "".join(sorted(WORD_SAFE_SYMBOLS)),
+        "".join(sorted(SEPARATOR_SYMBOLS)),
+        "\x00".join(ACCENT_MARKERS),
+    ):
+        digest.update(part.encode("utf-8", "surrogatepass"))
+        digest.update(b"\x00")
+    return digest.digest()[:8]
+
+
+def build_table(path: str) -> None:
+    """
+    Compute the BMP table and write it to path, atomically.
+    """
+    flags = array("I", bytes(4 * BMP_SIZE))
+    ranges = array("H", bytes(2 * BMP_SIZE))
+
+    for code_point in range(BMP_SIZE):
+        character = chr(code_point)
+        ranges[code_point] = compute_range(character)
+        flags[code_point] = compute_flags(character, ranges[code_point])
+
+    header = TABLE_HEADER.pack(
+        TABLE_MAGIC,
+        TABLE_FORMAT,
+        unicodedata.unidata_version.encode("ascii"),
+        table_digest(),
+    )
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as fp:
+        fp.write(header)
+        fp.write(flags.tobytes())
+        fp.write(ranges.tobytes())
+    os.replace(temporary_path, path)
+
+
+def load_table(path: str) -> tuple[array, array] | None:
+    """
+    Read a persisted table, None when it is missing or does not match.
+
+    The arrays are read rather than memory-mapped: indexing an array is
+    markedly faster than indexing a memoryview cast, and it is only 384 KB.
+    """
+    if not path:
+        return None
+
+    try:
+        with open(path, "rb") as fp:
+            header: bytes = fp.read(TABLE_HEADER.size)
+            if len(header) != TABLE_HEADER.size:
+                return None
+
+            magic, table_format, _, digest = TABLE_HEADER.unpack(header)
+            if (
+                magic != TABLE_MAGIC
+                or table_format != TABLE_FORMAT
+                or digest != table_digest()
+            ):
+                return None
+
+            flags, ranges = array("I"), array("H")
+            flags.fromfile(fp, BMP_SIZE)
+            ranges.fromfile(fp, BMP_SIZE)
+
+            if fp.read(1):
+                return None
+    except (OSError, EOFError):
+        return None
+
+    return flags, ranges
+
+
+_table = load_table(TABLE_PATH)
+
+# Flags and range index per BMP code point; with a lazy table 0 flags means
+# not computed yet, a persisted one has every entry filled in
+BMP_FLAGS: array
+BMP_RANGES: array
+
+if _table is not None:
+    BMP_FLAGS, BMP_RANGES = _table
+    TABLE_LOADED: bool = True
+else:
+    BMP_FLAGS = array("I", bytes(4 * BMP_SIZE))
+    BMP_RANGES = array("H", bytes(2 * BMP_SIZE))
+    TABLE_LOADED = False
+
+
+@lru_cache(maxsize=ASTRAL_CACHE_SIZE)
+def _astral_properties(character: str) -> tuple[int, int]:
+    range_index: int = compute_range(character)
+    return compute_flags(character, range_index), range_index
+
+
+def character_properties(character: str) -> tuple[int, int]:
+    """
+    Flags and Unicode range index of a character.
+    """
+    code_point: int = ord(character)
+
+    if code_point < BMP_SIZE:
+        flags: int = BMP_FLAGS[code_point]
+        if not flags:
+            range_index: int = compute_range(character)
+            BMP_RANGES[code_point] = range_index
+            flags = BMP_FLAGS[code_point] = compute_flags(character, range_index)
+        return flags, BMP_RANGES[code_point]
+
+    return _astral_properties(character)
+
+
+def character_flags(character: str) -> int:
+    """
+    Flags of a character, see character_properties.
+    """
+    code_point: int = ord(character)
+
+    if code_point < BMP_SIZE:
+        flags: int = BMP_FLAGS[code_point]
+        if flags:
+            return flags
+
+    return character_properties(character)[0]
+
@@ -0,0 +1,697 @@
+"""
+Incremental detection for large or unbounded inputs (files, sockets, HTTP bodies).
+
+from_bytes samples the whole payload and decodes it once per code page. The
+StreamingDetector below instead consumes the input window by window: every
+candidate code page decodes each window with a strict incremental decoder and
+gets its mess measured, candidates that fail to decode or keep being messy are
+pruned as evidence accumulates, and detection stops as soon as one candidate
+dominates the others, or after max_bytes. Memory and time are bounded by
+max_bytes whatever the size of the input.
+
+The verdict is about the bytes consumed; the matches carry that prefix only.
+"""
+from __future__ import annotations
+
+import codecs
+import logging
+from math import sqrt
+from typing import BinaryIO, Iterable
+
+from .api import explain_handler, logger
+from .cd import (
+    coherence_ratio,
+    encoding_languages,
+    mb_encoding_languages,
+    merge_coherence_ratios,
+)
+from .constant import IANA_SUPPORTED, TRACE
+from .md_table import mess_ratio
+from .models import CharsetMatch, CharsetMatches
+from .utils import (
+    any_specified_encoding,
+    iana_name,
+    identify_sig_or_bom,
+    is_cp_similar,
+    is_multi_byte_encoding,
+    should_strip_sig_or_bom,
+)
+
+# Bytes buffered before the candidates are set up, to look for a declaration
+SEARCH_ZONE: int = 8192
+
+# Default cap on the bytes consumed by a streaming detection
+STREAM_MAX_BYTES: int = 1 << 16
+
+# A candidate dominates when its mean mess is lower than every other's by
+# DOMINANCE_Z standard errors and at least DOMINANCE_MIN_LEAD (below that,
+# CharsetMatch ordering treats chaos as equal and looks at coherence)
+DOMINANCE_Z: float = 3.0
+DOMINANCE_MIN_LEAD: float = 0.01
+
+# Mean mess under which ascii, utf_8 or a declared encoding is taken at once
+PREFERRED_MAX_MESS: float = 0.1
+
+
+class _Candidate:
+    """Evidence gathered for one code page"""
+
+    __slots__ = (
+        "encoding",
+        "decoder",
+        "is_multi_byte",
+        "has_sig_or_bom",
+        "skip",
+        "end",
+        "windows",
+        "mess_sum",
+        "mess_square_sum",
+        "gave_up",
+        "samples",
+    )
+
+    def __init__(
+        self, encoding: str, is_multi_byte: bool, has_sig_or_bom: bool, skip: int
+    ):
+        self.encoding: str = encoding
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+        self.is_multi_byte: bool = is_multi_byte
+        self.has_sig_or_bom: bool = has_sig_or_bom
+        # Leading bytes (a stripped SIG) this decoder never sees
+        self.skip: int = skip
+        # End of the last window this candidate decoded
+        self.end: int = 0
+        self.windows: int = 0
+        self.mess_sum: float = 0.0
+        self.mess_square_sum: float = 0.0
+        self.gave_up: int = 0
+        self.samples: list[str] = []
+
+    @property
+    def mean_mess(self) -> float:
+        return self.mess_sum / self.windows if self.windows else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        if self.windows < 2:
+            return 0.0
+        mean = self.mean_mess
+        variance = max(self.mess_square_sum / self.windows - mean * mean, 0.0)
+        return sqrt(variance / self.windows)
+
+    def pending(self) -> int:
+        """Bytes of an incomplete character held by the decoder"""
+        return len(self.decoder.getstate()[0])
+
+
+class StreamingDetector:
+    """
+    Feed bytes as they arrive, stop feeding once `done`, then call result().
+
+        detector = StreamingDetector()
+        for block in response.iter_content(8192):
+            if detector.feed(block):
+                break
+        best_guess = detector.result().best()
+
+    Parameters mean the same as for from_bytes; chunk_size is the window (in
+    bytes) each candidate's mess is measured on, and no candidate is judged
+    on fewer than `steps` windows unless the input is shorter.
+    """
+
+    def __init__(
+        self,
+        steps: int = 5,
+        chunk_size: int = 512,
+        threshold: float = 0.2,
+        cp_isolation: list[str] | None = None,
+        cp_exclusion: list[str] | None = None,
+        preemptive_behaviour: bool = True,
+        language_threshold: float = 0.1,
+        enable_fallback: bool = True,
+        max_bytes: int = STREAM_MAX_BYTES,
+    ):
+        self.steps: int = max(steps, 1)
+        self.chunk_size: int = max(chunk_size, 1)
+        self.threshold: float = threshold
+        self.cp_isolation: list[str] = [
+            iana_name(cp, False) for cp in cp_isolation or []
+        ]
+        self.cp_exclusion: list[str] = [
+            iana_name(cp, False) for cp in cp_exclusion or []
+        ]
+        self.preemptive_behaviour: bool = preemptive_behaviour
+        self.language_threshold: float = language_threshold
+        self.enable_fallback: bool = enable_fallback
+        self.max_bytes: int = max(max_bytes, self.chunk_size)
+
+        # Gave up on this many windows over the threshold, as from_bytes does
+        self.max_gave_up: int = max(int(self.steps / 4), 2)
+
+        self.consumed: bytearray = bytearray()
+        self.done: bool = False
+        self.eof: bool = False
+
+        self._offset: int = 0  # start of the next window in self.consumed
+        self._candidates: list[_Candidate] | None = None
+        self._reserve: list[_Candidate] = []
+        self._soft_failed: list[str] = []
+        self._fallbacks: dict[str, _Candidate] = {}
+        self._specified_encoding: str | None = None
+        self._winner: _Candidate | None = None
+
+    def feed(self, data: bytes | bytearray | memoryview) -> bool:
+        """
+        Consume more input, returning True once detection is decided. Input
+        past max_bytes and anything fed after that is ignored.
+        """
+        if self.done:
+            return True
+
+        room: int = self.max_bytes - len(self.consumed)
+        self.consumed += data[:room]
+
+        if self._candidates is None and len(self.consumed) >= min(
+            SEARCH_ZONE, self.max_bytes
+        ):
+            self._setup()
+
+        if self._candidates is not None:
+            while not self.done and len(self.consumed) - self._offset >= self.chunk_size:
+                self._evaluate(self._offset + self.chunk_size)
+
+        if not self.done and len(self.consumed) >= self.max_bytes:
+            logger.log(
+                TRACE,
+                "Streaming detection reached max_bytes (%i) without a dominant candidate.",
+                self.max_bytes,
+            )
+            self._finish()
+
+        return self.done
+
+    def close(self) -> None:
+        """Signal the end of the input, deciding on whatever was consumed."""
+        if self.done:
+            return
+        self.eof = True
+        if self._candidates is None:
+            self._setup()
+        # The last window also flushes the decoders, so that an incomplete
+        # trailing character fails
+        while True:
+            while not self.done:
+                end: int = min(self._offset + self.chunk_size, len(self.consumed))
+                self._evaluate(end)
+                if end == len(self.consumed):
+                    break
+            if self._settle():
+                break
+        self._finish()
+
+    def result(self) -> CharsetMatches:
+        """
+        The matches for the bytes consumed, best first. A single match when a
+        candidate was found dominant. Closes the detector if it is not done.
+        """
+        if not self.done:
+            self.close()
+
+        payload: bytes = bytes(self.consumed)
+
+        if not payload:
+            logger.debug("Encoding detection on empty bytes, assuming utf_8 intention.")
+            return CharsetMatches([CharsetMatch(payload, "utf_8", 0.0, False, [], "")])
+
+        if self._winner is not None:
+            return CharsetMatches([self._match(self._winner, payload)])
+
+        results = CharsetMatches()
+        for candidate in self._candidates or []:
+            if not self._is_messy(candidate):
+                results.append(self._match(candidate, payload))
+
+        if not results and self.enable_fallback:
+            for encoding in (self._specified_encoding, "utf_8", "ascii"):
+                # Like from_bytes, only a fallback that decodes everything
+                if encoding in self._fallbacks and self._catch_up(
+                    self._fallbacks[encoding]
+                ):
+                    logger.debug(
+                        "Encoding detection: %s will be used as a fallback match",
+                        encoding,
+                    )
+                    results.append(
+                        self._match(self._fallbacks[encoding], payload, self.threshold)
+                    )
+                    break
+
+        if results:
+            logger.debug(
+                "Encoding detection: Found %s as plausible (best-candidate) for content. With %i alternatives.",
+                results.best().encoding,  # type: ignore
+                len(results) - 1,
+            )
+        else:
+            logger.debug("Encoding detection: Unable to determine any suitable charset.")
+
+        return results
+
+    def _setup(self) -> None:
+        """
+        Build the candidates in from_bytes order. Like from_bytes, ascii, utf_8
+        and a declared or BOM-marked encoding are tried first: the other code
+        pages are only opened (and caught up on the bytes already consumed)
+        when none of those is clean.
+        """
+        head: bytes = bytes(self.consumed[:SEARCH_ZONE])
+        prioritized_encodings: list[str] = []
+
+        if self.preemptive_behaviour:
+            self._specified_encoding = any_specified_encoding(head)
+            if self._specified_encoding is not None:
+                prioritized_encodings.append(self._specified_encoding)
+
+        sig_encoding, sig_payload = identify_sig_or_bom(head)
+        if sig_encoding is not None:
+            prioritized_encodings.append(sig_encoding)
+
+        prioritized_encodings.append("ascii")
+        if "utf_8" not in prioritized_encodings:
+            prioritized_encodings.append("utf_8")
+
+        self._candidates = []
+        seen: set[str] = set()
+
+        for encoding_iana in prioritized_encodings + IANA_SUPPORTED:
+            if self.cp_isolation and encoding_iana not in self.cp_isolation:
+                continue
+            if self.cp_exclusion and encoding_iana in self.cp_exclusion:
+                continue
+            if encoding_iana in seen:
+                continue
+            seen.add(encoding_iana)
+
+            has_sig_or_bom: bool = sig_encoding == encoding_iana
+
+            if encoding_iana in {"utf_16", "utf_32", "utf_7"} and not has_sig_or_bom:
+                continue
+
+            try:
+                is_multi_byte: bool = is_multi_byte_encoding(encoding_iana)
+                skip: int = (
+                    len(sig_payload)
+                    if has_sig_or_bom and should_strip_sig_or_bom(encoding_iana)
+                    else 0
+                )
+                candidate = _Candidate(encoding_iana, is_multi_byte, has_sig_or_bom, skip)
+            except (ModuleNotFoundError, ImportError, LookupError):
+                logger.log(
+                    TRACE,
+                    "Encoding %s does not provide an IncrementalDecoder",
+                    encoding_iana,
+                )
+                continue
+
+            if encoding_iana in prioritized_encodings:
+                self._candidates.append(candidate)
+            else:
+                self._reserve.append(candidate)
+
+        logger.log(
+            TRACE,
+            "Streaming detection over %i candidate(s) (%i held back), window of %i byte(s).",
+            len(self._candidates) + len(self._reserve),
+            len(self._reserve),
+            self.chunk_size,
+        )
+
+    def _step(self, candidate: _Candidate, start: int, end: int, final: bool) -> bool:
+        """Decode consumed[start:end] with one candidate, False once it is out"""
+        window = memoryview(self.consumed)[max(start, candidate.skip) : end]
+
+        try:
+            decoded: str = candidate.decoder.decode(window, final)
+        except UnicodeDecodeError as e:
+            logger.log(
+                TRACE,
+                "Code page %s does not fit the stream at ALL. %s",
+                candidate.encoding,
+                str(e),
+            )
+            return False
+        finally:
+            window.release()
+
+        candidate.end = end
+
+        if decoded:
+            ratio: float = mess_ratio(decoded, self.threshold)
+            candidate.windows += 1
+            candidate.mess_sum += ratio
+            candidate.mess_square_sum += ratio * ratio
+            if ratio >= self.threshold:
+                candidate.gave_up += 1
+            if len(candidate.samples) < self.steps:
+                candidate.samples.append(decoded)
+
+        if candidate.gave_up >= self.max_gave_up or (
+            candidate.windows >= self.steps and self._is_messy(candidate)
+        ):
+            self._exclude(candidate)
+            return False
+
+        return True
+
+    def _is_messy(self, candidate: _Candidate) -> bool:
+        return candidate.windows > 0 and candidate.mean_mess >= self.threshold
+
+    def _exclude(self, candidate: _Candidate) -> None:
+        """Record a candidate dropped for its mess, as a fallback if preferred"""
+        logger.log(
+            TRACE,
+            "%s was excluded because of chaos probing. Gave up %i time(s). "
+            "Computed mean chaos is %f %%.",
+            candidate.encoding,
+            candidate.gave_up,
+            round(candidate.mean_mess * 100, ndigits=3),
+        )
+        if candidate.encoding in {"ascii", "utf_8", self._specified_encoding}:
+            self._fallbacks[candidate.encoding] = candidate
+        self._soft_failed.append(candidate.encoding)
+
+    def _drop_messy(self) -> None:
+        """
+        Exclude the candidates at or over the threshold on fewer than `steps`
+        windows: once the input ends, from_bytes judges whatever it sampled.
+        """
+        assert self._candidates is not None
+
+        kept: list[_Candidate] = []
+        for candidate in self._candidates:
+            if self._is_messy(candidate):
+                self._exclude(candidate)
+            else:
+                kept.append(candidate)
+        self._candidates = kept
+
+    def _evaluate(self, end: int) -> None:
+        """Feed consumed[offset:end] to the open candidates, prune, maybe decide"""
+        assert self._candidates is not None
+
+        final: bool = self.eof and end == len(self.consumed)
+        self._candidates = [
+            candidate
+            for candidate in self._candidates
+            if self._step(candidate, self._offset, end, final)
+        ]
+        self._offset = end
+
+        self._decide(final)
+
+    def _open_reserve(self) -> None:
+        """Start the held back code pages, replaying the windows seen so far"""
+        assert self._candidates is not None
+
+        for candidate in self._reserve:
+            similar: str | None = next(
+                (
+                    encoding
+                    for encoding in self._soft_failed
+                    if is_cp_similar(candidate.encoding, encoding)
+                ),
+                None,
+            )
+            if similar is not None:
+                logger.log(
+                    TRACE,
+                    "%s is deemed too similar to code page %s and was consider unsuited already. Continuing!",
+                    candidate.encoding,
+                    similar,
+                )
+                continue
+
+            alive: bool = True
+            for start in range(0, self._offset, self.chunk_size):
+                end: int = min(start + self.chunk_size, self._offset)
+                final: bool = self.eof and end == len(self.consumed)
+                if not self._step(candidate, start, end, final):
+                    alive = False
+                    break
+            if alive:
+                self._candidates.append(candidate)
+
+        self._reserve = []
+
+    def _decide(self, final: bool) -> None:
+        """
+        Stop as soon as one candidate dominates the others, or the others
+        left are indistinguishable from it.
+        """
+        assert self._candidates is not None
+
+        if not self._candidates and not self._reserve:
+            self.done = True
+            return
+
+        # A BOM or SIG that decodes cleanly is taken at once, as in from_bytes
+        for candidate in self._candidates:
+            if (
+                candidate.has_sig_or_bom
+                and candidate.windows
+                and not self._is_messy(candidate)
+            ):
+                self._decided(candidate, "a BOM or SIG and a clean decode")
+                return
+
+        windows: int = max((c.windows for c in self._candidates), default=0)
+
+        if self._candidates and windows < self.steps and not final:
+            return
+
+        if self._reserve:
+            # ascii, utf_8 and a declared encoding need no contest when clean,
+            # ascii first as in from_bytes. While everything read is ASCII,
+            # read on (up to max_bytes): the rest may not be, and ascii is
+            # only the answer for input that is ASCII throughout.
+            preferred_order = [self._specified_encoding, "ascii", "utf_8"]
+            if not final and any(
+                candidate.encoding == "ascii"
+                and candidate.mean_mess < PREFERRED_MAX_MESS
+                for candidate in self._candidates
+            ):
+                return
+
+            for encoding in preferred_order:
+                for candidate in self._candidates:
+                    if (
+                        candidate.encoding == encoding
+                        and candidate.mean_mess < PREFERRED_MAX_MESS
+                    ):
+                        self._decided(candidate, "a clean preferred encoding")
+                        return
+
+            self._open_reserve()
+
+            if not self._candidates:
+                self.done = True
+                return
+
+            windows = max(c.windows for c in self._candidates)
+            if windows < self.steps and not final:
+                return
+
+        if final:
+            self._drop_messy()
+            if not self._candidates:
+                self.done = True
+                return
+
+        if len(self._candidates) == 1:
+            self._decided(self._candidates[0], "the only candidate left")
+            return
+
+        ranked = sorted(self._candidates, key=lambda c: c.mean_mess)
+        best: _Candidate = ranked[0]
+        equivalents: list[_Candidate] = []
+
+        for other in ranked[1:]:
+            lead: float = other.mean_mess - best.mean_mess
+            spread: float = DOMINANCE_Z * sqrt(
+                best.standard_error**2 + other.standard_error**2
+            )
+            if lead + spread < DOMINANCE_MIN_LEAD:
+                equivalents.append(other)
+            elif lead < DOMINANCE_MIN_LEAD or lead <= spread:
+                # Neither dominated nor equivalent yet: needs more input
+                if final:
+                    self.done = True
+                return
+
+        if not equivalents:
+            self._decided(best, f"dominant over {ranked[1].encoding}")
+            return
+
+        logger.debug(
+            "Encoding detection: %s and %i indistinguishable alternative(s) after %i byte(s).",
+            best.encoding,
+            len(equivalents),
+            self._offset,
+        )
+        self._candidates = [best] + equivalents
+        self.done = True
+
+    def _decided(self, candidate: _Candidate, reason: str) -> None:
+        logger.debug(
+            "Encoding detection: %s is most likely the one (%s) after %i byte(s).",
+            candidate.encoding,
+            reason,
+            self._offset,
+        )
+        self._winner = candidate
+        self.done = True
+
+    def _settle(self) -> bool:
+        """
+        Check the chosen candidates on the rest of an input that is entirely
+        consumed. False when none of them fits and detection must go on.
+        """
+        chosen: list[_Candidate] = (
+            [self._winner] if self._winner is not None else list(self._candidates or [])
+        )
+        fitting: list[_Candidate] = []
+
+        for candidate in chosen:
+            if self._catch_up(candidate):
+                fitting.append(candidate)
+
+        if fitting or not chosen:
+            if self._winner is None:
+                self._candidates = fitting
+            return True
+
+        self._candidates = [c for c in self._candidates or [] if c not in chosen]
+        self._winner = None
+        self.done = False
+        return False
+
+    def _catch_up(self, candidate: _Candidate) -> bool:
+        """Decode the rest of the consumed bytes, False when they do not fit"""
+        if candidate.end < len(self.consumed):
+            window = memoryview(self.consumed)[max(candidate.end, candidate.skip) :]
+            try:
+                candidate.decoder.decode(window, True)
+            except UnicodeDecodeError:
+                logger.log(
+                    TRACE,
+                    "Code page %s does not fit the rest of the stream.",
+                    candidate.encoding,
+                )
+                return False
+            finally:
+                window.release()
+            candidate.end = len(self.consumed)
+        return True
+
+    def _finish(self) -> None:
+        if self._candidates is None:
+            self._setup()
+        if not self.done:
+            self._decide(True)
+        self.done = True
+
+    def _match(
+        self, candidate: _Candidate, payload: bytes, chaos: float | None = None
+    ) -> CharsetMatch:
+        """CharsetMatch over the consumed bytes this candidate fully decoded"""
+        raw: bytes = payload[: candidate.end - candidate.pending()]
+
+        languages = []
+        if chaos is None and candidate.encoding != "ascii":
+            target_languages: list[str] = (
+                mb_encoding_languages(candidate.encoding)
+                if candidate.is_multi_byte
+                else encoding_languages(candidate.encoding)
+            )
+            languages = merge_coherence_ratios(
+                [
+                    coherence_ratio(
+                        sample,
+                        self.language_threshold,
+                        ",".join(target_languages) if target_languages else None,
+                    )
+                    for sample in candidate.samples
+                ]
+            )
+
+        return CharsetMatch(
+            raw,
+            candidate.encoding,
+            candidate.mean_mess if chaos is None else chaos,
+            candidate.has_sig_or_bom,
+            languages,
+            codecs.decode(raw[candidate.skip :], candidate.encoding, "ignore"),
+            preemptive_declaration=self._specified_encoding,
+        )
+
+
+def from_stream(
+    source: BinaryIO | Iterable[bytes] | bytes | bytearray,
+    steps: int = 5,
+    chunk_size: int = 512,
+    threshold: float = 0.2,
+    cp_isolation: list[str] | None = None,
+    cp_exclusion: list[str] | None = None,
+    preemptive_behaviour: bool = True,
+    explain: bool = False,
+    language_threshold: float = 0.1,
+    enable_fallback: bool = True,
+    max_bytes: int = STREAM_MAX_BYTES,
+    block_size: int = 8192,
+) -> CharsetMatches:
+    """
+    Streaming counterpart of from_fp: read source (a binary file object, a
+    socket file, an iterable of byte blocks such as requests' iter_content,
+    or bytes) block by block and stop as soon as the encoding is decided, or
+    after max_bytes. Unlike from_fp, the input is never read whole, and the
+    returned matches only cover the bytes consumed. Will not close source.
+    """
+    if explain:
+        previous_logger_level: int = logger.level
+        logger.addHandler(explain_handler)
+        logger.setLevel(TRACE)
+
+    detector = StreamingDetector(
+        steps,
+        chunk_size,
+        threshold,
+        cp_isolation,
+        cp_exclusion,
+        preemptive_behaviour,
+        language_threshold,
+        enable_fallback,
+        max_bytes,
+    )
+
+    try:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            view = memoryview(source)
+            for start in range(0, len(view), block_size):
+                if detector.feed(view[start : start + block_size]):
+                    break
+        elif hasattr(source, "read"):
+            while not detector.done:
+                block: bytes = source.read(block_size)  # type: ignore[union-attr]
+                if not block:
+                    break
+                detector.feed(block)
+        else:
+            for block in source:
+                if detector.feed(block):
+                    break
+
+        return detector.result()
+    finally:
+        if explain:
+            logger.removeHandler(explain_handler)
+            logger.setLevel(previous_logger_level or logging.WARNING)
@@ -20,26 +20,45 @@ from .constant import (
     UNICODE_RANGES_COMBINED,
     UNICODE_SECONDARY_RANGE_KEYWORD,
     UTF8_MAXIMAL_ALLOCATION,
-    COMMON_CJK_CHARACTERS,
+)
+from .proptable import (
+    ACCENTUATED,
+    ARABIC,
+    ARABIC_ISOLATED_FORM,
+    BMP_FLAGS,
+    BMP_RANGES,
+    BMP_SIZE,
+    CASE_VARIABLE,
+    CJK,
+    CJK_UNCOMMON,
+    EMOTICON,
+    HANGUL,
+    HIRAGANA,
+    KATAKANA,
+    LATIN,
+    PUNCTUATION,
+    RANGE_NAMES,
+    SEPARATOR,
+    SYMBOL,
+    THAI,
+    UNPRINTABLE,
+    character_flags,
+    character_properties,
 )
 
 
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
+# The character predicates read the bit flags in proptable: one array lookup
+# per call, computed once per code point, instead of a cache per predicate.
+
+
+def _has_flag(character: str, flag: int) -> bool:
+    code_point: int = ord(character)
+    flags: int = BMP_FLAGS[code_point] if code_point < BMP_SIZE else 0
+    return (flags or character_flags(character)) & flag != 0
+
+
 def is_accentuated(character: str) -> bool:
-    try:
-        description: str = unicodedata.name(character)
-    except ValueError:  # Defensive: unicode database outdated?
-        return False
-    return (
-        "WITH GRAVE" in description
-        or "WITH ACUTE" in description
-        or "WITH CEDILLA" in description
-        or "WITH DIAERESIS" in description
-        or "WITH CIRCUMFLEX" in description
-        or "WITH TILDE" in description
-        or "WITH MACRON" in description
-        or "WITH RING ABOVE" in description
-    )
+    return _has_flag(character, ACCENTUATED)
 
 
 @lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
@@ -53,157 +72,70 @@ def remove_accent(character: str) -> str:
     return chr(int(codes[0], 16))
 
 
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def unicode_range(character: str) -> str | None:
     """
     Retrieve the Unicode range official name from a single character.
     """
-    character_ord: int = ord(character)
-
-    for range_name, ord_range in UNICODE_RANGES_COMBINED.items():
-        if character_ord in ord_range:
-            return range_name
-
-    return None
+    code_point: int = ord(character)
+    if code_point < BMP_SIZE and BMP_FLAGS[code_point]:
+        return RANGE_NAMES[BMP_RANGES[code_point]]
+    return RANGE_NAMES[character_properties(character)[1]]
 
 
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_latin(character: str) -> bool:
-    try:
-        description: str = unicodedata.name(character)
-    except ValueError:  # Defensive: unicode database outdated?
-        return False
-    return "LATIN" in description
+    return _has_flag(character, LATIN)
 
 
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_punctuation(character: str) -> bool:
-    character_category: str = unicodedata.category(character)
-
-    if "P" in character_category:
-        return True
-
-    character_range: str | None = unicode_range(character)
-
-    if character_range is None:
-        return False
-
-    return "Punctuation" in character_range
+    return _has_flag(character, PUNCTUATION)
 
 
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_symbol(character: str) -> bool:
-    character_category: str = unicodedata.category(character)
-
-    if "S" in character_category or "N" in character_category:
-        return True
-
-    character_range: str | None = unicode_range(character)
+    return _has_flag(character, SYMBOL)
 
-    if character_range is None:
-        return False
 
-    return "Forms" in character_range and character_category != "Lo"
-
-
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_emoticon(character: str) -> bool:
-    character_range: str | None = unicode_range(character)
+    return _has_flag(character, EMOTICON)
 
-    if character_range is None:
-        return False
 
-    return "Emoticons" in character_range or "Pictographs" in character_range
-
-
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_separator(character: str) -> bool:
-    if character.isspace() or character in {"｜", "+", "<", ">"}:
-        return True
+    return _has_flag(character, SEPARATOR)
 
-    character_category: str = unicodedata.category(character)
 
-    return "Z" in character_category or character_category in {"Po", "Pd", "Pc"}
-
-
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_case_variable(character: str) -> bool:
-    return character.islower() != character.isupper()
+    return _has_flag(character, CASE_VARIABLE)
 
 
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_cjk(character: str) -> bool:
-    try:
-        character_name = unicodedata.name(character)
-    except ValueError:  # Defensive: unicode database outdated?
-        return False
-
-    return "CJK" in character_name
+    return _has_flag(character, CJK)
 
 
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_hiragana(character: str) -> bool:
-    try:
-        character_name = unicodedata.name(character)
-    except ValueError:  # Defensive: unicode database outdated?
-        return False
+    return _has_flag(character, HIRAGANA)
 
-    return "HIRAGANA" in character_name
 
-
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_katakana(character: str) -> bool:
-    try:
-        character_name = unicodedata.name(character)
-    except ValueError:  # Defensive: unicode database outdated?
-        return False
-
-    return "KATAKANA" in character_name
+    return _has_flag(character, KATAKANA)
 
 
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_hangul(character: str) -> bool:
-    try:
-        character_name = unicodedata.name(character)
-    except ValueError:  # Defensive: unicode database outdated?
-        return False
-
-    return "HANGUL" in character_name
+    return _has_flag(character, HANGUL)
 
 
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_thai(character: str) -> bool:
-    try:
-        character_name = unicodedata.name(character)
-    except ValueError:  # Defensive: unicode database outdated?
-        return False
+    return _has_flag(character, THAI)
 
-    return "THAI" in character_name
 
-
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_arabic(character: str) -> bool:
-    try:
-        character_name = unicodedata.name(character)
-    except ValueError:  # Defensive: unicode database outdated?
-        return False
-
-    return "ARABIC" in character_name
+    return _has_flag(character, ARABIC)
 
 
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_arabic_isolated_form(character: str) -> bool:
-    try:
-        character_name = unicodedata.name(character)
-    except ValueError:  # Defensive: unicode database outdated?
-        return False
-
-    return "ARABIC" in character_name and "ISOLATED FORM" in character_name
+    return _has_flag(character, ARABIC_ISOLATED_FORM)
 
 
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_cjk_uncommon(character: str) -> bool:
-    return character not in COMMON_CJK_CHARACTERS
+    return _has_flag(character, CJK_UNCOMMON)
 
 
 @lru_cache(maxsize=len(UNICODE_RANGES_COMBINED))
@@ -211,15 +143,8 @@ def is_unicode_range_secondary(range_name: str) -> bool:
     return any(keyword in range_name for keyword in UNICODE_SECONDARY_RANGE_KEYWORD)
 
 
-@lru_cache(maxsize=UTF8_MAXIMAL_ALLOCATION)
 def is_unprintable(character: str) -> bool:
-    return (
-        character.isspace() is False  # includes \n \t \r \v
-        and character.isprintable() is False
-        and character != "\x1a"  # Why? Its the ASCII substitute character.
-        and character != "\ufeff"  # bug discovered in Python,
-        # Zero Width No-Break Space located in 	Arabic Presentation Forms-B, Unicode 1.1 not acknowledged as space.
-    )
+    return _has_flag(character, UNPRINTABLE)
 
 
 def any_specified_encoding(sequence: bytes, search_zone: int = 8192) -> str | None:
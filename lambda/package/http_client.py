@@ -0,0 +1,62 @@
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import rate_limit
+from tracing import http_span, record
+
+# One pooled session per container, so warm invocations reuse connections
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=32))
+session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+
+def _throttle(host):
+    """Wait for the host's rate limiter, recording any time spent waiting"""
+    waited = rate_limit.acquire(host)
+    if waited:
+        record('http.throttle', waited * 1000, {'Host': host})
+
+
+def request(method, url, **kwargs):
+    """Send an HTTP request through the shared session, timing every phase"""
+    host = urlsplit(url).hostname or ''
+    _throttle(host)
+    with http_span(host) as headers_received:
+        response = session.request(method, url, stream=True, **kwargs)
+        headers_received()
+        rate_limit.observe(host, response)
+        response.content  # Read the body inside the span
+    return response
+
+
+@contextmanager
+def stream(method, url, **kwargs):
+    """
+    Like request, but yields the response with its body still unread.
+
+    Read it inside the with block (iter_content). Whatever the caller leaves
+    unread is drained afterwards so the connection goes back to the pool.
+    Body time includes whatever the caller does between reads.
+    """
+    host = urlsplit(url).hostname or ''
+    _throttle(host)
+    with http_span(host) as headers_received:
+        response = session.request(method, url, stream=True, **kwargs)
+        headers_received()
+        rate_limit.observe(host, response)
+        try:
+            yield response
+        finally:
+            response.raw.drain_conn()
+            response.close()
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
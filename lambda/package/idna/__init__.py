@@ -18,7 +18,7 @@ from .core import (
     valid_label_length,
     valid_string_length,
 )
-from .intranges import intranges_contain
+from .intranges import intranges_contain, intranges_contain_many
 from .package_data import __version__
 
 __all__ = [
@@ -36,6 +36,7 @@ __all__ = [
     "decode",
     "encode",
     "intranges_contain",
+    "intranges_contain_many",
     "ulabel",
     "uts46_remap",
     "valid_contextj",
@@ -1,14 +1,19 @@
-import bisect
 import re
 import unicodedata
+from functools import lru_cache
 from typing import Optional, Union
 
-from . import idnadata
-from .intranges import intranges_contain
+from . import tables
+from .intranges import intranges_contain, intranges_contain_many
 
 _virama_combining_class = 9
 _alabel_prefix = b"xn--"
 _unicode_dots_re = re.compile("[\u002e\u3002\uff0e\uff61]")
+# A label of ASCII letters, digits and hyphens that check_hyphen_ok accepts
+_ldh_label = r"(?![a-zA-Z0-9-]{2}--)(?!-)[a-zA-Z0-9-]{1,63}(?<!-)"
+_ldh_domain_re = re.compile(r"(?:{0}\.)*{0}\.?".format(_ldh_label), re.ASCII)
+# Other domains encoded recently: clients resolve the same few hosts over and over
+_encode_cache_size = 256
 
 
 class IDNAError(UnicodeError):
@@ -44,7 +49,7 @@ def _combining_class(cp: int) -> int:
 
 
 def _is_script(cp: str, script: str) -> bool:
-    return intranges_contain(ord(cp), idnadata.scripts[script])
+    return intranges_contain(ord(cp), tables.script(script))
 
 
 def _punycode(s: str) -> bytes:
@@ -166,7 +171,7 @@ def valid_contextj(label: str, pos: int) -> bool:
 
         ok = False
         for i in range(pos - 1, -1, -1):
-            joining_type = idnadata.joining_types.get(ord(label[i]))
+            joining_type = tables.joining_type(ord(label[i]))
             if joining_type == ord("T"):
                 continue
             elif joining_type in [ord("L"), ord("D")]:
@@ -180,7 +185,7 @@ def valid_contextj(label: str, pos: int) -> bool:
 
         ok = False
         for i in range(pos + 1, len(label)):
-            joining_type = idnadata.joining_types.get(ord(label[i]))
+            joining_type = tables.joining_type(ord(label[i]))
             if joining_type == ord("T"):
                 continue
             elif joining_type in [ord("R"), ord("D")]:
@@ -252,11 +257,13 @@ def check_label(label: Union[str, bytes, bytearray]) -> None:
     check_hyphen_ok(label)
     check_initial_combiner(label)
 
-    for pos, cp in enumerate(label):
-        cp_value = ord(cp)
-        if intranges_contain(cp_value, idnadata.codepoint_classes["PVALID"]):
+    code_points = [ord(cp) for cp in label]
+    pvalid = intranges_contain_many(code_points, tables.codepoint_class("PVALID"))
+
+    for pos, cp_value in enumerate(code_points):
+        if pvalid[pos]:
             continue
-        elif intranges_contain(cp_value, idnadata.codepoint_classes["CONTEXTJ"]):
+        elif intranges_contain(cp_value, tables.codepoint_class("CONTEXTJ")):
             try:
                 if not valid_contextj(label, pos):
                     raise InvalidCodepointContext(
@@ -268,7 +275,7 @@ def check_label(label: Union[str, bytes, bytearray]) -> None:
                         _unot(cp_value), pos + 1, repr(label)
                     )
                 )
-        elif intranges_contain(cp_value, idnadata.codepoint_classes["CONTEXTO"]):
+        elif intranges_contain(cp_value, tables.codepoint_class("CONTEXTO")):
             if not valid_contexto(label, pos):
                 raise InvalidCodepointContext(
                     "Codepoint {} not allowed at position {} in {}".format(_unot(cp_value), pos + 1, repr(label))
@@ -331,18 +338,12 @@ def ulabel(label: Union[str, bytes, bytearray]) -> str:
 
 def uts46_remap(domain: str, std3_rules: bool = True, transitional: bool = False) -> str:
     """Re-map the characters in the string according to UTS46 processing."""
-    from .uts46data import uts46data
-
     output = ""
 
     for pos, char in enumerate(domain):
         code_point = ord(char)
         try:
-            uts46row = uts46data[code_point if code_point < 256 else bisect.bisect_left(uts46data, (code_point, "Z")) - 1]
-            status = uts46row[1]
-            replacement: Optional[str] = None
-            if len(uts46row) == 3:
-                replacement = uts46row[2]
+            status, replacement = tables.uts46_row(code_point)
             if (
                 status == "V"
                 or (status == "D" and not transitional)
@@ -375,6 +376,14 @@ def encode(
             s = str(s, "ascii")
         except UnicodeDecodeError:
             raise IDNAError("should pass a unicode string to the function rather than a byte string.")
+    if _ldh_domain_re.fullmatch(s) and len(s) <= (254 if s.endswith(".") else 253):
+        # Already its own encoding: nothing for UTS46 to map but case, nothing to check
+        return (s.lower() if uts46 else s).encode("ascii")
+    return _encode(s, strict, uts46, std3_rules, transitional)
+
+
+@lru_cache(maxsize=_encode_cache_size)
+def _encode(s: str, strict: bool, uts46: bool, std3_rules: bool, transitional: bool) -> bytes:
     if uts46:
         s = uts46_remap(s, std3_rules, transitional)
     trailing_dot = False
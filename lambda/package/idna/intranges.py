@@ -2,11 +2,12 @@
 Given a list of integers, made up of (hopefully) a small number of long runs
 of consecutive integers, compute a representation of the form
 ((start1, end1), (start2, end2) ...). Then answer the question "was x present
-in the original list?" in time O(log(# runs)).
+in the original list?" in time O(log(# runs)), or for many integers at once
+with intranges_contain_many.
 """
 
 import bisect
-from typing import List, Tuple
+from typing import Iterable, List, Sequence, Set, Tuple
 
 
 def intranges_from_list(list_: List[int]) -> Tuple[int, ...]:
@@ -31,15 +32,18 @@ def intranges_from_list(list_: List[int]) -> Tuple[int, ...]:
     return tuple(ranges)
 
 
+_range_end_mask = (1 << 32) - 1
+
+
 def _encode_range(start: int, end: int) -> int:
     return (start << 32) | end
 
 
 def _decode_range(r: int) -> Tuple[int, int]:
-    return (r >> 32), (r & ((1 << 32) - 1))
+    return (r >> 32), (r & _range_end_mask)
 
 
-def intranges_contain(int_: int, ranges: Tuple[int, ...]) -> bool:
+def intranges_contain(int_: int, ranges: Sequence[int]) -> bool:
     """Determine if `int_` falls into one of the ranges in `ranges`."""
     tuple_ = _encode_range(int_, 0)
     pos = bisect.bisect_left(ranges, tuple_)
@@ -55,3 +59,27 @@ def intranges_contain(int_: int, ranges: Tuple[int, ...]) -> bool:
         if left == int_:
             return True
     return False
+
+
+def intranges_contain_many(ints: Iterable[int], ranges: Sequence[int]) -> List[bool]:
+    """Determine, for each of `ints`, if it falls into one of the ranges in `ranges`.
+
+    The distinct integers are merged in ascending order with the ranges: an
+    integer inside the range of the previous one needs no search, and each
+    search starts at the range the previous one stopped at.
+    """
+    values = list(ints)
+    contained: Set[int] = set()
+    pos = 0
+    end = 0
+    for int_ in sorted(set(values)):
+        if int_ >= end:
+            # the last range starting at or before int_, if any
+            pos = bisect.bisect_right(ranges, (int_ << 32) | _range_end_mask, pos)
+            if pos == 0:
+                continue
+            end = ranges[pos - 1] & _range_end_mask
+            if int_ >= end:
+                continue
+        contained.add(int_)
+    return [int_ in contained for int_ in values]
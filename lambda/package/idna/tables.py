@@ -0,0 +1,231 @@
+"""
+Compact binary form of the IDNA data tables.
+
+uts46data and idnadata are large generated literals: using them means
+compiling (or unmarshalling) the modules and holding tens of thousands of
+Python objects. The same data is kept here as sorted integer arrays in one
+data file, idnatables.bin, memory-mapped on first use and searched with
+bisect; each table is sliced out of the mapping the first time it is needed.
+Without a data file matching the Python modules (not generated, or generated
+from other data), a table is built from its module instead, on first use.
+
+Generate the data file with build_tables(DEFAULT_TABLES_PATH); the deployment
+build does this for the bundle.
+"""
+
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Optional, Sequence, Tuple
+
+# Data file: header, JSON directory of the sections, then the sections
+TABLES_MAGIC = b"IDNT"
+TABLES_FORMAT = 1
+TABLES_HEADER = struct.Struct("=4sH2x16sI")
+TABLES_ALIGNMENT = 8
+
+DEFAULT_TABLES_PATH = os.path.join(os.path.dirname(__file__), "idnatables.bin")
+
+# Path of the data file; empty to always build the tables from the modules
+TABLES_PATH = os.environ.get("IDNA_TABLES", DEFAULT_TABLES_PATH)
+
+# Modules the tables are generated from, in digest order
+SOURCE_MODULES = ("uts46data", "idnadata")
+
+# Set in a uts46 status byte when the row has a replacement (possibly empty)
+HAS_REPLACEMENT = 0x80
+
+_mapping: Optional[mmap.mmap] = None
+_directory: Optional[Dict[str, Tuple[str, int, int]]] = None
+_sections: Dict[str, Sequence[int]] = {}
+_uts46: Optional[Tuple[Sequence[int], Sequence[int], Sequence[int], Sequence[int]]] = None
+
+
+def sources_digest() -> Optional[bytes]:
+    """Fingerprint of the source modules, None when they cannot be read."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("{}\x00{}".format(TABLES_FORMAT, sys.byteorder).encode("ascii"))
+    try:
+        for name in SOURCE_MODULES:
+            with open(os.path.join(os.path.dirname(__file__), name + ".py"), "rb") as fp:
+                digest.update(fp.read())
+    except OSError:
+        return None
+    return digest.digest()
+
+
+def _uts46_sections() -> Dict[str, array]:
+    from .uts46data import uts46data
+
+    starts = array("I")
+    statuses = array("B")
+    offsets = array("I", [0])
+    replacements = bytearray()
+
+    for row in uts46data:
+        status = ord(row[1])
+        if len(row) == 3:
+            status |= HAS_REPLACEMENT
+            replacements += row[2].encode("utf-8")  # type: ignore[misc]
+        starts.append(row[0])
+        statuses.append(status)
+        offsets.append(len(replacements))
+
+    return {
+        "uts46_starts": starts,
+        "uts46_statuses": statuses,
+        "uts46_offsets": offsets,
+        "uts46_replacements": array("B", replacements),
+    }
+
+
+def _idnadata_sections() -> Dict[str, array]:
+    from . import idnadata
+
+    sections = {}
+    for name, ranges in idnadata.codepoint_classes.items():
+        sections["class_" + name] = array("Q", ranges)
+    for name, ranges in idnadata.scripts.items():
+        sections["script_" + name] = array("Q", ranges)
+
+    code_points = sorted(idnadata.joining_types)
+    sections["joining_code_points"] = array("I", code_points)
+    sections["joining_types"] = array("B", [idnadata.joining_types[cp] for cp in code_points])
+
+    return sections
+
+
+def build_tables(path: str) -> None:
+    """Generate the data file from the source modules, atomically."""
+    digest = sources_digest()
+    if digest is None:
+        raise OSError("IDNA source modules not found next to {}".format(__file__))
+
+    sections = _uts46_sections()
+    sections.update(_idnadata_sections())
+
+    directory = {}
+    offset = 0
+    for name, section in sections.items():
+        directory[name] = (section.typecode, offset, len(section))
+        offset += -(-len(section) * section.itemsize // TABLES_ALIGNMENT) * TABLES_ALIGNMENT
+
+    encoded_directory = json.dumps(directory, sort_keys=True).encode("ascii")
+    start = TABLES_HEADER.size + len(encoded_directory)
+    start += -start % TABLES_ALIGNMENT
+
+    temporary_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(temporary_path, "wb") as fp:
+        fp.write(TABLES_HEADER.pack(TABLES_MAGIC, TABLES_FORMAT, digest, len(encoded_directory)))
+        fp.write(encoded_directory)
+        for name, section in sections.items():
+            fp.seek(start + directory[name][1])
+            fp.write(section.tobytes())
+        fp.truncate(start + offset)
+    os.replace(temporary_path, path)
+
+
+def _map_tables(path: str) -> Optional[Tuple[mmap.mmap, Dict[str, Tuple[str, int, int]]]]:
+    if not path:
+        return None
+
+    try:
+        with open(path, "rb") as fp:
+            mapping = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, table_format, digest, directory_size = TABLES_HEADER.unpack_from(mapping)
+        if magic != TABLES_MAGIC or table_format != TABLES_FORMAT or digest != sources_digest():
+            raise ValueError("stale or foreign IDNA tables")
+
+        directory = {}
+        start = TABLES_HEADER.size + directory_size
+        start += -start % TABLES_ALIGNMENT
+        for name, (typecode, offset, count) in json.loads(
+            mapping[TABLES_HEADER.size : TABLES_HEADER.size + directory_size]
+        ).items():
+            if start + offset + count * array(typecode).itemsize > len(mapping):
+                raise ValueError("truncated IDNA tables")
+            directory[name] = (typecode, start + offset, count)
+    except (struct.error, ValueError, TypeError):
+        mapping.close()
+        return None
+
+    return mapping, directory
+
+
+def section(name: str) -> Sequence[int]:
+    """One table: a read-only view of the data file, or an array built from its module."""
+    global _mapping, _directory
+
+    table = _sections.get(name)
+    if table is not None:
+        return table
+
+    if _directory is None:
+        mapped = _map_tables(TABLES_PATH)
+        if mapped is None:
+            _directory = {}
+        else:
+            _mapping, _directory = mapped
+
+    if name in _directory:
+        typecode, offset, count = _directory[name]
+        itemsize = array(typecode).itemsize
+        table = memoryview(_mapping)[offset : offset + count * itemsize].cast(typecode)  # type: ignore[arg-type]
+        _sections[name] = table
+        return table
+
+    _sections.update(_uts46_sections() if name.startswith("uts46_") else _idnadata_sections())
+    return _sections[name]
+
+
+def _uts46_tables() -> Tuple[Sequence[int], Sequence[int], Sequence[int], Sequence[int]]:
+    global _uts46
+
+    _uts46 = (
+        section("uts46_starts"),
+        section("uts46_statuses"),
+        section("uts46_offsets"),
+        section("uts46_replacements"),
+    )
+    return _uts46
+
+
+def uts46_row(code_point: int) -> Tuple[str, Optional[str]]:
+    """Status and replacement (None without one) of the UTS46 row covering code_point."""
+    starts, statuses, offsets, replacements = _uts46 or _uts46_tables()
+    index = code_point if code_point < 256 else bisect.bisect_right(starts, code_point) - 1  # type: ignore[arg-type]
+
+    status = statuses[index]
+    if not status & HAS_REPLACEMENT:
+        return chr(status), None
+
+    replacement = str(replacements[offsets[index] : offsets[index + 1]], "utf-8")  # type: ignore[call-overload]
+    return chr(status & ~HAS_REPLACEMENT), replacement
+
+
+def codepoint_class(name: str) -> Sequence[int]:
+    """The intranges of an IDNA code point class (PVALID, CONTEXTJ, CONTEXTO)."""
+    return _sections.get("class_" + name) or section("class_" + name)
+
+
+def script(name: str) -> Sequence[int]:
+    """The intranges of a script (Greek, Han, Hebrew, Hiragana, Katakana)."""
+    return _sections.get("script_" + name) or section("script_" + name)
+
+
+def joining_type(code_point: int) -> Optional[int]:
+    """The joining type of a code point, as the ord() of its letter, or None."""
+    code_points = section("joining_code_points")
+    index = bisect.bisect_left(code_points, code_point)  # type: ignore[arg-type]
+    if index < len(code_points) and code_points[index] == code_point:
+        return section("joining_types")[index]
+    return None
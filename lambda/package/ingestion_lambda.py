@@ -0,0 +1,173 @@
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from data_agent_lambda import fetch_news
+from sentiment_agent_lambda import analyze_sentiment, is_degraded
+from report_agent_lambda import generate_report
+from report_cache import put_report
+from query_pipeline import MAX_ANALYZED
+from tracing import instrumented_handler
+
+# Log group of the interactive API function, used to find popular queries
+SOURCE_LOG_GROUP = os.environ.get('SOURCE_LOG_GROUP', '/aws/lambda/financial-agent')
+HOT_QUERY_LIMIT = int(os.environ.get('HOT_QUERY_LIMIT', '20'))
+HOT_QUERY_WINDOW_HOURS = int(os.environ.get('HOT_QUERY_WINDOW_HOURS', '24'))
+
+# Matches the line printed by lambda_function.lambda_handler for every request
+QUERY_LOG_PATTERN = re.compile(r"Fetching news for: (.+?)(?: \(max_articles=(\d+)\))?$")
+
+
+def parse_query_logs(lines):
+    """Count (query, max_articles) pairs in handler log lines"""
+    counts = Counter()
+    for line in lines:
+        match = QUERY_LOG_PATTERN.search(line.strip())
+        if not match:
+            continue
+        query = match.group(1).strip()
+        max_articles = int(match.group(2) or MAX_ANALYZED)
+        counts[(query, max_articles)] += 1
+    return counts
+
+
+def read_query_logs(log_group=SOURCE_LOG_GROUP, hours=HOT_QUERY_WINDOW_HOURS):
+    """Read request log lines from CloudWatch Logs"""
+    import boto3  # Available in the Lambda runtime
+
+    client = boto3.client('logs')
+    start = int((time.time() - hours * 3600) * 1000)
+    lines = []
+
+    paginator = client.get_paginator('filter_log_events')
+    for page in paginator.paginate(
+        logGroupName=log_group,
+        startTime=start,
+        filterPattern='"Fetching news for"'
+    ):
+        lines.extend(e['message'] for e in page.get('events', []))
+
+    return lines
+
+
+def hot_queries(event):
+    """
+    Build the list of queries to pre-warm, most popular first.
+
+    Explicit queries (event or HOT_QUERIES env var) come first, followed by
+    the most requested queries found in the handler logs.
+    """
+    pairs = []
+
+    explicit = list(event.get('queries') or [])
+    env_queries = os.environ.get('HOT_QUERIES', '')
+    explicit += [q.strip() for q in env_queries.split(',') if q.strip()]
+    for query in explicit:
+        pairs.append((query, MAX_ANALYZED))
+
+    limit = event.get('limit', HOT_QUERY_LIMIT)
+    try:
+        lines = event.get('log_lines')
+        if lines is None:
+            lines = read_query_logs(
+                event.get('log_group', SOURCE_LOG_GROUP),
+                event.get('hours', HOT_QUERY_WINDOW_HOURS)
+            )
+        counts = parse_query_logs(lines)
+        pairs += [pair for pair, _ in counts.most_common(limit)]
+    except Exception as e:
+        print(f"Error reading query logs: {e}")
+
+    # Remove duplicates, keeping the first (highest priority) occurrence
+    seen = set()
+    unique = []
+    for query, max_articles in pairs:
+        key = (' '.join(query.lower().split()), max_articles)
+        if key not in seen:
+            seen.add(key)
+            unique.append((query, max_articles))
+
+    return unique[:max(limit, len(explicit))]
+
+
+def precompute_report(query, max_articles):
+    """Run the full pipeline for a query and store the result"""
+    news = fetch_news(query=query, max_articles=max_articles)
+    if not news:
+        return None
+
+    sentiments = analyze_sentiment(news[:MAX_ANALYZED])
+    report = generate_report(sentiments)
+
+    payload = {
+        'success': True,
+        'query': query,
+        'articles_analyzed': len(sentiments),
+        'report': report
+    }
+    if is_degraded(sentiments):
+        payload['degraded'] = True
+    put_report(query, max_articles, payload)
+    return payload
+
+
+@instrumented_handler
+def lambda_handler(event, context):
+    """
+    Scheduled ingestion handler (EventBridge rule), pre-warms the report cache
+
+    Expected input (all optional):
+    {
+        "queries": ["Tesla stock"],
+        "limit": 20,
+        "hours": 24
+    }
+    """
+    event = event or {}
+    print(f"Received event: {json.dumps(event)}")
+
+    queries = hot_queries(event)
+    print(f"Pre-warming {len(queries)} queries")
+
+    warmed = []
+    failed = []
+    for query, max_articles in queries:
+        # Leave time to finish cleanly before the Lambda timeout
+        if context is not None and context.get_remaining_time_in_millis() < 10000:
+            print("Stopping early, running out of time")
+            break
+
+        try:
+            payload = precompute_report(query, max_articles)
+            if payload and payload.get('degraded'):
+                # Not cached: sentiment could not be scored, try again next run
+                print(f"Not warmed, degraded scores: {query}")
+                failed.append(query)
+            elif payload:
+                warmed.append(query)
+                print(f"Warmed: {query}")
+        except Exception as e:
+            print(f"Error warming {query}: {e}")
+            failed.append(query)
+
+    return {
+        'success': not failed,
+        'warmed': warmed,
+        'failed': failed
+    }
+
+
+# For local testing
+if __name__ == "__main__":
+    test_event = {
+        "queries": ["Tesla stock"],
+        "log_lines": ["Fetching news for: Apple stock (max_articles=5)"]
+    }
+
+    print(json.dumps(lambda_handler(test_event, None), indent=2))
@@ -1,14 +1,140 @@
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
 
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(__file__))
 
-from data_agent_lambda import fetch_news
-from sentiment_agent_lambda import analyze_sentiment
+from data_agent_lambda import fetch_news, iter_news
+from sentiment_agent_lambda import analyze_sentiment, is_degraded, iter_sentiment
 from report_agent_lambda import generate_report
+from report_cache import get_report, put_report
+from query_pipeline import BATCH_CONCURRENCY, MAX_ANALYZED, score_queries
+from response_encoding import build_response, build_raw_response, to_json
+from tracing import instrumented_handler
 
+# Largest ticker basket accepted in one multi-query request
+MAX_QUERIES = int(os.environ.get('MAX_QUERIES', '25'))
+
+def queries_error(queries):
+    """Why a "queries" value cannot be analyzed, or None if it can"""
+    if not isinstance(queries, list) or not queries:
+        return "'queries' must be a non-empty list"
+    if len(queries) > MAX_QUERIES:
+        return f"At most {MAX_QUERIES} queries per request"
+    if not all(isinstance(q, str) and q.strip() for q in queries):
+        return "Every query must be a non-empty string"
+    return None
+
+def analyze_queries(queries, max_articles):
+    """Build one payload per query, scoring all cache misses together"""
+    cache_articles = min(int(max_articles), MAX_ANALYZED)
+    results = [None] * len(queries)
+    misses = []
+    
+    def lookup(query):
+        print(f"Fetching news for: {query} (max_articles={cache_articles})")
+        return get_report(query, cache_articles)
+    
+    # Cache lookups are S3 GETs; run them side by side rather than one by one
+    with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY) as pool:
+        lookups = list(pool.map(lookup, queries))
+    
+    for i, cached in enumerate(lookups):
+        if cached is not None:
+            results[i] = dict(cached, cached=True)
+        else:
+            misses.append(i)
+    
+    print(f"{len(queries) - len(misses)} cached, scoring {len(misses)} queries")
+    
+    scored = score_queries([(queries[i], max_articles) for i in misses])
+    for i, result in zip(misses, scored):
+        if isinstance(result, Exception):
+            results[i] = {'success': False, 'query': queries[i], 'error': str(result)}
+            continue
+        if result.get('articles_analyzed'):
+            put_report(queries[i], cache_articles, result)
+        results[i] = result
+    
+    return results
+
+# Content types for streaming mode, selected by "stream" or the Accept header
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream'
+}
+
+def iter_report_events(query, max_articles):
+    """
+    Run the pipeline for one query, yielding events as results become available
+    
+    One "article" event per scored headline (with running tallies), then a
+    final "report" event carrying the same payload as the non-streaming mode.
+    Headlines are scored as they are parsed from the NewsAPI response, before
+    the rest of it has arrived.
+    """
+    cache_articles = min(int(max_articles), MAX_ANALYZED)
+    
+    print(f"Fetching news for: {query} (max_articles={cache_articles})")
+    
+    cached = get_report(query, cache_articles)
+    if cached is not None:
+        yield {'event': 'report', 'data': dict(cached, cached=True)}
+        return
+    
+    tallies = {'positive': 0, 'negative': 0, 'neutral': 0}
+    sentiments = []
+    with closing(iter_news(query=query, max_articles=max_articles)) as news:
+        for scored in iter_sentiment(islice(news, MAX_ANALYZED)):
+            sentiments.append(scored)
+            tallies[scored.label if scored.label in tallies else 'neutral'] += 1
+            yield {'event': 'article', 'data': dict(scored.to_dict(), tallies=dict(tallies))}
+    
+    if not sentiments:
+        yield {'event': 'report', 'data': {
+            'success': True,
+            'message': 'No articles found',
+            'report': tallies
+        }}
+        return
+    
+    payload = {
+        'success': True,
+        'query': query,
+        'articles_analyzed': len(sentiments),
+        'report': generate_report(sentiments)
+    }
+    if is_degraded(sentiments):
+        payload['degraded'] = True
+    put_report(query, cache_articles, payload)
+    yield {'event': 'report', 'data': payload}
+
+def format_event(event, stream_format):
+    """Serialize one event as an NDJSON line or a server-sent event"""
+    if stream_format == 'sse':
+        return f"event: {event['event']}\ndata: {to_json(event['data'], pretty=False)}\n\n"
+    return to_json(event, pretty=False) + "\n"
+
+def stream_format_for(event, body):
+    """Pick a streaming format from the request, or None for a plain JSON response"""
+    stream = body.get('stream')
+    if stream in STREAM_FORMATS:
+        return stream
+    if stream is True:
+        return 'ndjson'
+    
+    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    accept = headers.get('accept', '')
+    for name, content_type in STREAM_FORMATS.items():
+        if content_type in accept:
+            return name
+    return None
+
+@instrumented_handler
 def lambda_handler(event, context):
     """
     AWS Lambda handler for financial agent
@@ -18,6 +144,15 @@ def lambda_handler(event, context):
         "query": "stock market",
         "max_articles": 20
     }
+    
+    or, for a basket of queries scored in one invocation:
+    {
+        "queries": ["Tesla stock", "Apple stock"],
+        "max_articles": 5
+    }
+    
+    Add "stream": "ndjson" or "sse" (or send a matching Accept header) to get
+    per-article events followed by the final report.
     """
     print(f"Received event: {json.dumps(event)}")
     
@@ -28,36 +163,61 @@ def lambda_handler(event, context):
         else:
             body = event
         
+        if 'queries' in body:
+            queries = body['queries']
+            error = queries_error(queries)
+            if error:
+                return build_response(400, {
+                    'success': False,
+                    'error': error
+                }, event)
+            
+            results = analyze_queries(queries, body.get('max_articles', 20))
+            
+            return build_response(200, {
+                'success': all(r['success'] for r in results),
+                'results': results
+            }, event)
+        
         query = body.get('query', 'stock market')
         max_articles = body.get('max_articles', 20)
         
-        print(f"Fetching news for: {query}")
+        stream_format = stream_format_for(event, body)
+        if stream_format:
+            # The proxy integration returns the body whole: events arrive
+            # together, only stream_report callers get them as they are ready
+            return build_raw_response(200, ''.join(
+                format_event(e, stream_format) for e in iter_report_events(query, max_articles)
+            ), STREAM_FORMATS[stream_format], event)
+        
+        # Reports only depend on the articles that are actually scored
+        cache_articles = min(int(max_articles), MAX_ANALYZED)
+        
+        print(f"Fetching news for: {query} (max_articles={cache_articles})")
+        
+        cached = get_report(query, cache_articles)
+        if cached is not None:
+            print("Serving cached report")
+            return build_response(200, dict(cached, cached=True), event)
         
         # Step 1: Fetch news
         news = fetch_news(query=query, max_articles=max_articles)
         print(f"Fetched {len(news)} articles")
         
         if not news:
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({
-                    'success': True,
-                    'message': 'No articles found',
-                    'report': {
-                        'positive': 0,
-                        'negative': 0,
-                        'neutral': 0
-                    }
-                })
-            }
+            return build_response(200, {
+                'success': True,
+                'message': 'No articles found',
+                'report': {
+                    'positive': 0,
+                    'negative': 0,
+                    'neutral': 0
+                }
+            }, event)
         
         # Step 2: Analyze sentiment
         print("Analyzing sentiment...")
-        sentiments = analyze_sentiment(news[:10])  # Limit to 10 for speed
+        sentiments = analyze_sentiment(news[:MAX_ANALYZED])
         print(f"Analyzed {len(sentiments)} articles")
         
         # Step 3: Generate report
@@ -66,36 +226,34 @@ def lambda_handler(event, context):
         
         print("Report generated successfully!")
         
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'success': True,
-                'query': query,
-                'articles_analyzed': len(sentiments),
-                'report': report
-            }, indent=2)
+        payload = {
+            'success': True,
+            'query': query,
+            'articles_analyzed': len(sentiments),
+            'report': report
         }
+        if is_degraded(sentiments):
+            payload['degraded'] = True
+        put_report(query, cache_articles, payload)
+        
+        return build_response(200, payload, event)
         
     except Exception as e:
         print(f"Error: {str(e)}")
         import traceback
         traceback.print_exc()
         
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'success': False,
-                'error': str(e)
-            })
-        }
+        return build_response(500, {
+            'success': False,
+            'error': str(e)
+        }, event)
+
+def stream_report(query, max_articles=20, stream_format='ndjson', out=None):
+    """Write events for a query to out as they are produced (local runs, streaming servers)"""
+    out = out or sys.stdout
+    for e in iter_report_events(query, max_articles):
+        out.write(format_event(e, stream_format))
+        out.flush()
 
 # For local testing
 if __name__ == "__main__":
@@ -0,0 +1,154 @@
+import functools
+import json
+import os
+import sys
+import threading
+import tracemalloc
+
+# Opt-in: tracing allocations slows the pipeline down noticeably
+ENABLED = os.environ.get('MEMORY_PROFILE', '').lower() in ('1', 'true', 'yes')
+# Frames kept per allocation. Call sites are the innermost frame, so 1 is
+# enough; more only makes every allocation and snapshot slower.
+FRAMES = int(os.environ.get('MEMORY_PROFILE_FRAMES', '1'))
+TOP_SITES = int(os.environ.get('MEMORY_PROFILE_TOP', '5'))
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Call sites are lines of the handler modules (not json/requests internals,
+# and not this module's own snapshots)
+_HANDLER_FILTERS = [
+    tracemalloc.Filter(True, os.path.join(_HERE, '*.py')),
+    tracemalloc.Filter(False, os.path.join(_HERE, 'package', '*')),
+    tracemalloc.Filter(False, __file__)
+]
+
+_lock = threading.Lock()
+_stages = {}
+
+
+def current_rss_mb():
+    """Resident set size right now (Linux), or None"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_mb():
+    """Peak resident set size of the process so far"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _snapshot():
+    """Traced allocations made by lines of the handler modules"""
+    return tracemalloc.take_snapshot().filter_traces(_HANDLER_FILTERS)
+
+
+def _call_sites(after, before):
+    """Biggest allocation growth between two snapshots, by call site"""
+    stats = [stat for stat in after.compare_to(before, 'lineno') if stat.size_diff > 0]
+    return [
+        {
+            'site': f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+            'size_kb': round(stat.size_diff / 1024, 1),
+            'count': stat.count_diff
+        }
+        for stat in stats[:TOP_SITES]
+    ]
+
+
+def _record(name, sample):
+    with _lock:
+        stage = _stages.setdefault(name, {'calls': 0, 'peak_kb': 0.0, 'net_kb': 0.0, 'rss_mb': 0.0, 'sites': {}})
+        stage['calls'] += 1
+        stage['peak_kb'] = max(stage['peak_kb'], sample['peak_kb'])
+        stage['net_kb'] = max(stage['net_kb'], sample['net_kb'])
+        stage['rss_mb'] = max(stage['rss_mb'], sample['rss_after_mb'] or 0.0)
+        for site in sample['sites']:
+            stage['sites'][site['site']] = max(stage['sites'].get(site['site'], 0.0), site['size_kb'])
+
+
+def profile_memory(name):
+    """
+    Record allocation peak, net growth, RSS and top call sites of a stage.
+
+    No-op unless MEMORY_PROFILE is set. Stages running concurrently in
+    other threads share the tracemalloc peak, so profile single-threaded
+    runs for exact per-stage numbers.
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(FRAMES)
+
+            before = _snapshot()
+            start_current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            rss_before = current_rss_mb()
+
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current, peak = tracemalloc.get_traced_memory()
+                after = _snapshot()
+                sample = {
+                    'stage': name,
+                    'peak_kb': round((peak - start_current) / 1024, 1),
+                    'net_kb': round((current - start_current) / 1024, 1),
+                    'rss_before_mb': rss_before,
+                    'rss_after_mb': current_rss_mb(),
+                    'sites': _call_sites(after, before)
+                }
+                _record(name, sample)
+                print(json.dumps({'memory_profile': sample}))
+
+        return wrapper
+    return decorator
+
+
+def summary():
+    """Per-stage worst case since the process started (or since reset)"""
+    with _lock:
+        result = {}
+        for name, stage in _stages.items():
+            sites = sorted(stage['sites'].items(), key=lambda item: -item[1])[:TOP_SITES]
+            result[name] = {
+                'calls': stage['calls'],
+                'peak_kb': stage['peak_kb'],
+                'net_kb': stage['net_kb'],
+                'rss_mb': stage['rss_mb'],
+                'top_sites': [{'site': s, 'size_kb': kb} for s, kb in sites]
+            }
+        return result
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+
+
+def check_budget(peak_rss_budget_mb=None, stage_budgets_mb=None):
+    """Return a list of budget violations (empty when within budget)"""
+    problems = []
+    peak = peak_rss_mb()
+    if peak_rss_budget_mb is not None and peak is not None and peak > peak_rss_budget_mb:
+        problems.append(f"peak RSS {peak:.1f} MB exceeds budget {peak_rss_budget_mb:.1f} MB")
+
+    stages = summary()
+    for name, budget in (stage_budgets_mb or {}).items():
+        stage = stages.get(name)
+        if stage and stage['peak_kb'] / 1024 > budget:
+            problems.append(f"{name} allocated {stage['peak_kb'] / 1024:.2f} MB at peak, budget {budget:.2f} MB")
+    return problems
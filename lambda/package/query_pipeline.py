@@ -0,0 +1,94 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from data_agent_lambda import fetch_news, normalize_query
+from sentiment_agent_lambda import analyze_titles, is_degraded, scored_article, SENTIMENT_BATCH_SIZE
+from report_agent_lambda import generate_report
+
+# Only the newest articles are scored, to keep requests fast
+MAX_ANALYZED = 10
+
+# Maximum number of NewsAPI / HuggingFace calls in flight at once
+BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', '4'))
+
+
+def score_queries(requests_list, max_workers=None):
+    """
+    Run the pipeline for many (query, max_articles) pairs at once.
+
+    Identical queries share one NewsAPI call (with the largest page size
+    requested), headlines are deduplicated across all queries and scored
+    once in batches. Returns one result per input pair, in order: either
+    a payload dict or the exception raised while fetching its news. Payloads
+    with headlines that could not be scored have 'degraded': True.
+    """
+    max_workers = max_workers or BATCH_CONCURRENCY
+
+    # Step 1: one fetch per distinct query
+    page_sizes = {}
+    for query, max_articles in requests_list:
+        key = normalize_query(query)
+        page_sizes[key] = max(page_sizes.get(key, 0), int(max_articles))
+
+    originals = {}
+    for query, _ in requests_list:
+        originals.setdefault(normalize_query(query), query)
+
+    def fetch(key):
+        try:
+            return fetch_news(query=originals[key], max_articles=page_sizes[key])
+        except Exception as e:
+            print(f"Error fetching {key}: {e}")
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        fetched = dict(zip(page_sizes, pool.map(fetch, page_sizes)))
+
+    # Step 2: score the union of headlines once
+    titles = []
+    seen = set()
+    for query, max_articles in requests_list:
+        news = fetched[normalize_query(query)]
+        if isinstance(news, Exception):
+            continue
+        for article in news[:min(int(max_articles), MAX_ANALYZED)]:
+            if article.title not in seen:
+                seen.add(article.title)
+                titles.append(article.title)
+
+    chunks = [titles[i:i + SENTIMENT_BATCH_SIZE] for i in range(0, len(titles), SENTIMENT_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        scored = [s for chunk in pool.map(analyze_titles, chunks) for s in chunk]
+    scores = dict(zip(titles, scored))
+
+    # Step 3: per-query reports
+    results = []
+    for query, max_articles in requests_list:
+        news = fetched[normalize_query(query)]
+        if isinstance(news, Exception):
+            results.append(news)
+            continue
+
+        news = news[:min(int(max_articles), MAX_ANALYZED)]
+        if not news:
+            results.append({
+                'success': True,
+                'query': query,
+                'message': 'No articles found',
+                'articles_analyzed': 0,
+                'report': {'positive': 0, 'negative': 0, 'neutral': 0}
+            })
+            continue
+
+        sentiments = [scored_article(article, scores[article.title]) for article in news]
+        result = {
+            'success': True,
+            'query': query,
+            'articles_analyzed': len(sentiments),
+            'report': generate_report(sentiments)
+        }
+        if is_degraded(sentiments):
+            result['degraded'] = True
+        results.append(result)
+
+    return results
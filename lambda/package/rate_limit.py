@@ -0,0 +1,184 @@
+import email.utils
+import os
+import re
+import threading
+import time
+
+# Pace to this fraction of the rate the upstream advertises
+RATE_LIMIT_HEADROOM = float(os.environ.get('RATE_LIMIT_HEADROOM', '0.9'))
+
+# Requests that may go out back to back before pacing kicks in
+RATE_LIMIT_BURST = int(os.environ.get('RATE_LIMIT_BURST', '8'))
+
+# Longest a request waits for a token before giving up
+RATE_LIMIT_MAX_WAIT = float(os.environ.get('RATE_LIMIT_MAX_WAIT', '10'))
+
+# Pause after a 429 that carries no Retry-After
+RATE_LIMIT_BACKOFF = float(os.environ.get('RATE_LIMIT_BACKOFF', '1'))
+
+# After a 429 halved the pace, each successful response gives back this
+# fraction of the advertised rate (additive increase, multiplicative decrease)
+RATE_LIMIT_RECOVERY = float(os.environ.get('RATE_LIMIT_RECOVERY', '0.05'))
+
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT', '1').lower() in ('1', 'true', 'yes')
+
+# "api";r=12;t=30 (RateLimit) and "fixed window";"api";q=500;w=300 (RateLimit-Policy)
+_PARAM = re.compile(r'\b([a-z]+)=(\d+(?:\.\d+)?)')
+
+_lock = threading.Lock()
+_buckets = {}
+
+
+class RateLimitExceeded(Exception):
+    """No token became available within RATE_LIMIT_MAX_WAIT"""
+
+
+class TokenBucket:
+    """
+    Token bucket for one upstream host, shared by every thread.
+
+    The rate is unknown (unlimited) until the host sends rate-limit headers
+    or a 429. A 429 halves it; successful responses then raise it back
+    towards the last rate the headers advertised (ceiling). Tokens are
+    reserved under the lock and may go negative, so concurrent callers queue
+    up at the refill rate instead of all waking at once.
+    """
+
+    def __init__(self, burst=RATE_LIMIT_BURST):
+        self.lock = threading.Lock()
+        self.burst = burst
+        self.tokens = float(burst)
+        self.rate = None
+        self.ceiling = None
+        self.blocked_until = 0.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        if self.rate is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, max_wait=None):
+        """Take a token, returning the seconds to wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(self.blocked_until - now, 0.0)
+            if self.rate is not None:
+                self.tokens -= 1
+                if self.tokens < 0:
+                    wait = max(wait, -self.tokens / self.rate)
+            if max_wait is not None and wait > max_wait:
+                if self.rate is not None:
+                    self.tokens += 1
+                raise RateLimitExceeded(f"would wait {wait:.1f}s for a token")
+            return wait
+
+    def update(self, status_code, headers):
+        """Adjust the pace from a response's status and rate-limit headers"""
+        remaining, reset, limit, window = _parse_limits(headers)
+        retry_after = _parse_retry_after(headers.get('Retry-After'))
+
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            advertised = None
+            if limit and window:
+                advertised = limit * RATE_LIMIT_HEADROOM / window
+            if remaining is not None and reset:
+                if remaining > 0:
+                    # Spread what is left of the window over the time until it resets
+                    advertised = remaining * RATE_LIMIT_HEADROOM / reset
+                    self.tokens = min(self.tokens, remaining)
+                else:
+                    # Window used up: hold everything until it resets
+                    self.tokens = min(self.tokens, 0.0)
+                    self.blocked_until = max(self.blocked_until, now + reset)
+
+            if advertised is not None:
+                self.rate = self.ceiling = advertised
+
+            if status_code == 429:
+                if self.rate is not None:
+                    self.rate *= 0.5
+                self.tokens = min(self.tokens, 0.0)
+                pause = retry_after if retry_after is not None else RATE_LIMIT_BACKOFF
+                self.blocked_until = max(self.blocked_until, now + pause)
+            elif retry_after is not None and status_code == 503:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            elif status_code < 400 and advertised is None and self.ceiling is not None:
+                self.rate = min(self.ceiling, self.rate + self.ceiling * RATE_LIMIT_RECOVERY)
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    seconds = _number(value)
+    if seconds is None:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return max(seconds, 0.0)
+
+
+def _parse_limits(headers):
+    """(remaining, reset seconds, limit, window seconds) from whichever headers are present"""
+    remaining = _number(headers.get('RateLimit-Remaining') or headers.get('X-RateLimit-Remaining'))
+    reset = _number(headers.get('RateLimit-Reset') or headers.get('X-RateLimit-Reset'))
+    limit = _number(headers.get('RateLimit-Limit') or headers.get('X-RateLimit-Limit'))
+    window = None
+
+    # Structured fields from the IETF RateLimit draft
+    params = dict(_PARAM.findall(headers.get('RateLimit', '')))
+    if 'r' in params:
+        remaining = float(params['r'])
+    if 't' in params:
+        reset = float(params['t'])
+    policy = dict(_PARAM.findall(headers.get('RateLimit-Policy', '')))
+    if 'q' in policy and 'w' in policy:
+        limit, window = float(policy['q']), float(policy['w'])
+
+    # Some APIs send the reset as a Unix timestamp
+    if reset is not None and reset > 1e9:
+        reset = max(reset - time.time(), 0.0)
+    return remaining, reset, limit, window
+
+
+def bucket_for(host):
+    """The shared bucket for host, created on first use"""
+    with _lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = _buckets[host] = TokenBucket()
+        return bucket
+
+
+def acquire(host, max_wait=RATE_LIMIT_MAX_WAIT):
+    """Block until a request to host may go out, returning the seconds waited"""
+    if not RATE_LIMIT_ENABLED:
+        return 0.0
+    wait = bucket_for(host).reserve(max_wait)
+    if wait > 0:
+        time.sleep(wait)
+    return wait
+
+
+def observe(host, response):
+    """Feed a response's status and headers back into host's bucket"""
+    if RATE_LIMIT_ENABLED:
+        bucket_for(host).update(response.status_code, response.headers)
+
+
+def reset():
+    with _lock:
+        _buckets.clear()
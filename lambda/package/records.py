@@ -0,0 +1,83 @@
+import sys
+
+# Labels are interned so every scored article shares the same three strings
+POSITIVE = sys.intern('positive')
+NEGATIVE = sys.intern('negative')
+NEUTRAL = sys.intern('neutral')
+
+_LABELS = {POSITIVE: POSITIVE, NEGATIVE: NEGATIVE, NEUTRAL: NEUTRAL}
+
+
+def intern_label(label):
+    """Lowercase, interned sentiment label"""
+    label = str(label).lower()
+    return _LABELS.get(label) or sys.intern(label)
+
+
+class Article:
+    """One NewsAPI article, only the fields the pipeline uses"""
+
+    __slots__ = ('title', 'description', 'url', 'source', 'published_at')
+
+    def __init__(self, title, description=None, url=None, source=None, published_at=None):
+        self.title = title
+        self.description = description
+        self.url = url
+        self.source = source
+        self.published_at = published_at
+
+    @classmethod
+    def from_newsapi(cls, raw):
+        source = raw.get('source') or {}
+        return cls(
+            raw.get('title'),
+            raw.get('description'),
+            raw.get('url'),
+            sys.intern(source['name']) if source.get('name') else None,
+            raw.get('publishedAt')
+        )
+
+    def to_dict(self):
+        return {
+            'title': self.title,
+            'description': self.description,
+            'url': self.url,
+            'source': self.source,
+            'published_at': self.published_at
+        }
+
+    def __repr__(self):
+        return f"Article({self.title!r})"
+
+
+class ScoredArticle:
+    """
+    An article with its top sentiment label and score
+
+    degraded marks a placeholder score, given when the headline could not be
+    scored (inference API unavailable, failing or timing out).
+    """
+
+    __slots__ = ('article', 'label', 'score', 'degraded')
+
+    def __init__(self, article, label, score, degraded=False):
+        self.article = article
+        self.label = intern_label(label)
+        self.score = float(score)
+        self.degraded = degraded
+
+    @property
+    def title(self):
+        return self.article.title
+
+    def to_dict(self):
+        return {
+            'title': self.article.title,
+            'url': self.article.url,
+            'source': self.article.source,
+            'label': self.label,
+            'score': self.score
+        }
+
+    def __repr__(self):
+        return f"ScoredArticle({self.article.title!r}, {self.label!r}, {self.score:.3f})"
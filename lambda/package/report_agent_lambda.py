@@ -1,5 +1,11 @@
+from memory_profile import profile_memory
+from records import NEGATIVE, POSITIVE
+from tracing import traced
+
+@traced('generate_report')
+@profile_memory('generate_report')
 def generate_report(sentiment_results):
-    """Generate report from sentiment results - Lambda version"""
+    """Generate report from a list of ScoredArticle - Lambda version"""
     
     # Count sentiments
     positive = 0
@@ -7,13 +13,12 @@ def generate_report(sentiment_results):
     neutral = 0
     
     titles = []
-    for title, result in sentiment_results:
-        label = result['label'].lower()
-        titles.append(title)
+    for scored in sentiment_results:
+        titles.append(scored.title)
         
-        if label == 'positive':
+        if scored.label == POSITIVE:
             positive += 1
-        elif label == 'negative':
+        elif scored.label == NEGATIVE:
             negative += 1
         else:
             neutral += 1
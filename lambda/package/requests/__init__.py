@@ -42,17 +42,23 @@ import warnings
 
 import urllib3
 
+from .compat import CHARSET_DETECTION
 from .exceptions import RequestsDependencyWarning
 
-try:
-    from charset_normalizer import __version__ as charset_normalizer_version
-except ImportError:
-    charset_normalizer_version = None
+charset_normalizer_version = None
+chardet_version = None
 
-try:
-    from chardet import __version__ as chardet_version
-except ImportError:
-    chardet_version = None
+# Only import the detection libraries when detection is enabled
+if CHARSET_DETECTION:
+    try:
+        from charset_normalizer import __version__ as charset_normalizer_version
+    except ImportError:
+        pass
+
+    try:
+        from chardet import __version__ as chardet_version
+    except ImportError:
+        pass
 
 
 def check_compatibility(urllib3_version, chardet_version, charset_normalizer_version):
@@ -82,7 +88,7 @@ def check_compatibility(urllib3_version, chardet_version, charset_normalizer_ver
         major, minor, patch = int(major), int(minor), int(patch)
         # charset_normalizer >= 2.0.0 < 4.0.0
         assert (2, 0, 0) <= (major, minor, patch) < (4, 0, 0)
-    else:
+    elif CHARSET_DETECTION:
         warnings.warn(
             "Unable to find acceptable character detection dependency "
             "(chardet or charset_normalizer).",
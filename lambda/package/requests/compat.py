@@ -8,6 +8,7 @@ compatibility until the next major version.
 """
 
 import importlib
+import os
 import sys
 
 # -------
@@ -26,6 +27,14 @@ except (TypeError, AttributeError):
 # Character Detection
 # -------------------
 
+# Detection is opt-in: it is slow on large bodies and importing the library
+# adds to start-up time. Without it, undeclared encodings decode as UTF-8.
+CHARSET_DETECTION = os.environ.get("REQUESTS_CHARSET_DETECTION", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
 
 def _resolve_char_detection():
     """Find supported character detection libraries."""
@@ -39,7 +48,7 @@ def _resolve_char_detection():
     return chardet
 
 
-chardet = _resolve_char_detection()
+chardet = _resolve_char_detection() if CHARSET_DETECTION else None
 
 # -------
 # Pythons
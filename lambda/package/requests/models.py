@@ -788,7 +788,15 @@ class Response:
 
     @property
     def apparent_encoding(self):
-        """The apparent encoding, provided by the charset_normalizer or chardet libraries."""
+        """The apparent encoding, provided by the charset_normalizer or chardet libraries.
+
+        JSON bodies skip detection: they are UTF-8, -16 or -32 (RFC 8259),
+        which the first bytes tell apart. Detection only runs when enabled
+        with ``REQUESTS_CHARSET_DETECTION``.
+        """
+        if self._is_json():
+            return guess_json_utf(self.content) or "utf-8"
+
         if chardet is not None:
             return chardet.detect(self.content)["encoding"]
         else:
@@ -796,6 +804,14 @@ class Response:
             # to a standard Python utf-8 str.
             return "utf-8"
 
+    def _is_json(self):
+        """True if the Content-Type is application/json or a +json type."""
+        content_type = self.headers.get("content-type")
+        if not content_type:
+            return False
+        mimetype = content_type.split(";", 1)[0].strip().lower()
+        return mimetype == "application/json" or mimetype.endswith("+json")
+
     def iter_content(self, chunk_size=1, decode_unicode=False):
         """Iterates over the response data.  When stream=True is set on the
         request, this avoids reading the content at once into memory for
@@ -911,7 +927,8 @@ class Response:
         """Content of the response, in unicode.
 
         If Response.encoding is None, encoding will be guessed using
-        ``charset_normalizer`` or ``chardet``.
+        ``charset_normalizer`` or ``chardet`` when ``REQUESTS_CHARSET_DETECTION``
+        is set (JSON bodies never are), and is UTF-8 otherwise.
 
         The encoding of the response content is determined based solely on HTTP
         headers, following RFC 2616 to the letter. If you can take advantage of
@@ -957,8 +974,8 @@ class Response:
         if not self.encoding and self.content and len(self.content) > 3:
             # No encoding set. JSON RFC 4627 section 3 states we should expect
             # UTF-8, -16 or -32. Detect which one to use; If the detection or
-            # decoding fails, fall back to `self.text` (using charset_normalizer to make
-            # a best guess).
+            # decoding fails, fall back to `self.text` (UTF-8 with replacement
+            # characters, without running charset detection).
             encoding = guess_json_utf(self.content)
             if encoding is not None:
                 try:
@@ -0,0 +1,147 @@
+import base64
+import gzip
+import json
+import os
+import zlib
+
+from tracing import span
+
+# Optional faster / more compact encoders, used when bundled with the function
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Indented JSON is only for debugging, production responses are compact
+PRETTY_JSON = os.environ.get('PRETTY_JSON', '').lower() in ('1', 'true', 'yes')
+
+# Compressed and MessagePack bodies go out base64 encoded, which only works
+# where the API decodes them (REST API with binaryMediaTypes */*, HTTP API,
+# Function URL); elsewhere clients would get base64 text, so it is opt-in
+BINARY_RESPONSES = os.environ.get('BINARY_RESPONSES', '').lower() in ('1', 'true', 'yes')
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = int(os.environ.get('MIN_COMPRESS_BYTES', '1024'))
+
+MSGPACK_TYPE = 'application/msgpack'
+
+# Reused for every response instead of letting json.dumps build one per call
+_compact_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+_pretty_encoder = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+
+def to_json(payload, pretty=None):
+    """Serialize payload to a JSON string (compact unless pretty)"""
+    pretty = PRETTY_JSON if pretty is None else pretty
+    if pretty:
+        return _pretty_encoder.encode(payload)
+    if orjson is not None:
+        return orjson.dumps(payload).decode('utf-8')
+    return _compact_encoder.encode(payload)
+
+
+def _header(event, name):
+    headers = (event or {}).get('headers') or {}
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value or ''
+    return ''
+
+
+def _parse_accept(value):
+    """Return {token: q} for an Accept / Accept-Encoding header value"""
+    accepted = {}
+    for part in value.split(','):
+        token, _, params = part.strip().partition(';')
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip().lower()] = q
+    return accepted
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick the best supported content coding, or None for identity"""
+    accepted = _parse_accept(accept_encoding or '')
+    supported = (['br'] if brotli is not None else []) + ['gzip', 'deflate']
+
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(data, coding):
+    if coding == 'br':
+        return brotli.compress(data, quality=5)
+    if coding == 'gzip':
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if coding == 'deflate':
+        return zlib.compress(data, 6)
+    return data
+
+
+def build_raw_response(status_code, body, content_type, event=None):
+    """Wrap an already serialized body, compressing it when the client accepts it"""
+    data = body.encode('utf-8') if isinstance(body, str) else body
+    headers = {
+        'Content-Type': content_type,
+        'Access-Control-Allow-Origin': '*',
+        'Vary': 'Accept, Accept-Encoding'
+    }
+
+    coding = None
+    if BINARY_RESPONSES and len(data) >= MIN_COMPRESS_BYTES:
+        coding = negotiate_encoding(_header(event, 'accept-encoding'))
+
+    if coding:
+        data = compress(data, coding)
+        headers['Content-Encoding'] = coding
+
+    # API Gateway needs binary bodies base64 encoded
+    if coding or not content_type.startswith(('application/json', 'application/x-ndjson', 'text/')):
+        return {
+            'statusCode': status_code,
+            'headers': headers,
+            'body': base64.b64encode(data).decode('ascii'),
+            'isBase64Encoded': True
+        }
+
+    return {
+        'statusCode': status_code,
+        'headers': headers,
+        'body': data.decode('utf-8')
+    }
+
+
+def build_response(status_code, payload, event=None):
+    """
+    Serialize payload for API Gateway
+
+    JSON by default, MessagePack when the client asks for application/msgpack,
+    msgpack is installed and BINARY_RESPONSES is on.
+    """
+    with span('encode_response'):
+        accept = _parse_accept(_header(event, 'accept'))
+        if BINARY_RESPONSES and msgpack is not None and accept.get(MSGPACK_TYPE, 0) > 0:
+            return build_raw_response(status_code, msgpack.packb(payload, use_bin_type=True), MSGPACK_TYPE, event)
+
+        return build_raw_response(status_code, to_json(payload), 'application/json', event)
@@ -0,0 +1,112 @@
+import threading
+import time
+
+from tracing import record
+
+
+class _Call:
+    """One in-progress computation and the callers waiting on it"""
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def finish(self, value=None, error=None):
+        self.value = value
+        self.error = error
+        self.done.set()
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls in a warm container.
+
+    The first caller for a key runs the computation, callers arriving while
+    it is in flight wait and get the same result (or exception). Nothing is
+    kept once it finishes, so this never serves stale data. Time spent
+    waiting on another caller is recorded as `<name>.coalesced`.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """Run func(*args, **kwargs) unless a call for key is already in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            return self._wait(call)
+
+        try:
+            value = func(*args, **kwargs)
+        except BaseException as e:
+            call.finish(error=e)
+            raise
+        else:
+            call.finish(value)
+            return value
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def do_many(self, keys, func):
+        """
+        Results for many keys, computing only those not already in flight.
+
+        func receives the list of keys this caller claimed and returns one
+        result per key, in order. Keys other callers are computing are
+        awaited instead.
+        """
+        claimed = []
+        calls = {}
+        with self._lock:
+            for key in keys:
+                if key in calls:
+                    continue
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = _Call()
+                    claimed.append(key)
+                calls[key] = call
+
+        if claimed:
+            try:
+                values = func(claimed)
+                if len(values) != len(claimed):
+                    raise ValueError(f"{self.name}: expected {len(claimed)} results, got {len(values)}")
+            except BaseException as e:
+                for key in claimed:
+                    calls[key].finish(error=e)
+                raise
+            else:
+                for key, value in zip(claimed, values):
+                    calls[key].finish(value)
+            finally:
+                with self._lock:
+                    for key in claimed:
+                        del self._calls[key]
+
+        mine = set(claimed)
+        return [calls[key].value if key in mine else self._wait(calls[key]) for key in keys]
+
+    def _wait(self, call):
+        start = time.perf_counter()
+        try:
+            return call.wait()
+        finally:
+            record(f"{self.name}.coalesced", (time.perf_counter() - start) * 1000)
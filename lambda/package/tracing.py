@@ -0,0 +1,314 @@
+import functools
+import json
+import math
+import os
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# CloudWatch Embedded Metric Format is on by default when running in Lambda
+EMF_ENABLED = os.environ.get(
+    'EMF_METRICS', '1' if os.environ.get('AWS_LAMBDA_FUNCTION_NAME') else '0'
+).lower() in ('1', 'true', 'yes')
+EMF_NAMESPACE = os.environ.get('EMF_NAMESPACE', 'FinancialAgent')
+SERVICE_NAME = os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'financial-agent')
+
+# CloudWatch drops EMF metrics with more values than this in one document
+EMF_MAX_VALUES = 100
+
+# Histogram buckets grow by 4%, so percentiles are accurate to about 2%
+_BUCKET_GROWTH = math.log(1.04)
+
+_local = threading.local()
+_lock = threading.Lock()
+_histograms = {}
+_pending = []
+
+
+# Bucket for samples too small to log-bucket, reported as 0
+_ZERO_BUCKET = float('-inf')
+
+
+def _bucket_index(value):
+    return math.floor(math.log(value) / _BUCKET_GROWTH) if value > 1e-3 else _ZERO_BUCKET
+
+
+class Histogram:
+    """Log-bucketed latency histogram (milliseconds) with percentile estimates"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        index = _bucket_index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p):
+        if not self.count:
+            return None
+        rank = p / 100.0 * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                if index == _ZERO_BUCKET:
+                    return 0.0
+                # Midpoint of the bucket, clamped to the observed range
+                value = math.exp((index + 0.5) * _BUCKET_GROWTH)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max
+        }
+
+
+class SlidingHistogram(Histogram):
+    """Histogram of the last `size` samples only, so percentiles follow recent latency"""
+
+    def __init__(self, size):
+        super().__init__()
+        self.window = deque()
+        self.size = size
+
+    def record(self, value):
+        if len(self.window) >= self.size:
+            self._evict(self.window.popleft())
+        self.window.append(value)
+        super().record(value)
+
+    def _evict(self, value):
+        index = _bucket_index(value)
+        self.buckets[index] -= 1
+        if not self.buckets[index]:
+            del self.buckets[index]
+        self.count -= 1
+        self.total -= value
+        if value == self.min:
+            self.min = min(self.window, default=None)
+        if value == self.max:
+            self.max = max(self.window, default=None)
+
+
+def record(name, duration_ms, dimensions=None):
+    """Add one latency sample to the in-process histogram and the EMF buffer"""
+    dimensions = dimensions or {}
+    key = name + ''.join(f"[{v}]" for v in dimensions.values())
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.record(duration_ms)
+        if EMF_ENABLED:
+            _pending.append((name, dimensions, duration_ms))
+
+
+@contextmanager
+def span(name, **dimensions):
+    """Time a block of code as stage `name`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - start) * 1000, dimensions)
+
+
+def traced(name):
+    """Decorator version of span for agent functions"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrumented_handler(func):
+    """Wrap a Lambda handler: time the whole invocation and flush EMF metrics"""
+    @functools.wraps(func)
+    def wrapper(event, context):
+        try:
+            with span('handler', Handler=func.__module__):
+                return func(event, context)
+        finally:
+            flush_metrics(context)
+    return wrapper
+
+
+def histograms():
+    """Summaries of every stage recorded in this process"""
+    with _lock:
+        return {key: h.summary() for key, h in sorted(_histograms.items())}
+
+
+def dump_histograms(path=None):
+    """Print (or write to path) the per-stage latency percentiles"""
+    data = histograms()
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        return data
+
+    print(f"{'stage':<40} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for key, s in data.items():
+        print(f"{key:<40} {s['count']:>6} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['p99']:>9.1f} {s['max']:>9.1f}")
+    return data
+
+
+def reset_histograms():
+    with _lock:
+        _histograms.clear()
+        _pending.clear()
+
+
+def flush_metrics(context=None):
+    """
+    Print buffered samples as CloudWatch EMF documents, one per stage (more
+    when a stage has over EMF_MAX_VALUES samples)
+    """
+    with _lock:
+        samples = list(_pending)
+        _pending.clear()
+    if not samples:
+        return
+
+    grouped = {}
+    for name, dimensions, value in samples:
+        key = (name, tuple(sorted(dimensions.items())))
+        grouped.setdefault(key, []).append(round(value, 3))
+
+    timestamp = int(time.time() * 1000)
+    request_id = getattr(context, 'aws_request_id', None)
+    for (name, dimensions), values in grouped.items():
+        dimension_names = ['Service', 'Stage'] + [k for k, _ in dimensions]
+        for start in range(0, len(values), EMF_MAX_VALUES):
+            document = {
+                '_aws': {
+                    'Timestamp': timestamp,
+                    'CloudWatchMetrics': [{
+                        'Namespace': EMF_NAMESPACE,
+                        'Dimensions': [dimension_names],
+                        'Metrics': [{'Name': 'Latency', 'Unit': 'Milliseconds'}]
+                    }]
+                },
+                'Service': SERVICE_NAME,
+                'Stage': name,
+                'Latency': values[start:start + EMF_MAX_VALUES]
+            }
+            document.update(dict(dimensions))
+            if request_id:
+                document['RequestId'] = request_id
+            print(json.dumps(document))
+
+
+# --- Outbound HTTP phases -------------------------------------------------
+#
+# urllib3 is patched once so that, while a traced request is running on the
+# current thread, DNS lookup, TCP connect and TLS handshake times are added
+# to that request's timings. Other threads and untraced calls are unaffected.
+
+_http_hooks_installed = False
+
+
+def _add_phase(phase, seconds):
+    timings = getattr(_local, 'http_timings', None)
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+def install_http_hooks():
+    global _http_hooks_installed
+    if _http_hooks_installed:
+        return
+    _http_hooks_installed = True
+
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+
+    original_getaddrinfo = socket.getaddrinfo
+    original_new_conn = HTTPConnection._new_conn
+    original_https_connect = HTTPSConnection.connect
+
+    def getaddrinfo(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original_getaddrinfo(*args, **kwargs)
+        finally:
+            _add_phase('dns', time.perf_counter() - start)
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        timings = getattr(_local, 'http_timings', None)
+        dns_before = timings.get('dns', 0.0) if timings is not None else 0.0
+        try:
+            return original_new_conn(self)
+        finally:
+            if timings is not None:
+                elapsed = time.perf_counter() - start
+                _add_phase('connect', elapsed - (timings.get('dns', 0.0) - dns_before))
+                _add_phase('_new_conn', elapsed)
+
+    def https_connect(self):
+        start = time.perf_counter()
+        timings = getattr(_local, 'http_timings', None)
+        new_conn_before = timings.get('_new_conn', 0.0) if timings is not None else 0.0
+        try:
+            return original_https_connect(self)
+        finally:
+            if timings is not None:
+                elapsed = time.perf_counter() - start
+                _add_phase('tls', elapsed - (timings.get('_new_conn', 0.0) - new_conn_before))
+
+    socket.getaddrinfo = getaddrinfo
+    HTTPConnection._new_conn = _new_conn
+    HTTPSConnection.connect = https_connect
+
+
+@contextmanager
+def http_span(host):
+    """
+    Time one outbound HTTP request, split into dns/connect/tls/ttfb/body.
+
+    The caller marks the moment response headers arrived with the returned
+    function; everything after that counts as body download.
+    """
+    install_http_hooks()
+    _local.http_timings = timings = {}
+    start = time.perf_counter()
+    marks = {}
+
+    def headers_received():
+        marks['headers'] = time.perf_counter()
+
+    try:
+        yield headers_received
+    finally:
+        _local.http_timings = None
+        end = time.perf_counter()
+        headers_at = marks.get('headers', end)
+        setup = timings.get('dns', 0.0) + timings.get('connect', 0.0) + timings.get('tls', 0.0)
+
+        dimensions = {'Host': host}
+        for phase in ('dns', 'connect', 'tls'):
+            if phase in timings:
+                record(f"http.{phase}", timings[phase] * 1000, dimensions)
+        record('http.ttfb', max(headers_at - start - setup, 0.0) * 1000, dimensions)
+        record('http.body', (end - headers_at) * 1000, dimensions)
+        record('http.total', (end - start) * 1000, dimensions)
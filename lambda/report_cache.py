@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Reports are stored in S3 when a bucket is configured, otherwise in /tmp
+# (which survives between warm invocations of the same container)
+CACHE_BUCKET = os.environ.get('REPORT_CACHE_BUCKET')
+CACHE_PREFIX = os.environ.get('REPORT_CACHE_PREFIX', 'reports/')
+CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', '/tmp/report-cache')
+CACHE_TTL = int(os.environ.get('REPORT_CACHE_TTL', '900'))
+CACHE_ENABLED = os.environ.get('REPORT_CACHE', '1').lower() not in ('0', 'false', 'off')
+
+_s3 = None
+_s3_lock = threading.Lock()
+
+
+def _s3_client():
+    global _s3
+    # Lookups for a basket of queries run on several threads, and creating a
+    # client from the default boto3 session is not thread-safe
+    with _s3_lock:
+        if _s3 is None:
+            import boto3  # Available in the Lambda runtime
+            _s3 = boto3.client('s3')
+    return _s3
+
+
+def cache_key(query, max_articles):
+    """Stable key for a (query, max_articles) pair"""
+    normalized = ' '.join(str(query).lower().split())
+    raw = f"{normalized}|{int(max_articles)}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def get_report(query, max_articles, ttl=None):
+    """Return the cached payload for a query, or None if missing or stale"""
+    if not CACHE_ENABLED:
+        return None
+
+    ttl = CACHE_TTL if ttl is None else ttl
+    key = cache_key(query, max_articles)
+
+    try:
+        if CACHE_BUCKET:
+            obj = _s3_client().get_object(Bucket=CACHE_BUCKET, Key=CACHE_PREFIX + key + '.json')
+            entry = json.loads(obj['Body'].read())
+        else:
+            with open(os.path.join(CACHE_DIR, key + '.json'), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+    except Exception:
+        return None
+
+    if time.time() - entry.get('stored_at', 0) > ttl:
+        return None
+
+    return entry.get('payload')
+
+
+def put_report(query, max_articles, payload):
+    """Store a computed payload for a query, unless its scores are degraded"""
+    if not CACHE_ENABLED:
+        return
+    if payload.get('degraded'):
+        # Fallback scores would be served for the whole TTL
+        print(f"Not caching degraded report for: {query}")
+        return
+
+    key = cache_key(query, max_articles)
+    entry = json.dumps({
+        'query': query,
+        'max_articles': max_articles,
+        'stored_at': time.time(),
+        'payload': payload
+    })
+
+    try:
+        if CACHE_BUCKET:
+            _s3_client().put_object(
+                Bucket=CACHE_BUCKET,
+                Key=CACHE_PREFIX + key + '.json',
+                Body=entry.encode('utf-8'),
+                ContentType='application/json'
+            )
+        else:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = os.path.join(CACHE_DIR, key + '.json.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(entry)
+            os.replace(tmp_path, os.path.join(CACHE_DIR, key + '.json'))
+    except Exception as e:
+        # Caching is best effort, never fail the request because of it
+        print(f"Error storing report: {e}")
@@ -1,20 +1,127 @@
 import os
-import requests
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
+import http_client
+from memory_profile import profile_memory
+from records import NEUTRAL, ScoredArticle, intern_label
+from single_flight import SingleFlight
+from tracing import SlidingHistogram, record, span, traced
+
+HF_API_URL = os.environ.get('HF_API_URL', 'https://api-inference.huggingface.co/models/ProsusAI/finbert')
+
+# Seconds to wait for the model to load after a 503
+HF_RETRY_DELAY = float(os.environ.get('HF_RETRY_DELAY', '20'))
+
+# Number of headlines sent in one inference request
+SENTIMENT_BATCH_SIZE = int(os.environ.get('SENTIMENT_BATCH_SIZE', '16'))
+
+# Fallback (label, score) when a headline cannot be scored, recognized by
+# identity: a real neutral score is never this object
+NEUTRAL_SCORE = (NEUTRAL, 0.5)
+
+# Headlines being scored right now, so concurrent requests score each once
+_headlines = SingleFlight('sentiment.headline')
+
+# Hedging: when an inference call is slower than the observed p95, send a
+# duplicate and use whichever answers first. At most HF_HEDGE_BUDGET of the
+# calls are duplicated, and only once HF_HEDGE_MIN_SAMPLES latencies are known.
+# The p95 is taken over the last HF_HEDGE_WINDOW calls so it tracks the model's
+# current latency rather than the container's whole history.
+HF_HEDGE = os.environ.get('HF_HEDGE', '0').lower() in ('1', 'true', 'yes')
+HF_HEDGE_PERCENTILE = float(os.environ.get('HF_HEDGE_PERCENTILE', '95'))
+HF_HEDGE_BUDGET = float(os.environ.get('HF_HEDGE_BUDGET', '0.05'))
+HF_HEDGE_MIN_SAMPLES = int(os.environ.get('HF_HEDGE_MIN_SAMPLES', '20'))
+HF_HEDGE_WINDOW = int(os.environ.get('HF_HEDGE_WINDOW', '200'))
+
+# Threads for hedged calls. Each call in flight holds up to two (primary and
+# hedge), so the default covers BATCH_CONCURRENCY concurrent inference calls;
+# calls beyond that queue for a thread, which delays them.
+HF_HEDGE_WORKERS = int(os.environ.get(
+    'HF_HEDGE_WORKERS', str(2 * int(os.environ.get('BATCH_CONCURRENCY', '4')))
+))
+
+_hedge_lock = threading.Lock()
+_hedge_latency = SlidingHistogram(HF_HEDGE_WINDOW)
+_hedge_stats = {'calls': 0, 'hedged': 0, 'hedge_won': 0}
+_hedge_pool = None
+
+def _timed_post(url, **kwargs):
+    """POST and feed the round-trip time into the hedging histogram"""
+    start = time.perf_counter()
+    response = http_client.post(url, **kwargs)
+    with _hedge_lock:
+        _hedge_latency.record((time.perf_counter() - start) * 1000)
+    return response
+
+def _within_budget():
+    return _hedge_stats['hedged'] + 1 <= HF_HEDGE_BUDGET * _hedge_stats['calls']
+
+def _hedge_delay():
+    """Seconds to wait before hedging a call, or None to not hedge it"""
+    with _hedge_lock:
+        _hedge_stats['calls'] += 1
+        if _hedge_latency.count < HF_HEDGE_MIN_SAMPLES or not _within_budget():
+            return None
+        return _hedge_latency.percentile(HF_HEDGE_PERCENTILE) / 1000.0
+
+def _post(url, **kwargs):
+    """POST to the inference API, hedged when HF_HEDGE is enabled"""
+    global _hedge_pool
+    
+    delay = _hedge_delay() if HF_HEDGE else None
+    if delay is None:
+        return _timed_post(url, **kwargs)
+    
+    if _hedge_pool is None:
+        with _hedge_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(max_workers=HF_HEDGE_WORKERS, thread_name_prefix='hedge')
+    
+    primary = _hedge_pool.submit(_timed_post, url, **kwargs)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+    
+    with _hedge_lock:
+        # Other calls may have used up the budget while this one waited
+        if not _within_budget():
+            return primary.result()
+        _hedge_stats['hedged'] += 1
+    
+    hedge = _hedge_pool.submit(_timed_post, url, **kwargs)
+    pending = {primary, hedge}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        # A failed attempt only counts if the other one fails too
+        for future in sorted(done, key=lambda f: f.exception() is not None):
+            if future.exception() is None or not pending:
+                if future is hedge:
+                    with _hedge_lock:
+                        _hedge_stats['hedge_won'] += 1
+                record('sentiment.hedge', delay * 1000, {'Winner': 'hedge' if future is hedge else 'primary'})
+                return future.result()
+
+def hedge_stats():
+    """Inference calls, hedges sent and hedges that answered first"""
+    with _hedge_lock:
+        return dict(_hedge_stats, p95_ms=_hedge_latency.percentile(HF_HEDGE_PERCENTILE))
+
+@traced('sentiment.inference')
 def analyze_sentiment_huggingface(text):
-    """Use HuggingFace Inference API - ProsusAI/finbert model"""
+    """Use HuggingFace Inference API - ProsusAI/finbert model (text or list of texts)"""
     api_key = os.environ.get('HUGGINGFACE_API_KEY')
     
     if not api_key:
         return None
     
-    API_URL = "https://api-inference.huggingface.co/models/ProsusAI/finbert"
+    API_URL = HF_API_URL
     headers = {"Authorization": f"Bearer {api_key}"}
     
     try:
-        response = requests.post(
-            API_URL, 
+        response = _post(
+            API_URL,
             headers=headers, 
             json={"inputs": text},
             timeout=30
@@ -24,8 +131,9 @@ def analyze_sentiment_huggingface(text):
             return response.json()
         elif response.status_code == 503:
             # Model loading, retry once
-            time.sleep(20)
-            response = requests.post(API_URL, headers=headers, json={"inputs": text}, timeout=30)
+            with span('sentiment.retry'):
+                time.sleep(HF_RETRY_DELAY)
+                response = _post(API_URL, headers=headers, json={"inputs": text}, timeout=30)
             if response.status_code == 200:
                 return response.json()
         return None
@@ -34,27 +142,78 @@ def analyze_sentiment_huggingface(text):
         print(f"Error analyzing sentiment: {e}")
         return None
 
+def _top_sentiment(sentiments):
+    """Pick the top (label, score) from one text's list of label scores"""
+    top_sentiment = sentiments[0]
+    return intern_label(top_sentiment['label']), float(top_sentiment['score'])
+
+def _score_title(title):
+    """(label, score) for one headline, neutral when it cannot be scored"""
+    try:
+        result = analyze_sentiment_huggingface(title)
+        
+        if result and isinstance(result, list) and len(result) > 0:
+            sentiments = result[0] if isinstance(result[0], list) else result
+            return _top_sentiment(sentiments)
+        return NEUTRAL_SCORE
+        
+    except Exception as e:
+        print(f"Error processing article: {e}")
+        return NEUTRAL_SCORE
+
+def _score_batch(batch):
+    """(label, score) for each headline of one inference request"""
+    try:
+        result = analyze_sentiment_huggingface(batch)
+        
+        # One list of label scores per input
+        if result and isinstance(result, list) and len(result) == len(batch) \
+                and all(isinstance(r, list) and r for r in result):
+            return [_top_sentiment(r) for r in result]
+        return [NEUTRAL_SCORE for _ in batch]
+        
+    except Exception as e:
+        print(f"Error processing batch: {e}")
+        return [NEUTRAL_SCORE for _ in batch]
+
+def scored_article(article, score):
+    """ScoredArticle for a (label, score), degraded when it is the fallback"""
+    return ScoredArticle(article, *score, degraded=score is NEUTRAL_SCORE)
+
+def is_degraded(sentiments):
+    """True when any of the ScoredArticles only got the fallback score"""
+    return any(s.degraded for s in sentiments)
+
+def iter_sentiment(news_list):
+    """Yield a ScoredArticle for each Article as soon as it is scored"""
+    for article in news_list:
+        yield scored_article(article, _headlines.do(article.title, _score_title, article.title))
+
+@traced('analyze_sentiment')
+@profile_memory('analyze_sentiment')
 def analyze_sentiment(news_list):
     """Analyze sentiment for list of news"""
-    results = []
+    return list(iter_sentiment(news_list))
+
+@traced('analyze_titles')
+@profile_memory('analyze_titles')
+def analyze_titles(titles, batch_size=None):
+    """
+    Score headlines in batches of batch_size, one inference request per batch
+
+    Headlines that could not be scored get NEUTRAL_SCORE itself (see
+    scored_article), so callers can tell them from real neutral scores.
+    """
+    batch_size = batch_size or SENTIMENT_BATCH_SIZE
+    scores = []
     
-    for title, desc in news_list:
-        try:
-            result = analyze_sentiment_huggingface(title)
-            
-            if result and isinstance(result, list) and len(result) > 0:
-                sentiments = result[0] if isinstance(result[0], list) else result
-                top_sentiment = sentiments[0]
-                
-                results.append((title, {
-                    'label': top_sentiment['label'],
-                    'score': top_sentiment['score']
-                }))
-            else:
-                results.append((title, {'label': 'neutral', 'score': 0.5}))
-                
-        except Exception as e:
-            print(f"Error processing article: {e}")
-            results.append((title, {'label': 'neutral', 'score': 0.5}))
-    
-    return results
+    for start in range(0, len(titles), batch_size):
+        # Headlines another request is already scoring are awaited, not re-sent
+        scores.extend(_headlines.do_many(titles[start:start + batch_size], _score_batch))
+    
+    return scores
+
+def analyze_sentiment_batch(news_list, batch_size=None):
+    """Batched version of analyze_sentiment, same result format"""
+    scores = analyze_titles([article.title for article in news_list], batch_size)
+    return [scored_article(article, score) for article, score in zip(news_list, scores)]
@@ -0,0 +1,7 @@
+import os
+import sys
+
+LAMBDA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The handlers and the bundled packages, as laid out in the deployment zip
+sys.path[:0] = [LAMBDA_DIR, os.path.join(LAMBDA_DIR, 'package')]
@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+import batch_lambda
+from batch_lambda import LocalQueue
+
+
+class FakePipeline:
+    """score_queries/put_report stand-ins; outcomes maps a query to its results in turn"""
+
+    def __init__(self, outcomes=None):
+        self.outcomes = {query: list(results) for query, results in (outcomes or {}).items()}
+        self.scored = []
+        self.cached = []
+
+    def score_queries(self, requests_list):
+        self.scored.append(list(requests_list))
+        results = []
+        for query, _ in requests_list:
+            pending = self.outcomes.get(query)
+            if pending:
+                results.append(pending.pop(0) if len(pending) > 1 else pending[0])
+            else:
+                results.append({'success': True, 'query': query, 'articles_analyzed': 3, 'report': {}})
+        return results
+
+    def put_report(self, query, max_articles, payload):
+        self.cached.append((query, max_articles))
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    fake = FakePipeline()
+    monkeypatch.setattr(batch_lambda, 'score_queries', fake.score_queries)
+    monkeypatch.setattr(batch_lambda, 'put_report', fake.put_report)
+    return fake
+
+
+def event(*bodies):
+    return {'Records': [
+        {'messageId': f"m{i}", 'body': body if isinstance(body, str) else json.dumps(body)}
+        for i, body in enumerate(bodies)
+    ]}
+
+
+def failed(response):
+    return [f['itemIdentifier'] for f in response['batchItemFailures']]
+
+
+def test_valid_messages_are_scored_and_cached(pipeline):
+    response = batch_lambda.lambda_handler(event(
+        {'query': 'Tesla stock', 'max_articles': 5},
+        {'query': 'Apple stock', 'max_articles': 50},
+        {'query': 'Nvidia stock'},
+    ), None)
+
+    assert failed(response) == []
+    assert pipeline.scored == [[('Tesla stock', 5), ('Apple stock', 10), ('Nvidia stock', 10)]]
+    assert pipeline.cached == [('Tesla stock', 5), ('Apple stock', 10), ('Nvidia stock', 10)]
+
+
+@pytest.mark.parametrize('body', [
+    'not json',
+    '[]',
+    {'max_articles': 5},
+    {'query': ''},
+    {'query': 42},
+    {'query': 'Tesla stock', 'max_articles': 'many'},
+])
+def test_invalid_messages_are_dropped(pipeline, body):
+    response = batch_lambda.lambda_handler(event(body, {'query': 'Apple stock'}), None)
+
+    assert failed(response) == []
+    assert pipeline.scored == [[('Apple stock', 10)]]
+
+
+def test_transient_failures_are_retried(pipeline):
+    pipeline.outcomes = {
+        'Tesla stock': [ConnectionError('NewsAPI down')],
+        'Apple stock': [{'success': True, 'query': 'Apple stock', 'articles_analyzed': 3, 'degraded': True}],
+    }
+
+    response = batch_lambda.lambda_handler(event({'query': 'Tesla stock'}, {'query': 'Apple stock'}, {'query': 'Nvidia stock'}), None)
+
+    assert failed(response) == ['m0', 'm1']
+    assert pipeline.cached == [('Nvidia stock', 10)]
+
+
+def test_local_queue_retries_transient_failures(pipeline):
+    pipeline.outcomes = {'Tesla stock': [ConnectionError('NewsAPI down'), {'success': True, 'articles_analyzed': 3}]}
+    queue = LocalQueue(max_receives=3)
+    queue.send({'query': 'Tesla stock'})
+    queue.send({'query': 'Apple stock'})
+
+    queue.drain(batch_lambda.lambda_handler)
+
+    assert queue.dead_letters == []
+    assert [query for query, _ in pipeline.cached] == ['Apple stock', 'Tesla stock']
+    assert sorted(queue.receive_counts.values()) == [1, 2]
+
+
+def test_local_queue_dead_letters_after_max_receives(pipeline):
+    pipeline.outcomes = {'Tesla stock': [ConnectionError('NewsAPI down')]}
+    queue = LocalQueue(max_receives=3)
+    message_id = queue.send({'query': 'Tesla stock'})
+
+    queue.drain(batch_lambda.lambda_handler, batch_size=2)
+
+    assert [record['messageId'] for record in queue.dead_letters] == [message_id]
+    assert queue.receive_counts[message_id] == 3
+    assert len(pipeline.scored) == 3
+
+
+def test_local_queue_drops_poison_messages(pipeline):
+    queue = LocalQueue(max_receives=3)
+    queue.send({'max_articles': 5})
+
+    queue.drain(batch_lambda.lambda_handler)
+
+    assert queue.dead_letters == []
+    assert list(queue.receive_counts.values()) == [1]
+    assert pipeline.scored == [[]]
@@ -0,0 +1,91 @@
+import json
+import os
+
+import pytest
+
+from charset_normalizer import DetectionCache, cache, from_bytes
+
+PAYLOAD = 'Акции компании выросли на 3,5% в понедельник после публикации отчёта о прибыли.'.encode('cp1251')
+
+
+def entries(directory):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, files in os.walk(directory)
+        for name in files
+        if name.endswith('.json')
+    )
+
+
+def summary(matches):
+    return [(m.encoding, m.chaos, m.bom, m.languages, [leaf.encoding for leaf in m.submatch]) for m in matches]
+
+
+@pytest.fixture
+def detection_cache(tmp_path):
+    return DetectionCache(str(tmp_path / 'cache'))
+
+
+def test_round_trip(detection_cache):
+    detected = from_bytes(PAYLOAD, cache=detection_cache)
+    cached = from_bytes(PAYLOAD, cache=detection_cache)
+
+    assert len(entries(detection_cache.directory)) == 1
+    assert summary(cached) == summary(detected) == summary(from_bytes(PAYLOAD))
+    assert str(cached.best()) == str(detected.best())
+
+
+def test_hit_is_read_from_disk(detection_cache):
+    from_bytes(PAYLOAD, cache=detection_cache)
+    (path,) = entries(detection_cache.directory)
+    with open(path, encoding='utf-8') as fp:
+        entry = json.load(fp)
+    entry['matches'][0]['chaos'] = 0.123
+    with open(path, 'w', encoding='utf-8') as fp:
+        json.dump(entry, fp)
+
+    assert from_bytes(PAYLOAD, cache=detection_cache).best().chaos == 0.123
+
+
+@pytest.mark.parametrize('changed', [
+    {'payload': PAYLOAD + b'.'},
+    {'threshold': 0.3},
+    {'cp_exclusion': ['cp1251']},
+    {'preemptive_behaviour': False},
+])
+def test_changed_input_or_parameters_miss(detection_cache, changed):
+    from_bytes(PAYLOAD, cache=detection_cache)
+    arguments = dict(changed)
+    payload = arguments.pop('payload', PAYLOAD)
+
+    from_bytes(payload, cache=detection_cache, **arguments)
+
+    assert len(entries(detection_cache.directory)) == 2
+
+
+def test_new_version_invalidates_entries(detection_cache, monkeypatch):
+    from_bytes(PAYLOAD, cache=detection_cache)
+    monkeypatch.setattr(cache, '__version__', cache.__version__ + '.post1')
+
+    from_bytes(PAYLOAD, cache=detection_cache)
+
+    assert len(entries(detection_cache.directory)) == 2
+
+
+@pytest.mark.parametrize('content', ['', '{"matches": [', '{"matches": [{"encoding": "cp1251"}]}', '[]', 'null'])
+def test_corrupt_entry_is_a_miss_and_gets_rewritten(detection_cache, content):
+    expected = summary(from_bytes(PAYLOAD, cache=detection_cache))
+    (path,) = entries(detection_cache.directory)
+    with open(path, 'w', encoding='utf-8') as fp:
+        fp.write(content)
+
+    assert summary(from_bytes(PAYLOAD, cache=detection_cache)) == expected
+    with open(path, encoding='utf-8') as fp:
+        assert json.load(fp)['matches']
+
+
+def test_clear(detection_cache):
+    from_bytes(PAYLOAD, cache=detection_cache)
+    detection_cache.clear()
+
+    assert entries(detection_cache.directory) == []
@@ -0,0 +1,30 @@
+import json
+
+from charset_normalizer.cli import cli_detect
+
+BINARY = bytes(range(256)) * 4
+
+
+def test_max_bytes_reports_binary_file_undetected(tmp_path, capsys):
+    path = tmp_path / 'binary.dat'
+    path.write_bytes(BINARY)
+
+    assert cli_detect([str(path), '--max-bytes', '4096']) == 0
+
+    result = json.loads(capsys.readouterr().out)
+    assert result['encoding'] is None
+    assert result['alternative_encodings'] == []
+
+
+def test_batch_max_bytes_reports_binary_file_undetected(tmp_path, capsys):
+    (tmp_path / 'binary.dat').write_bytes(BINARY)
+    (tmp_path / 'text.txt').write_bytes('Grüße aus München, schöne Straße.'.encode('utf_8'))
+
+    assert cli_detect(['--batch', str(tmp_path), '--max-bytes', '4096', '-j', '1']) == 0
+
+    records = {
+        record['path'].rsplit('/', 1)[-1]: record
+        for record in map(json.loads, capsys.readouterr().out.splitlines())
+    }
+    assert records['binary.dat']['encoding'] is None
+    assert records['text.txt']['encoding'] == 'utf_8'
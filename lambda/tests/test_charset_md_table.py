@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from charset_normalizer import md
+from charset_normalizer.md_table import mess_ratio_table
+
+TEXTS = {
+    'english': "The quick brown fox jumps over the lazy dog. Shares of ACME rose 3.5% on Monday!\n",
+    'french': "Le cours de l'action a progressé de 3,5 % lundi, après l'annonce des résultats. Ça dépasse les prévisions.\n",
+    'german': "Die Aktie stieg am Montag um 3,5 %, nachdem das Unternehmen höhere Umsätze gemeldet hatte. Größe, Maß, Übermut.\n",
+    'russian': "Акции компании выросли на 3,5% в понедельник после публикации отчёта о прибыли.\n",
+    'greek': "Οι μετοχές της εταιρείας αυξήθηκαν κατά 3,5% τη Δευτέρα μετά την ανακοίνωση.\n",
+    'japanese': "月曜日、同社の株価は決算発表を受けて３．５％上昇した。カタカナとひらがなも含む。\n",
+    'chinese': "公司股价周一上涨百分之三点五，此前公司公布了高于预期的季度利润。\n",
+    'korean': "회사의 주가는 월요일 실적 발표 후 3.5% 상승했다.\n",
+    'arabic': "ارتفعت أسهم الشركة بنسبة 3.5٪ يوم الاثنين بعد إعلان الأرباح.\n",
+    'thai': "หุ้นของบริษัทเพิ่มขึ้น 3.5% ในวันจันทร์หลังจากประกาศผลกำไร\n",
+}
+
+# Code pages each text is encoded with; every encoding is then decoded with
+# each of DECODERS, which gives both clean and mojibake samples
+ENCODINGS = ['utf_8', 'cp1252', 'cp1251', 'iso8859_7', 'shift_jis', 'gb18030', 'euc_kr', 'cp1256', 'cp874']
+DECODERS = ['utf_8', 'cp1252', 'latin_1', 'cp1251', 'koi8_r', 'iso8859_7', 'shift_jis', 'gb18030', 'euc_kr', 'cp1256', 'cp874', 'mac_roman']
+
+
+def _samples():
+    samples = {}
+    for text_name, text in TEXTS.items():
+        for repeat in (1, 8, 20):
+            for encoding in ENCODINGS:
+                try:
+                    payload = (text * repeat).encode(encoding)
+                except UnicodeEncodeError:
+                    continue
+                for decoder in DECODERS:
+                    try:
+                        decoded = payload.decode(decoder)
+                    except UnicodeDecodeError:
+                        continue
+                    samples[f"{text_name}-x{repeat}-{encoding}-as-{decoder}"] = decoded
+
+    generator = random.Random(1234)
+    for i in range(10):
+        payload = bytes(generator.randrange(256) for _ in range(generator.choice([64, 600, 2000])))
+        for decoder in ('latin_1', 'cp1252', 'mac_roman', 'cp437'):
+            samples[f"random-{i}-as-{decoder}"] = payload.decode(decoder, errors='ignore')
+    return samples
+
+
+SAMPLES = _samples()
+
+
+@pytest.mark.parametrize('threshold', [0.1, 0.2, 1.0])
+@pytest.mark.parametrize('name', sorted(SAMPLES))
+def test_table_engine_matches_plugin_engine(name, threshold):
+    sample = SAMPLES[name]
+
+    assert mess_ratio_table(sample, threshold) == md.mess_ratio(sample, threshold)
@@ -0,0 +1,103 @@
+import gc
+import os
+import random
+import time
+
+import pytest
+
+from charset_normalizer import from_bytes, parallel
+
+needs_shared_memory = pytest.mark.skipif(not os.path.isdir('/dev/shm'), reason='no shared memory')
+
+TEXT = {
+    'cp1251': 'Акции компании выросли на 3,5% в понедельник после публикации отчёта о прибыли. ',
+    'cp1252': "Le cours de l'action a progressé de 3,5 % lundi, après l'annonce des résultats. ",
+    'iso8859_7': 'Οι μετοχές της εταιρείας αυξήθηκαν κατά 3,5% τη Δευτέρα μετά την ανακοίνωση. ',
+}
+
+
+def large(encoding):
+    text = TEXT[encoding]
+    return (text * (parallel.PARALLEL_MIN_BYTES // len(text) + 1)).encode(encoding)
+
+
+def mixed_bytes():
+    generator = random.Random(7)
+    words = [bytes(generator.randrange(0x41, 0x7b) for _ in range(5)) + bytes([generator.randrange(0xc0, 0x100)]) for _ in range(400)]
+    return b' '.join(generator.choice(words) for _ in range(parallel.PARALLEL_MIN_BYTES // 6 + 1))
+
+
+def summary(matches):
+    return [(m.encoding, m.chaos, m.coherence, m.languages, m.fingerprint) for m in matches]
+
+
+@pytest.fixture
+def pool():
+    """
+    Pool state of one test. The pool uses forkserver (or spawn) processes, which
+    import the probe function by module name and never re-run a test's __main__.
+    """
+    yield parallel
+    executor = parallel._executor
+    parallel._executor = None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+@pytest.fixture
+def blocks(monkeypatch):
+    """Names of the shared memory blocks created by parallel detection"""
+    names = []
+    shared_memory = parallel.SharedMemory
+
+    def recording(*args, **kwargs):
+        block = shared_memory(*args, **kwargs)
+        if kwargs.get('create'):
+            names.append(block.name)
+        return block
+
+    monkeypatch.setattr(parallel, 'SharedMemory', recording)
+    return names
+
+
+def unlinked(name, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        gc.collect()
+        if not os.path.exists(os.path.join('/dev/shm', name.lstrip('/'))):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def failing_probe(*args, **kwargs):
+    raise RuntimeError('probe failed')
+
+
+@needs_shared_memory
+@pytest.mark.parametrize('payload', [large('cp1251'), large('cp1252'), large('iso8859_7'), mixed_bytes()],
+                         ids=['cp1251', 'cp1252', 'iso8859_7', 'mixed'])
+def test_workers_match_serial_detection(pool, blocks, payload):
+    serial = summary(from_bytes(payload))
+    parallel_matches = summary(from_bytes(payload, workers=2))
+
+    assert blocks, 'the pool was not used'
+    assert parallel_matches == serial
+    assert all(unlinked(name) for name in blocks)
+
+
+@needs_shared_memory
+def test_failing_probes_fall_back_to_serial_and_free_shared_memory(pool, blocks, monkeypatch):
+    payload = large('cp1251')
+    serial = summary(from_bytes(payload))
+    monkeypatch.setattr(parallel, 'probe_code_page', failing_probe)
+
+    assert summary(from_bytes(payload, workers=2)) == serial
+    assert blocks
+    assert all(unlinked(name) for name in blocks)
+
+
+def test_small_payloads_stay_serial(pool, blocks):
+    from_bytes(TEXT['cp1251'].encode('cp1251') * 10, workers=4)
+
+    assert blocks == []
@@ -0,0 +1,168 @@
+"""
+The proptable-backed predicates against the original unicodedata definitions
+(charset_normalizer 3.x utils), over the whole BMP.
+"""
+import unicodedata
+
+import pytest
+
+from charset_normalizer import proptable, utils
+from charset_normalizer.constant import COMMON_CJK_CHARACTERS, UNICODE_RANGES_COMBINED
+
+BMP = [chr(code_point) for code_point in range(proptable.BMP_SIZE)]
+
+
+def _range_names():
+    names = [None] * proptable.BMP_SIZE
+    # First matching range wins, as in the original linear search
+    for range_name, ord_range in reversed(list(UNICODE_RANGES_COMBINED.items())):
+        for code_point in ord_range:
+            if code_point < proptable.BMP_SIZE:
+                names[code_point] = range_name
+    return names
+
+
+RANGES = _range_names()
+
+
+def unicode_range(character):
+    return RANGES[ord(character)]
+
+
+def name(character):
+    try:
+        return unicodedata.name(character)
+    except ValueError:
+        return ''
+
+
+def is_accentuated(character):
+    description = name(character)
+    return any(marker in description for marker in (
+        "WITH GRAVE", "WITH ACUTE", "WITH CEDILLA", "WITH DIAERESIS",
+        "WITH CIRCUMFLEX", "WITH TILDE", "WITH MACRON", "WITH RING ABOVE",
+    ))
+
+
+def is_punctuation(character):
+    if "P" in unicodedata.category(character):
+        return True
+    character_range = unicode_range(character)
+    return character_range is not None and "Punctuation" in character_range
+
+
+def is_symbol(character):
+    category = unicodedata.category(character)
+    if "S" in category or "N" in category:
+        return True
+    character_range = unicode_range(character)
+    return character_range is not None and "Forms" in character_range and category != "Lo"
+
+
+def is_emoticon(character):
+    character_range = unicode_range(character)
+    return character_range is not None and ("Emoticons" in character_range or "Pictographs" in character_range)
+
+
+def is_separator(character):
+    if character.isspace() or character in {"｜", "+", "<", ">"}:
+        return True
+    category = unicodedata.category(character)
+    return "Z" in category or category in {"Po", "Pd", "Pc"}
+
+
+def is_unprintable(character):
+    return (
+        character.isspace() is False
+        and character.isprintable() is False
+        and character != "\x1a"
+        and character != "\ufeff"
+    )
+
+
+REFERENCE = {
+    'is_accentuated': is_accentuated,
+    'is_latin': lambda c: "LATIN" in name(c),
+    'is_punctuation': is_punctuation,
+    'is_symbol': is_symbol,
+    'is_emoticon': is_emoticon,
+    'is_separator': is_separator,
+    'is_case_variable': lambda c: c.islower() != c.isupper(),
+    'is_cjk': lambda c: "CJK" in name(c),
+    'is_hiragana': lambda c: "HIRAGANA" in name(c),
+    'is_katakana': lambda c: "KATAKANA" in name(c),
+    'is_hangul': lambda c: "HANGUL" in name(c),
+    'is_thai': lambda c: "THAI" in name(c),
+    'is_arabic': lambda c: "ARABIC" in name(c),
+    'is_arabic_isolated_form': lambda c: "ARABIC" in name(c) and "ISOLATED FORM" in name(c),
+    'is_cjk_uncommon': lambda c: c not in COMMON_CJK_CHARACTERS,
+    'is_unprintable': is_unprintable,
+    'unicode_range': unicode_range,
+}
+
+FLAGS = {
+    'is_accentuated': proptable.ACCENTUATED,
+    'is_latin': proptable.LATIN,
+    'is_punctuation': proptable.PUNCTUATION,
+    'is_symbol': proptable.SYMBOL,
+    'is_emoticon': proptable.EMOTICON,
+    'is_separator': proptable.SEPARATOR,
+    'is_case_variable': proptable.CASE_VARIABLE,
+    'is_cjk': proptable.CJK,
+    'is_hiragana': proptable.HIRAGANA,
+    'is_katakana': proptable.KATAKANA,
+    'is_hangul': proptable.HANGUL,
+    'is_thai': proptable.THAI,
+    'is_arabic': proptable.ARABIC,
+    'is_arabic_isolated_form': proptable.ARABIC_ISOLATED_FORM,
+    'is_cjk_uncommon': proptable.CJK_UNCOMMON,
+    'is_unprintable': proptable.UNPRINTABLE,
+}
+
+
+@pytest.fixture(scope='module')
+def persisted_table(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('proptable') / 'proptable.bin')
+    proptable.build_table(path)
+    table = proptable.load_table(path)
+    assert table is not None
+    return table
+
+
+@pytest.mark.parametrize('predicate', sorted(REFERENCE))
+def test_predicates_match_unicodedata(predicate):
+    reference = REFERENCE[predicate]
+    function = getattr(utils, predicate)
+
+    mismatches = [hex(ord(c)) for c in BMP if function(c) != reference(c)]
+
+    assert mismatches == []
+
+
+@pytest.mark.parametrize('predicate', sorted(FLAGS))
+def test_persisted_table_matches_unicodedata(persisted_table, predicate):
+    flags, _ = persisted_table
+    reference = REFERENCE[predicate]
+    flag = FLAGS[predicate]
+
+    mismatches = [hex(ord(c)) for c in BMP if bool(flags[ord(c)] & flag) != reference(c)]
+
+    assert mismatches == []
+
+
+def test_persisted_table_ranges_match_unicodedata(persisted_table):
+    _, ranges = persisted_table
+
+    mismatches = [hex(ord(c)) for c in BMP if proptable.RANGE_NAMES[ranges[ord(c)]] != unicode_range(c)]
+
+    assert mismatches == []
+
+
+def test_stale_table_is_ignored(tmp_path):
+    path = tmp_path / 'proptable.bin'
+    proptable.build_table(str(path))
+    data = bytearray(path.read_bytes())
+    data[proptable.TABLE_HEADER.size - 1] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    assert proptable.load_table(str(path)) is None
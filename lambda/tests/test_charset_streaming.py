@@ -0,0 +1,51 @@
+import pytest
+
+from charset_normalizer import from_bytes, from_stream
+
+SHORT_INPUTS = {
+    'ascii': b'hello world',
+    'utf_8': 'Bonjour, ça va très bien'.encode('utf_8'),
+    'cp1251': 'Привет, как дела? Всё хорошо, спасибо.'.encode('cp1251'),
+    'cp1252': 'Grüße aus München, schöne Straße.'.encode('cp1252'),
+    'shift_jis': '日本語のテキストです。'.encode('shift_jis'),
+    'utf_16': '﻿hello'.encode('utf_16'),
+    'all_bytes': bytes(range(256)),
+    'high_bytes': bytes(range(128, 256)) * 3,
+    'control_bytes': bytes(range(32)) * 40,
+}
+
+
+@pytest.mark.parametrize('payload', SHORT_INPUTS.values(), ids=SHORT_INPUTS.keys())
+def test_short_input_agrees_with_from_bytes(payload):
+    expected = from_bytes(payload).best()
+    found = from_stream(payload).best()
+
+    if expected is None:
+        assert found is None
+    else:
+        assert found is not None
+        assert (found.encoding, found.chaos, str(found)) == (expected.encoding, expected.chaos, str(expected))
+
+
+@pytest.mark.parametrize('payload', [bytes(range(256)), bytes(range(128, 256)) * 3], ids=['all_bytes', 'high_bytes'])
+def test_binary_is_undetected(payload):
+    assert len(from_stream(payload)) == 0
+
+
+ASCII_TEXT = b'Shares of ACME rose 3.5% on Monday after earnings beat estimates.\n'
+
+
+@pytest.mark.parametrize('size', [11, 600, 5000, 40000])
+def test_ascii_input_is_ascii(size):
+    payload = (ASCII_TEXT * (size // len(ASCII_TEXT) + 1))[:size]
+
+    assert from_bytes(payload).best().encoding == 'ascii'
+    assert from_stream(payload).best().encoding == 'ascii'
+    assert str(from_stream(payload).best()) == payload.decode('ascii')
+
+
+def test_ascii_prefix_does_not_decide_the_stream():
+    payload = ASCII_TEXT * 300 + 'Société Générale'.encode('utf_8')
+
+    assert from_bytes(payload).best().encoding == 'utf_8'
+    assert from_stream(payload).best().encoding == 'utf_8'
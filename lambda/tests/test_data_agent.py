@@ -0,0 +1,50 @@
+import json
+import os
+
+import pytest
+
+from data_agent_lambda import iter_json_array
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'benchmarks', 'fixtures', 'newsapi_everything.json')
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 7, 8192])
+def test_fixture_matches_json_loads(size):
+    with open(FIXTURE, 'rb') as f:
+        data = f.read()
+
+    items = list(iter_json_array(chunked(data, size), 'articles'))
+
+    assert items == json.loads(data)['articles']
+
+
+@pytest.mark.parametrize('size', [1, 2, 3])
+@pytest.mark.parametrize('body', [
+    '{"a": 350.0, "articles": [1]}',
+    '{"a": 1e5, "articles": [1]}',
+    '{"a": -2.5E-3,"articles":[1]}',
+    '{"articles": [1.5, 2]}',
+    '{"articles": [10,-20.25e+2 ,3e1]}',
+    '{"totalResults": 123456, "articles": [{"score": 0.25}, true, null, "x"]}',
+])
+def test_numbers_split_across_chunks(body, size):
+    items = list(iter_json_array(chunked(body.encode('utf-8'), size), 'articles'))
+
+    assert items == json.loads(body)['articles']
+
+
+def test_multibyte_characters_split_across_chunks():
+    body = json.dumps({'articles': [{'title': 'Société Générale — 株価'}]}, ensure_ascii=False)
+
+    items = list(iter_json_array(chunked(body.encode('utf-8'), 1), 'articles'))
+
+    assert items == json.loads(body)['articles']
+
+
+def test_truncated_body_raises():
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunked(b'{"articles": [1, 2', 1), 'articles'))
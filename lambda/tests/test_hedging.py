@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+import sentiment_agent_lambda as sentiment
+from tracing import SlidingHistogram
+
+# Observed latency before each test: 1000 calls of 20 ms, so the p95 (and
+# the hedge delay) is about 20 ms and a handful of slow calls do not move it
+BASELINE_MS = 20.0
+
+
+class FakeUpstream:
+    """http_client.post stand-in answering each call after its own delay"""
+
+    def __init__(self, *behaviours):
+        # One (seconds, result or exception) per call, the last one repeating
+        self.behaviours = list(behaviours)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def post(self, url, **kwargs):
+        with self.lock:
+            index = min(self.calls, len(self.behaviours) - 1)
+            self.calls += 1
+        delay, result = self.behaviours[index]
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    latency = SlidingHistogram(1000)
+    for _ in range(1000):
+        latency.record(BASELINE_MS)
+    monkeypatch.setattr(sentiment, 'HF_HEDGE', True)
+    monkeypatch.setattr(sentiment, 'HF_HEDGE_BUDGET', 1.0)
+    monkeypatch.setattr(sentiment, '_hedge_latency', latency)
+    monkeypatch.setattr(sentiment, '_hedge_stats', {'calls': 0, 'hedged': 0, 'hedge_won': 0})
+    monkeypatch.setattr(sentiment, '_hedge_pool', None)
+    yield sentiment
+    if sentiment._hedge_pool is not None:
+        sentiment._hedge_pool.shutdown(wait=True)
+
+
+def use(monkeypatch, upstream):
+    monkeypatch.setattr(sentiment.http_client, 'post', upstream.post)
+    return upstream
+
+
+def test_fast_calls_are_not_hedged(hedging, monkeypatch):
+    upstream = use(monkeypatch, FakeUpstream((0.0, 'answer')))
+
+    assert hedging._post('url') == 'answer'
+    assert upstream.calls == 1
+    assert hedging.hedge_stats()['hedged'] == 0
+
+
+def test_slow_call_is_hedged_after_the_p95(hedging, monkeypatch):
+    upstream = use(monkeypatch, FakeUpstream((1.0, 'slow primary'), (0.0, 'hedge')))
+
+    start = time.perf_counter()
+    result = hedging._post('url')
+    elapsed = time.perf_counter() - start
+
+    assert result == 'hedge'
+    assert upstream.calls == 2
+    assert BASELINE_MS / 1000 * 0.9 <= elapsed < 0.5
+    assert hedging.hedge_stats()['hedged'] == 1
+    assert hedging.hedge_stats()['hedge_won'] == 1
+
+
+def test_primary_answering_first_wins(hedging, monkeypatch):
+    upstream = use(monkeypatch, FakeUpstream((0.1, 'primary'), (1.0, 'slow hedge')))
+
+    start = time.perf_counter()
+    assert hedging._post('url') == 'primary'
+    assert time.perf_counter() - start < 0.5
+    assert upstream.calls == 2
+    assert hedging.hedge_stats()['hedge_won'] == 0
+
+
+def test_budget_caps_hedges(hedging, monkeypatch):
+    monkeypatch.setattr(hedging, 'HF_HEDGE_BUDGET', 0.5)
+    use(monkeypatch, FakeUpstream((0.1, 'answer')))
+
+    for _ in range(10):
+        assert hedging._post('url') == 'answer'
+
+    stats = hedging.hedge_stats()
+    assert stats['calls'] == 10
+    assert stats['hedged'] == 5
+
+
+def test_no_hedges_before_enough_samples(hedging, monkeypatch):
+    monkeypatch.setattr(hedging, '_hedge_latency', SlidingHistogram(1000))
+    upstream = use(monkeypatch, FakeUpstream((0.1, 'answer')))
+
+    assert hedging._post('url') == 'answer'
+    assert upstream.calls == 1
+
+
+def test_failed_attempt_loses_to_a_successful_one(hedging, monkeypatch):
+    use(monkeypatch, FakeUpstream((0.2, ConnectionError('primary failed')), (0.0, 'hedge')))
+
+    assert hedging._post('url') == 'hedge'
+
+
+def test_errors_from_both_attempts_propagate(hedging, monkeypatch):
+    use(monkeypatch, FakeUpstream((0.2, ConnectionError('primary failed')), (0.0, TimeoutError('hedge failed'))))
+
+    with pytest.raises((ConnectionError, TimeoutError)):
+        hedging._post('url')
+    assert hedging.hedge_stats()['hedged'] == 1
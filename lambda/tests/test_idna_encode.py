@@ -0,0 +1,71 @@
+import itertools
+
+import pytest
+
+import idna
+from idna import core
+
+DOMAINS = [
+    'example.com',
+    'Example.COM',
+    'WWW.EXAMPLE.COM.',
+    'example.com.',
+    'a.b.c.d.e',
+    'xn--bcher-kva.example',
+    'XN--BCHER-KVA.example',
+    'xn--invalid-.example',
+    'xn--.example',
+    'ab--cd.example',
+    'a--b.example',
+    'ab-cd.example',
+    '-leading.example',
+    'trailing-.example',
+    'under_score.example',
+    '1234.example',
+    'a' * 63 + '.example',
+    'a' * 64 + '.example',
+    '.'.join(['a' * 63] * 4),
+    '.'.join(['a' * 63] * 4) + '.',
+    '.'.join(['a' * 62] * 4) + '.',
+    'example..com',
+    '.example.com',
+    '.',
+    '',
+    'bücher.example',
+    'BÜCHER.example',
+]
+
+FLAGS = [
+    dict(zip(('strict', 'uts46', 'std3_rules', 'transitional'), values))
+    for values in itertools.product((False, True), repeat=4)
+]
+
+
+def outcome(function, domain, flags):
+    try:
+        return function(domain, **flags)
+    except Exception as e:
+        return type(e)
+
+
+@pytest.mark.parametrize('flags', FLAGS, ids=lambda flags: ','.join(k for k, v in flags.items() if v) or 'default')
+@pytest.mark.parametrize('domain', DOMAINS)
+def test_fast_path_matches_full_path(domain, flags):
+    full = core._encode.__wrapped__
+
+    assert outcome(idna.encode, domain, flags) == outcome(full, domain, flags)
+    # Again, from the cache where there is one
+    assert outcome(idna.encode, domain, flags) == outcome(full, domain, flags)
+
+
+@pytest.mark.parametrize('domain', ['xn--.example', 'a' * 64 + '.example', 'example..com', 'bad\u200d.example'])
+def test_cached_calls_still_raise(domain):
+    for _ in range(3):
+        with pytest.raises(idna.IDNAError):
+            idna.encode(domain, uts46=True)
+
+
+def test_bytes_input():
+    assert idna.encode(b'Example.com', uts46=True) == b'example.com'
+    with pytest.raises(idna.IDNAError):
+        idna.encode('bücher'.encode('utf-8'))
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from idna import idnadata
+from idna.intranges import intranges_contain, intranges_contain_many, intranges_from_list
+
+
+def expected(ints, ranges):
+    return [intranges_contain(int_, ranges) for int_ in ints]
+
+
+def random_ranges(generator, limit):
+    members = generator.sample(range(limit), generator.randrange(0, limit // 2))
+    return intranges_from_list(members)
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_matches_intranges_contain(seed):
+    generator = random.Random(seed)
+    limit = generator.choice([8, 64, 1000])
+    ranges = random_ranges(generator, limit)
+    # Unsorted, with duplicates and values outside every range
+    ints = [generator.randrange(0, limit + 2) for _ in range(generator.randrange(0, 50))]
+
+    assert intranges_contain_many(ints, ranges) == expected(ints, ranges)
+
+
+def test_range_boundaries():
+    ranges = intranges_from_list([2, 3, 4, 10, 20, 21])
+    ints = list(range(25))
+
+    assert intranges_contain_many(ints, ranges) == expected(ints, ranges)
+    assert intranges_contain_many(reversed(ints), ranges) == expected(list(reversed(ints)), ranges)
+
+
+def test_empty_input_and_ranges():
+    assert intranges_contain_many([], intranges_from_list([1, 2])) == []
+    assert intranges_contain_many([], ()) == []
+    assert intranges_contain_many([0, 5, 5], ()) == [False, False, False]
+
+
+def test_accepts_any_iterable():
+    ranges = intranges_from_list([ord('a'), ord('b')])
+
+    assert intranges_contain_many((ord(c) for c in 'cab'), ranges) == [False, True, True]
+
+
+@pytest.mark.parametrize('name', sorted(idnadata.codepoint_classes))
+def test_matches_on_idna_classes(name):
+    ranges = idnadata.codepoint_classes[name]
+    labels = ['bücher', 'παράδειγμα', 'пример', '例子', 'مثال', 'a\u200db', '\u00b7l', '\U0001f600x']
+    ints = [ord(c) for label in labels for c in label]
+
+    assert intranges_contain_many(ints, ranges) == expected(ints, ranges)
@@ -0,0 +1,72 @@
+import bisect
+
+import pytest
+
+from idna import idnadata, tables
+from idna.uts46data import uts46data
+
+
+@pytest.fixture(scope='module')
+def tables_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('idna') / 'idnatables.bin')
+    tables.build_tables(path)
+    return path
+
+
+@pytest.fixture
+def mapped(tables_path, monkeypatch):
+    """The tables module reading a freshly generated data file"""
+    monkeypatch.setattr(tables, 'TABLES_PATH', tables_path)
+    for name, value in (('_mapping', None), ('_directory', None), ('_sections', {}), ('_uts46', None)):
+        monkeypatch.setattr(tables, name, value)
+    yield tables
+    assert tables._directory, 'the data file was not used'
+
+
+def reference_row(code_point):
+    row = uts46data[bisect.bisect_left(uts46data, (code_point, 'Z')) - 1]
+    return row[1], row[2] if len(row) == 3 else None
+
+
+def test_uts46_rows_match_every_code_point(mapped):
+    mismatches = [
+        hex(code_point)
+        for code_point in range(0x110000)
+        if mapped.uts46_row(code_point) != reference_row(code_point)
+    ]
+
+    assert mismatches == []
+
+
+@pytest.mark.parametrize('name', sorted(idnadata.codepoint_classes))
+def test_codepoint_classes_match(mapped, name):
+    assert list(mapped.codepoint_class(name)) == list(idnadata.codepoint_classes[name])
+
+
+@pytest.mark.parametrize('name', sorted(idnadata.scripts))
+def test_scripts_match(mapped, name):
+    assert list(mapped.script(name)) == list(idnadata.scripts[name])
+
+
+def test_joining_types_match(mapped):
+    code_points = set(idnadata.joining_types)
+    code_points.update(range(0x600, 0x900))
+    code_points.update((0, 0x10FFFF))
+
+    mismatches = [
+        hex(code_point)
+        for code_point in sorted(code_points)
+        if mapped.joining_type(code_point) != idnadata.joining_types.get(code_point)
+    ]
+
+    assert mismatches == []
+
+
+def test_stale_data_file_is_ignored(tables_path, tmp_path):
+    stale = tmp_path / 'idnatables.bin'
+    data = bytearray(open(tables_path, 'rb').read())
+    data[8] ^= 0xFF
+    stale.write_bytes(bytes(data))
+
+    assert tables._map_tables(str(stale)) is None
+    assert tables._map_tables(str(tmp_path / 'missing.bin')) is None
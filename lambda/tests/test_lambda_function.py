@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+import lambda_function
+
+
+@pytest.mark.parametrize('queries', [
+    [],
+    'Tesla stock',
+    ['Tesla stock', ''],
+    ['Tesla stock', '   '],
+    ['Tesla stock', None],
+    ['Tesla stock', 3],
+    ['Tesla stock'] * (lambda_function.MAX_QUERIES + 1),
+])
+def test_bad_queries_are_rejected_with_400(queries):
+    response = lambda_function.lambda_handler({'body': json.dumps({'queries': queries})}, None)
+
+    assert response['statusCode'] == 400
+    assert json.loads(response['body'])['success'] is False
+
+
+def test_cache_lookups_keep_query_order(monkeypatch):
+    monkeypatch.setattr(lambda_function, 'get_report', lambda query, n: {'success': True, 'query': query})
+    queries = [f"query {i}" for i in range(10)]
+
+    results = lambda_function.analyze_queries(queries, 5)
+
+    assert [r['query'] for r in results] == queries
+    assert all(r['cached'] for r in results)
@@ -0,0 +1,63 @@
+import tracemalloc
+
+import pytest
+
+import memory_profile
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    monkeypatch.setattr(memory_profile, 'ENABLED', True)
+    memory_profile.reset()
+    yield memory_profile
+    memory_profile.reset()
+    tracemalloc.stop()
+
+
+def allocate(kb):
+    return [bytearray(1024) for _ in range(kb)]
+
+
+def test_disabled_profiler_returns_the_function(monkeypatch):
+    monkeypatch.setattr(memory_profile, 'ENABLED', False)
+
+    assert memory_profile.profile_memory('stage')(allocate) is allocate
+
+
+def test_profile_memory_records_peak_and_call_site(profiler):
+    stage = profiler.profile_memory('allocate')(allocate)
+
+    kept = stage(512)
+    stage(16)
+
+    summary = profiler.summary()['allocate']
+    assert summary['calls'] == 2
+    assert summary['peak_kb'] >= 512
+    assert summary['net_kb'] >= 512
+    top = summary['top_sites'][0]
+    assert top['site'].startswith('test_memory_profile.py:')
+    assert top['size_kb'] >= 512
+    assert len(kept) == 512
+
+
+def test_profile_memory_records_failing_stages(profiler):
+    @profiler.profile_memory('failing')
+    def failing():
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        failing()
+
+    assert profiler.summary()['failing']['calls'] == 1
+
+
+def test_check_budget(profiler, monkeypatch):
+    profiler.profile_memory('allocate')(allocate)(2048)
+    monkeypatch.setattr(memory_profile, 'peak_rss_mb', lambda: 100.0)
+
+    assert profiler.check_budget(128, {'allocate': 4}) == []
+
+    problems = profiler.check_budget(64, {'allocate': 1, 'missing': 1})
+    assert len(problems) == 2
+    assert problems[0].startswith('peak RSS 100.0 MB exceeds budget 64.0 MB')
+    assert problems[1].startswith('allocate allocated')
@@ -0,0 +1,56 @@
+import pytest
+
+import rate_limit
+from rate_limit import RATE_LIMIT_HEADROOM, TokenBucket
+
+# 60 requests per minute, paced to RATE_LIMIT_HEADROOM of that
+POLICY = {'RateLimit-Policy': '"api";q=60;w=60'}
+ADVERTISED = 60 * RATE_LIMIT_HEADROOM / 60
+
+
+def throttled_bucket(times):
+    bucket = TokenBucket()
+    bucket.update(200, POLICY)
+    for _ in range(times):
+        bucket.update(429, {'Retry-After': '0'})
+    return bucket
+
+
+def test_429_halves_the_rate():
+    assert throttled_bucket(2).rate == pytest.approx(ADVERTISED / 4)
+
+
+def test_successes_without_headers_restore_the_advertised_rate():
+    bucket = throttled_bucket(3)
+
+    steps = 0
+    while bucket.rate < ADVERTISED and steps < 100:
+        bucket.update(200, {})
+        steps += 1
+
+    assert bucket.rate == pytest.approx(ADVERTISED)
+    assert steps == pytest.approx((1 - 1 / 8) / rate_limit.RATE_LIMIT_RECOVERY, abs=1)
+
+
+def test_recovery_never_exceeds_the_advertised_rate():
+    bucket = throttled_bucket(1)
+    for _ in range(100):
+        bucket.update(200, {})
+
+    assert bucket.rate == pytest.approx(ADVERTISED)
+
+
+def test_errors_do_not_restore_the_rate():
+    bucket = throttled_bucket(1)
+    for _ in range(10):
+        bucket.update(500, {})
+
+    assert bucket.rate == pytest.approx(ADVERTISED / 2)
+
+
+def test_no_rate_without_headers():
+    bucket = TokenBucket()
+    bucket.update(429, {'Retry-After': '0'})
+    bucket.update(200, {})
+
+    assert bucket.rate is None
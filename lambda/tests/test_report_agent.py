@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+import pytest
+
+from records import Article, ScoredArticle
+from report_agent_lambda import generate_report
+
+
+def scored(label, title='headline'):
+    return ScoredArticle(Article(title), label, 0.9)
+
+
+def test_counts_labels():
+    report = generate_report([scored('positive'), scored('Positive'), scored('negative'), scored('neutral')])
+
+    assert (report['positive'], report['negative'], report['neutral'], report['total']) == (2, 1, 1, 4)
+    assert 'POSITIVE (2/4 articles)' in report['summary']
+
+
+@pytest.mark.parametrize('label, field', [('positive', 'positive'), ('negative', 'negative'), ('neutral', 'neutral')])
+def test_labels_that_were_not_interned_still_count(label, field):
+    # A label built at run time, as from a JSON response, is a distinct string
+    built = ''.join(list(label))
+    assert built == label
+
+    report = generate_report([SimpleNamespace(title='headline', label=built)])
+
+    assert report[field] == 1
+
+
+def test_unknown_labels_count_as_neutral():
+    report = generate_report([scored('bullish')])
+
+    assert (report['positive'], report['negative'], report['neutral']) == (0, 0, 1)
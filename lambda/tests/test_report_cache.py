@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+
+import report_cache
+from report_cache import cache_key, get_report, put_report
+
+PAYLOAD = {'success': True, 'query': 'Tesla stock', 'articles_analyzed': 5, 'report': {'positive': 3}}
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = str(tmp_path / 'reports')
+    monkeypatch.setattr(report_cache, 'CACHE_DIR', directory)
+    monkeypatch.setattr(report_cache, 'CACHE_BUCKET', None)
+    monkeypatch.setattr(report_cache, 'CACHE_ENABLED', True)
+    return directory
+
+
+def entry_path(cache_dir, query, max_articles):
+    return os.path.join(cache_dir, cache_key(query, max_articles) + '.json')
+
+
+def age_entry(cache_dir, query, max_articles, seconds):
+    path = entry_path(cache_dir, query, max_articles)
+    with open(path, encoding='utf-8') as f:
+        entry = json.load(f)
+    entry['stored_at'] -= seconds
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+
+
+def test_round_trip(cache_dir):
+    assert get_report('Tesla stock', 5) is None
+
+    put_report('Tesla stock', 5, PAYLOAD)
+
+    assert get_report('Tesla stock', 5) == PAYLOAD
+    assert get_report('  tesla   STOCK ', 5) == PAYLOAD
+    assert get_report('Tesla stock', 10) is None
+    assert os.listdir(cache_dir) == [cache_key('Tesla stock', 5) + '.json']
+
+
+def test_entries_expire_after_the_ttl(cache_dir):
+    put_report('Tesla stock', 5, PAYLOAD)
+
+    age_entry(cache_dir, 'Tesla stock', 5, report_cache.CACHE_TTL - 60)
+    assert get_report('Tesla stock', 5) == PAYLOAD
+
+    age_entry(cache_dir, 'Tesla stock', 5, 120)
+    assert get_report('Tesla stock', 5) is None
+    assert get_report('Tesla stock', 5, ttl=report_cache.CACHE_TTL + 3600) == PAYLOAD
+
+
+def test_degraded_payloads_are_not_cached(cache_dir):
+    put_report('Tesla stock', 5, dict(PAYLOAD, degraded=True))
+
+    assert get_report('Tesla stock', 5) is None
+    assert not os.path.exists(entry_path(cache_dir, 'Tesla stock', 5))
+
+
+def test_degraded_payload_does_not_replace_a_good_one(cache_dir):
+    put_report('Tesla stock', 5, PAYLOAD)
+    put_report('Tesla stock', 5, dict(PAYLOAD, report={'neutral': 5}, degraded=True))
+
+    assert get_report('Tesla stock', 5) == PAYLOAD
+
+
+def test_corrupt_entry_is_a_miss(cache_dir):
+    put_report('Tesla stock', 5, PAYLOAD)
+    with open(entry_path(cache_dir, 'Tesla stock', 5), 'w', encoding='utf-8') as f:
+        f.write('{"payload": ')
+
+    assert get_report('Tesla stock', 5) is None
+
+
+def test_disabled_cache(cache_dir, monkeypatch):
+    monkeypatch.setattr(report_cache, 'CACHE_ENABLED', False)
+
+    put_report('Tesla stock', 5, PAYLOAD)
+
+    assert get_report('Tesla stock', 5) is None
+    assert not os.path.exists(cache_dir)
+
+
+def test_write_failures_are_not_raised(cache_dir, monkeypatch):
+    monkeypatch.setattr(report_cache, 'CACHE_DIR', os.path.join(cache_dir, 'file'))
+    os.makedirs(cache_dir)
+    open(os.path.join(cache_dir, 'file'), 'w').close()
+
+    put_report('Tesla stock', 5, PAYLOAD)
+
+    assert get_report('Tesla stock', 5) is None
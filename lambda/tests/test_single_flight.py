@@ -0,0 +1,149 @@
+import threading
+import time
+
+import pytest
+
+import tracing
+from single_flight import SingleFlight
+
+CALLERS = 8
+
+
+class ObservedFlight(SingleFlight):
+    """SingleFlight counting the callers waiting on another one"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.waiting = 0
+        self._waiting_lock = threading.Lock()
+
+    def _wait(self, call):
+        with self._waiting_lock:
+            self.waiting += 1
+        return super()._wait(call)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.001)
+
+
+def run_callers(target, count=CALLERS):
+    results = [None] * count
+
+    def caller(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+@pytest.fixture
+def flight():
+    tracing.reset_histograms()
+    yield ObservedFlight('test')
+    tracing.reset_histograms()
+
+
+def test_concurrent_callers_share_one_call(flight):
+    release = threading.Event()
+    runs = []
+
+    def compute(x):
+        runs.append(x)
+        release.wait(5)
+        return {'value': x}
+
+    threads, results = run_callers(lambda: flight.do('key', compute, 42))
+    wait_until(lambda: flight.waiting == CALLERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert runs == [42]
+    assert all(result is results[0] for result in results)
+    assert results[0] == {'value': 42}
+    assert flight._calls == {}
+    assert tracing.histograms()['test.coalesced']['count'] == CALLERS - 1
+
+
+def test_exception_reaches_every_waiter(flight):
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        raise RuntimeError('upstream failed')
+
+    threads, results = run_callers(lambda: flight.do('key', compute))
+    wait_until(lambda: flight.waiting == CALLERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight._calls == {}
+
+
+def test_key_is_released_after_completion(flight):
+    runs = []
+
+    def compute():
+        runs.append(1)
+        return len(runs)
+
+    assert flight.do('key', compute) == 1
+    assert flight.do('key', compute) == 2
+    with pytest.raises(ZeroDivisionError):
+        flight.do('key', lambda: 1 / 0)
+    assert flight.do('key', compute) == 3
+    assert flight._calls == {}
+    assert 'test.coalesced' not in tracing.histograms()
+
+
+def test_do_many_awaits_keys_in_flight(flight):
+    release = threading.Event()
+    batches = []
+
+    def compute(keys):
+        batches.append(list(keys))
+        release.wait(5)
+        return [key.upper() for key in keys]
+
+    first = threading.Thread(target=flight.do_many, args=(['a', 'b'], compute))
+    first.start()
+    wait_until(lambda: batches)
+
+    threads, results = run_callers(lambda: flight.do_many(['b', 'c', 'a', 'c'], compute), count=1)
+    wait_until(lambda: len(batches) == 2)
+    release.set()
+    for thread in threads + [first]:
+        thread.join()
+
+    assert batches == [['a', 'b'], ['c']]
+    assert results[0] == ['B', 'C', 'A', 'C']
+    assert flight._calls == {}
+    assert tracing.histograms()['test.coalesced']['count'] == 2
+
+
+def test_do_many_failure_reaches_waiters(flight):
+    release = threading.Event()
+
+    def compute(keys):
+        release.wait(5)
+        return keys[:1]
+
+    threads, results = run_callers(lambda: flight.do_many(['a', 'b'], compute), count=3)
+    wait_until(lambda: flight.waiting >= 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight._calls == {}
@@ -0,0 +1,47 @@
+import pytest
+
+from tracing import Histogram, SlidingHistogram
+
+
+def test_sliding_histogram_forgets_old_samples():
+    histogram = SlidingHistogram(100)
+    for _ in range(100):
+        histogram.record(1000.0)
+    for _ in range(100):
+        histogram.record(100.0)
+
+    assert histogram.count == 100
+    assert histogram.max == 100.0
+    assert histogram.percentile(95) == pytest.approx(100.0)
+
+
+def test_sliding_histogram_matches_histogram_over_its_window():
+    samples = [float(v) for v in range(1, 301)]
+    sliding = SlidingHistogram(50)
+    recent = Histogram()
+    for value in samples:
+        sliding.record(value)
+    for value in samples[-50:]:
+        recent.record(value)
+
+    assert sliding.summary() == pytest.approx(recent.summary())
+
+
+def test_sub_millisecond_percentiles():
+    histogram = Histogram()
+    samples = [0.2 + 0.1 * i for i in range(8)]
+    for value in samples:
+        histogram.record(value)
+
+    summary = histogram.summary()
+    assert summary['min'] <= summary['p50'] <= summary['p95'] <= summary['p99'] <= summary['max']
+    assert summary['p50'] == pytest.approx(0.5, rel=0.05)
+    assert summary['p99'] == pytest.approx(0.9, rel=0.05)
+
+
+def test_negligible_samples_report_zero():
+    histogram = Histogram()
+    histogram.record(1e-4)
+    histogram.record(0.0)
+
+    assert histogram.percentile(50) == 0.0